@@ -0,0 +1,241 @@
+import re
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+from scaper.normalizer import normalize_text, CANONICAL_STATES, STATE_ALIASES, canonical_state
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 24 * 3600
+DEFAULT_SYNC_INTERVAL = 60          # seconds between checks for documents a refresh changed
+
+_TRAILING = re.compile(r"[\s?.!।]+$")
+_NUMBER = re.compile(r"\d+")
+_STATE_NAMES = re.compile(r"\b(" + "|".join(sorted(
+    (re.escape(s.lower()) for s in [*CANONICAL_STATES, *STATE_ALIASES]), key=len, reverse=True)) + r")\b")
+
+
+def normalize_query(query: str) -> str:
+    """'  What is the Karnataka AI policy?? ' -> 'what is the karnataka ai policy'"""
+    return _TRAILING.sub("", normalize_text(query, lowercase=True, keep_lines=False))
+
+
+def query_guard(query: str) -> tuple:
+    """States and numbers (years, sections, bill numbers) named in a query.
+    A semantic hit must name the same ones: "Kerala AI policy" embeds very close
+    to "Karnataka AI policy", and "2023 bill" to "2019 bill"."""
+    states = frozenset(canonical_state(m) for m in _STATE_NAMES.findall(query))
+    return states, frozenset(_NUMBER.findall(query))
+
+
+@dataclass
+class CachedAnswer:
+    key: str
+    scope: tuple
+    guard: tuple
+    answer: str
+    sources: list
+    cost_ms: float                      # what generating it took
+    created: float = field(default_factory=time.time)
+    slot: int = None
+
+    @property
+    def hashes(self) -> dict:
+        # content hash of every cited document at the time the answer was generated
+        return {s["url"]: s.get("doc_hash") for s in self.sources if s.get("url")}
+
+
+@dataclass
+class TierStats:
+    lookups: int = 0
+    hits: int = 0
+    stale: int = 0                      # matched, but a cited document has changed since
+    saved_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {"lookups": self.lookups, "hits": self.hits, "stale": self.stale,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "saved_ms": round(self.saved_ms, 1),
+                "saved_ms_per_hit": round(self.saved_ms / self.hits, 1) if self.hits else 0.0}
+
+
+class AnswerCache:
+    """Two-tier answer cache in front of retrieval + generation.
+
+    Tier 1 is an LRU keyed by the normalized query text (plus state filter
+    and top_k): a hit skips embedding as well. Tier 2 compares the query
+    embedding with every cached query (one matrix-vector product) and
+    reuses the closest answer at >= `threshold` cosine similarity when it
+    names the same states and numbers. Either way an answer is only served
+    if every document it cites still has the content hash it was answered
+    from; otherwise it is dropped. The refresh runs in another process, so
+    at most every `sync_interval` seconds a lookup first asks the metadata
+    store which documents changed since the last check and `invalidate()`s
+    the answers citing them, including documents without a content hash.
+    """
+
+    def __init__(self, metadata=None, max_entries=DEFAULT_MAX_ENTRIES, threshold=DEFAULT_THRESHOLD,
+                 ttl=DEFAULT_TTL, sync_interval=DEFAULT_SYNC_INTERVAL):
+        self.metadata = metadata
+        self.sync_interval = sync_interval
+        self.synced_at = datetime.utcnow().isoformat()
+        self._next_sync = time.monotonic() + sync_interval
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.entries = OrderedDict()          # key -> CachedAnswer, least recently used first
+        self.by_url = {}                      # url -> keys of answers citing it
+        self.vectors = None                   # (max_entries, dim), unit rows
+        self.live = np.zeros(max_entries, dtype=bool)
+        self.slots = [None] * max_entries     # slot -> key
+        self.free = list(range(max_entries - 1, -1, -1))
+        self.tiers = {"exact": TierStats(), "semantic": TierStats()}
+        self.misses = 0
+
+    @staticmethod
+    def scope(state=None, top_k=None) -> tuple:
+        return (canonical_state(state) if state else None, top_k)
+
+    def key(self, query: str, state=None, top_k=None) -> str:
+        scope = self.scope(state, top_k)
+        return f"{scope[0] or ''}|{scope[1] or ''}|{normalize_query(query)}"
+
+    # --- validation ---
+
+    async def _fresh(self, entry: CachedAnswer) -> bool:
+        if self.ttl and time.time() - entry.created > self.ttl:
+            return False
+        hashes = {url: h for url, h in entry.hashes.items() if h}
+        if not hashes or self.metadata is None:
+            return True
+        docs = await asyncio.to_thread(self.metadata.get_documents, list(hashes))
+        # a document with no recorded hash (e.g. a JustAI post) can only expire by ttl
+        return all(not docs.get(url, {}).get("content_hash") or docs[url]["content_hash"] == h
+                   for url, h in hashes.items())
+
+    async def _serve(self, entry: CachedAnswer, tier: str, start: float):
+        stats = self.tiers[tier]
+        if not await self._fresh(entry):
+            stats.stale += 1
+            self.remove(entry.key)
+            return None
+        self.entries.move_to_end(entry.key)
+        stats.hits += 1
+        stats.saved_ms += max(entry.cost_ms - (time.perf_counter() - start) * 1000, 0)
+        return entry
+
+    async def sync(self, force=False) -> int:
+        """Invalidate answers citing documents changed since the last sync; returns how many."""
+        if self.metadata is None or (not force and time.monotonic() < self._next_sync):
+            return 0
+        self._next_sync = time.monotonic() + self.sync_interval
+        since, self.synced_at = self.synced_at, datetime.utcnow().isoformat()
+        changed = await asyncio.to_thread(self.metadata.changed_since, since)
+        return self.invalidate(doc["url"] for doc in changed)
+
+    # --- lookups ---
+
+    async def get_exact(self, query: str, state=None, top_k=None, start=None):
+        start = start or time.perf_counter()
+        await self.sync()
+        self.tiers["exact"].lookups += 1
+        entry = self.entries.get(self.key(query, state, top_k))
+        return await self._serve(entry, "exact", start) if entry else None
+
+    async def get_similar(self, query: str, vector, state=None, top_k=None, start=None):
+        """Best cached answer for a query embedding (unit-normalized here), or None.
+        `start` is when the request began, so saved time accounts for the embedding."""
+        start = start or time.perf_counter()
+        stats = self.tiers["semantic"]
+        stats.lookups += 1
+        if self.vectors is None or not self.live.any():
+            self.misses += 1
+            return None
+
+        v = np.asarray(vector, dtype=np.float32)
+        v = v / (np.linalg.norm(v) or 1.0)
+        sims = self.vectors @ v
+        sims[~self.live] = -1.0
+        scope, guard = self.scope(state, top_k), query_guard(normalize_query(query))
+        # the few most similar, best first; scope/guard mismatches fall through to the next
+        k = min(8, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        for slot in top[np.argsort(-sims[top])]:
+            if sims[slot] < self.threshold:
+                break
+            key = self.slots[slot]
+            if key is None:        # removed while an earlier candidate was being validated
+                continue
+            entry = self.entries[key]
+            if entry.scope == scope and entry.guard == guard:
+                hit = await self._serve(entry, "semantic", start)
+                if hit:
+                    return hit
+        self.misses += 1
+        return None
+
+    # --- writes ---
+
+    def put(self, query: str, vector, answer: str, sources: list, cost_ms: float, state=None, top_k=None):
+        key = self.key(query, state, top_k)
+        if key in self.entries:
+            self.remove(key)
+        while len(self.entries) >= self.max_entries:
+            self.remove(next(iter(self.entries)))
+
+        entry = CachedAnswer(key, self.scope(state, top_k), query_guard(normalize_query(query)),
+                             answer, sources, cost_ms)
+        if vector is not None:
+            v = np.asarray(vector, dtype=np.float32)
+            if self.vectors is None:
+                self.vectors = np.zeros((self.max_entries, v.shape[0]), dtype=np.float32)
+            entry.slot = self.free.pop()
+            self.vectors[entry.slot] = v / (np.linalg.norm(v) or 1.0)
+            self.live[entry.slot] = True
+            self.slots[entry.slot] = key
+        self.entries[key] = entry
+        for url in entry.hashes:
+            self.by_url.setdefault(url, set()).add(key)
+        return entry
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.slot is not None:
+            self.live[entry.slot] = False
+            self.slots[entry.slot] = None
+            self.free.append(entry.slot)
+        for url in entry.hashes:
+            keys = self.by_url.get(url)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.by_url[url]
+
+    def invalidate(self, urls) -> int:
+        """Drop every answer that cites one of `urls`; returns how many."""
+        keys = set()
+        for url in urls:
+            keys |= self.by_url.get(url, set())
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def clear(self):
+        for key in list(self.entries):
+            self.remove(key)
+
+    def stats(self) -> dict:
+        lookups = self.tiers["exact"].lookups
+        hits = sum(t.hits for t in self.tiers.values())
+        return {"entries": len(self.entries), "max_entries": self.max_entries,
+                "threshold": self.threshold, "requests": lookups, "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "saved_ms": round(sum(t.saved_ms for t in self.tiers.values()), 1),
+                "tiers": {name: t.to_dict() for name, t in self.tiers.items()}}
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from scaper.normalizer import canonical_state
+
+DEFAULT_CHAT_MODEL = os.environ.get("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+DEFAULT_TOP_K = 6
+MAX_CONTEXT_CHARS = 1800   # per retrieved chunk in the prompt
+MAX_MESSAGE_CHARS = 4000   # per query or history message
+MAX_HISTORY = 20           # messages a request may carry; the prompt uses the last PROMPT_HISTORY
+PROMPT_HISTORY = 6
+
+SYSTEM_PROMPT = (
+    "You answer questions about AI policy, law and government AI initiatives in India. "
+    "Use only the numbered context passages. Cite them as [1], [2], ... after the sentences "
+    "they support. If the context does not answer the question, say so."
+)
+
+# document columns returned to the client with each source
+SOURCE_FIELDS = ("title", "source", "doc_type", "fetched_at", "changed_at")
+
+
+class ChatMessage(BaseModel):
+    # no "system": clients must not replace the prompt's instructions
+    role: Literal["user", "assistant"]
+    content: str = Field(max_length=MAX_MESSAGE_CHARS)
+
+
+class ChatRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=MAX_MESSAGE_CHARS)
+    state: str = None
+    top_k: int = Field(DEFAULT_TOP_K, ge=1, le=20)
+    history: list[ChatMessage] = Field([], max_length=MAX_HISTORY)
+
+
+# --- LLM backends ---
+
+class OpenAIChat:
+    """Streams chat completion deltas from one shared AsyncOpenAI client."""
+
+    def __init__(self, client, model=DEFAULT_CHAT_MODEL, temperature=0.1, max_tokens=800):
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    async def stream(self, messages: list):
+        resp = await self.client.chat.completions.create(
+            model=self.model, messages=messages, stream=True,
+            temperature=self.temperature, max_tokens=self.max_tokens,
+        )
+        async for event in resp:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+
+class StubChat:
+    """Offline LLM for tests and load tests: after `first_token_delay` it streams
+    a canned answer that cites every context passage, `token_delay` per token."""
+    model = "stub"
+
+    def __init__(self, first_token_delay=0.0, token_delay=0.0):
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    async def stream(self, messages: list):
+        passages = messages[-1]["content"].count("\n[")
+        answer = "Based on the context " + " ".join(f"[{i}]" for i in range(1, passages + 1)) \
+            + ", here is a short answer to the question."
+        await asyncio.sleep(self.first_token_delay)
+        for i, word in enumerate(answer.split(" ")):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+
+class StubRetriever:
+    """Vector search stand-in returning fixed hits after `delay` seconds."""
+
+    def __init__(self, hits=None, delay=0.0):
+        self.hits = hits if hits is not None else [
+            {"id": i, "score": 1.0 - i / 10, "chunk_id": f"stub-{i}", "url": f"https://example.gov.in/doc/{i}",
+             "title": f"Document {i}", "state": "Karnataka",
+             "text": f"Passage {i} about the state AI mission and its data governance rules."}
+            for i in range(DEFAULT_TOP_K)
+        ]
+        self.delay = delay
+
+    async def search(self, vector, limit=DEFAULT_TOP_K, **filters) -> list:
+        await asyncio.sleep(self.delay)
+        return self.hits[:limit]
+
+    async def close(self):
+        pass
+
+
+# --- Service ---
+
+def build_messages(req: ChatRequest, hits: list) -> list:
+    context = "\n".join(f"[{i}] {h.get('title') or h.get('url')}\n{(h.get('text') or '')[:MAX_CONTEXT_CHARS]}"
+                        for i, h in enumerate(hits, start=1))
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        *({"role": m.role, "content": m.content} for m in req.history[-PROMPT_HISTORY:]),
+        {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {req.query}"},
+    ]
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class ChatService:
+    """Query -> embedding -> vector search -> streamed answer.
+
+    The SQLite lookup that enriches the sources runs in a worker thread
+    while the LLM is already streaming, so it never delays the first token;
+    the "sources" event goes out as soon as it is ready. All clients are
+    created once (see api/main.py) and shared by every request.
+
+    With an AnswerCache, a repeated question is answered from the exact
+    tier before anything else runs, and a paraphrase from the semantic tier
+    right after the query is embedded. Follow-ups (requests with history)
+    always go to the LLM.
+    """
+
+    def __init__(self, embedder, retriever, llm, metadata=None, cache=None):
+        self.embedder = embedder
+        self.retriever = retriever
+        self.llm = llm
+        self.metadata = metadata
+        self.cache = cache
+
+    async def sources(self, hits: list) -> list:
+        docs = {}
+        if self.metadata is not None:
+            docs = await asyncio.to_thread(self.metadata.get_documents, [h.get("url") for h in hits])
+        out = []
+        for i, h in enumerate(hits, start=1):
+            doc = docs.get(h.get("url")) or {}
+            out.append({"ref": i, "url": h.get("url"), "state": h.get("state"),
+                        "score": round(float(h.get("score") or 0), 4), "chunk_id": h.get("chunk_id"),
+                        "doc_hash": h.get("doc_hash"),
+                        **{k: doc.get(k) or h.get(k) for k in SOURCE_FIELDS}})
+        return out
+
+    async def embed(self, req: ChatRequest):
+        return (await self.embedder.aembed_texts([req.query]))[0]
+
+    async def retrieve(self, req: ChatRequest, vector) -> list:
+        state = canonical_state(req.state) if req.state else None
+        return await self.retriever.search(vector, limit=req.top_k, state=state, query=req.query)
+
+    def replay(self, entry, tier: str, start: float):
+        elapsed = round((time.perf_counter() - start) * 1000, 1)
+        yield sse("sources", entry.sources)
+        yield sse("token", {"text": entry.answer})
+        yield sse("done", {"tokens": 1, "model": self.llm.model, "cache": tier,
+                           "retrieval_ms": 0.0, "ttft_ms": elapsed, "total_ms": elapsed})
+
+    async def stream(self, req: ChatRequest):
+        """SSE events: sources, token*, done (or error)."""
+        start = time.perf_counter()
+        lookup = None
+        cache = self.cache if not req.history else None
+        try:
+            if cache is not None:
+                entry = await cache.get_exact(req.query, req.state, req.top_k, start)
+                if entry is not None:
+                    for event in self.replay(entry, "exact", start):
+                        yield event
+                    return
+
+            vector = await self.embed(req)
+            if cache is not None:
+                entry = await cache.get_similar(req.query, vector, req.state, req.top_k, start)
+                if entry is not None:
+                    for event in self.replay(entry, "semantic", start):
+                        yield event
+                    return
+
+            hits = await self.retrieve(req, vector)
+            retrieved = time.perf_counter()
+            lookup = asyncio.create_task(self.sources(hits))
+
+            first, answer, sent_sources = None, [], False
+            async for token in self.llm.stream(build_messages(req, hits)):
+                if first is None:
+                    first = time.perf_counter()
+                if not sent_sources and lookup.done():
+                    yield sse("sources", lookup.result())
+                    sent_sources = True
+                answer.append(token)
+                yield sse("token", {"text": token})
+            if not sent_sources:
+                yield sse("sources", await lookup)
+
+            end = time.perf_counter()
+            sources = lookup.result()
+            # an answer with no hashed source has nothing to go stale against, so a
+            # "no information" reply would outlive the indexing of the content it lacked
+            if cache is not None and answer and any(s.get("doc_hash") for s in sources):
+                cache.put(req.query, vector, "".join(answer), sources, (end - start) * 1000,
+                          req.state, req.top_k)
+            yield sse("done", {"tokens": len(answer), "model": self.llm.model, "cache": None,
+                               "retrieval_ms": round((retrieved - start) * 1000, 1),
+                               "ttft_ms": round(((first or end) - start) * 1000, 1),
+                               "total_ms": round((end - start) * 1000, 1)})
+        except Exception as e:
+            yield sse("error", {"error": f"{type(e).__name__}: {str(e)[:200]}"})
+        finally:
+            if lookup is not None and not lookup.done():
+                lookup.cancel()
+
+
+router = APIRouter()
+
+
+@router.post("/chat")
+async def chat(req: ChatRequest, request: Request):
+    service: ChatService = request.app.state.chat
+    return StreamingResponse(service.stream(req), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/chat/cache")
+async def cache_stats(request: Request):
+    cache = request.app.state.chat.cache
+    return cache.stats() if cache is not None else {"enabled": False}
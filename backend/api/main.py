@@ -0,0 +1,76 @@
+import os
+import sys
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from openai import AsyncOpenAI
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from api.chat import router as chat_router, ChatService, OpenAIChat, StubChat, StubRetriever
+from api.answer_cache import AnswerCache, DEFAULT_THRESHOLD
+from processor.embedder import Embedder, OpenAIBackend, HashingBackend
+from processor.retriever import AsyncHybridRetriever
+from db.qdrant_client import AsyncQdrantSearch, get_async_client
+from db.inverted_index import InvertedIndex, INDEX_DIR
+from db.sqlite_client import MetadataStore
+
+# Qdrant target: QDRANT_URL, else QDRANT_PATH, else data/qdrant (db/qdrant_client.resolve_target).
+# The on-disk default holds one process, so set QDRANT_URL when a refresh runs alongside the API.
+# LEGALBOT_STUB=1 serves canned answers with no OpenAI or Qdrant (local dev, load tests)
+STUB = os.environ.get("LEGALBOT_STUB") == "1"
+CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "http://localhost:3000").split(",")
+# LEGALBOT_ANSWER_CACHE=0 turns the answer cache off
+CACHE_ENABLED = os.environ.get("LEGALBOT_ANSWER_CACHE", "1") != "0"
+CACHE_THRESHOLD = float(os.environ.get("LEGALBOT_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+# LEGALBOT_HYBRID=0 searches vectors only, even when the refresh has built a keyword index
+HYBRID = os.environ.get("LEGALBOT_HYBRID", "1") != "0"
+
+
+def build_chat_service(stub=STUB) -> ChatService:
+    """Every client the chat path needs, created once: one AsyncOpenAI client
+    (a single HTTP connection pool) serves both embeddings and completions."""
+    metadata = MetadataStore()
+    cache = AnswerCache(metadata, threshold=CACHE_THRESHOLD) if CACHE_ENABLED else None
+    if stub:
+        return ChatService(Embedder(HashingBackend()), StubRetriever(), StubChat(), metadata, cache)
+    openai = AsyncOpenAI()
+    retriever = AsyncQdrantSearch(get_async_client())
+    if HYBRID and InvertedIndex.exists(INDEX_DIR):
+        retriever = AsyncHybridRetriever(retriever, InvertedIndex(INDEX_DIR, read_only=True))
+    return ChatService(Embedder(OpenAIBackend(client=openai)), retriever,
+                       OpenAIChat(openai), metadata, cache)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    own = getattr(app.state, "chat", None) is None
+    if own:
+        app.state.chat = build_chat_service()
+    yield
+    if own:
+        await app.state.chat.retriever.close()
+        client = getattr(app.state.chat.llm, "client", None)
+        if client is not None:
+            await client.close()
+        app.state.chat = None
+
+
+def create_app(chat_service: ChatService = None) -> FastAPI:
+    """`chat_service` overrides the one built at startup (tests, benchmarks)."""
+    app = FastAPI(title="LegalBot", lifespan=lifespan)
+    app.state.chat = chat_service
+    app.add_middleware(CORSMiddleware, allow_origins=CORS_ORIGINS, allow_methods=["*"], allow_headers=["*"])
+    app.include_router(chat_router)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+app = create_app()
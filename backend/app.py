@@ -0,0 +1,8 @@
+"""Entry point: uvicorn app:app (run from backend/)."""
+import os
+
+from api.main import app
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.environ.get("HOST", "127.0.0.1"), port=int(os.environ.get("PORT", "8000")))
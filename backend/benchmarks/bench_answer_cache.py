@@ -0,0 +1,139 @@
+"""Answer cache: hit rate and latency saved per tier on a repetitive question stream.
+
+Questions are drawn Zipf-style from a pool of base questions, each asked
+verbatim, re-cased/re-punctuated (exact tier) or padded with filler words
+(semantic tier).
+Part way through, some cited documents change, which must turn their
+cached answers stale. Retrieval and the LLM are stubs with fixed latency;
+embeddings use the local HashingBackend, whose similarities are lexical,
+hence the lower default threshold than the API's.
+
+    python benchmarks/bench_answer_cache.py --requests 3000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from api.chat import ChatService, ChatRequest, StubChat
+from api.answer_cache import AnswerCache
+from processor.embedder import Embedder, HashingBackend
+from db.sqlite_client import MetadataStore
+
+STATES = ["Karnataka", "Kerala", "Tamil Nadu", "Telangana", "Maharashtra", "Uttar Pradesh",
+          "Gujarat", "Odisha", "Punjab", "West Bengal"]
+TEMPLATES = [
+    "what is the {s} ai policy",
+    "does {s} have an ai centre of excellence",
+    "how does {s} use facial recognition in policing",
+    "what data governance rules apply to ai projects in {s}",
+]
+GLOBAL = [
+    "what is the status of the digital india act",
+    "what does the dpdp act say about consent",
+    "which states have an ai policy",
+]
+PREFIXES = ["please tell me ", "can you tell me ", "i want to know ", "quick question: ", ""]
+SUFFIXES = [" right now", " today", " at the moment", ""]
+
+
+class DocRetriever:
+    """Stub search over a fixed set of documents, each with its current content hash."""
+
+    def __init__(self, hashes: dict, delay: float):
+        self.hashes = hashes
+        self.delay = delay
+
+    async def search(self, vector, limit=6, state=None, **filters):
+        await asyncio.sleep(self.delay)
+        return [{"score": 0.9, "url": url, "doc_hash": digest, "title": url.rsplit("/", 1)[-1],
+                 "text": "AI policy passage"} for url, digest in list(self.hashes.items())[:limit]]
+
+    async def close(self):
+        pass
+
+
+def question_pool() -> list:
+    return [t.format(s=s.lower()) for t in TEMPLATES for s in STATES] + GLOBAL
+
+
+def sample_queries(n: int, rng: random.Random) -> list:
+    pool = question_pool()
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    out = []
+    for question in rng.choices(pool, weights, k=n):
+        r = rng.random()
+        if r < 0.5:
+            out.append(question)
+        elif r < 0.75:
+            out.append(question.capitalize() + rng.choice(["?", " ?", "??", ""]))
+        else:
+            out.append(rng.choice(PREFIXES) + question + rng.choice(SUFFIXES) + "?")
+    return out
+
+
+async def run(service: ChatService, queries: list, hashes: dict, change_at: int) -> list:
+    latencies = []
+    for i, query in enumerate(queries):
+        if i == change_at:
+            # a refresh re-indexes two of the cited pages
+            changed = list(hashes)[:2]
+            hashes.update((url, "v2") for url in changed)
+            service.metadata.upsert_documents([{"url": url, "content_hash": "v2"} for url in changed])
+        start = time.perf_counter()
+        async for _ in service.stream(ChatRequest(query=query)):
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--retrieval-ms", type=float, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    queries = sample_queries(args.requests, random.Random(args.seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        metadata = MetadataStore(os.path.join(tmp, "legalbot.db"))
+        hashes = {f"https://portal.gov.in/doc-{j}": "v1" for j in range(6)}
+        metadata.upsert_documents([{"url": url, "content_hash": h} for url, h in hashes.items()])
+
+        def service(cache):
+            return ChatService(Embedder(HashingBackend()), DocRetriever(hashes, args.retrieval_ms / 1000),
+                               StubChat(args.first_token_ms / 1000), metadata, cache)
+
+        cache = AnswerCache(metadata, threshold=args.threshold)
+        cached = asyncio.run(run(service(cache), queries, hashes, len(queries) // 2))
+        stats = cache.stats()
+        # uncached baseline on a sample; every request costs the same there
+        baseline = asyncio.run(run(service(None), queries[:50], hashes, -1))
+
+    print(f"{args.requests} requests, {len(question_pool())} distinct questions, threshold {args.threshold}\n")
+    print(f"{'tier':10} {'lookups':>8} {'hits':>6} {'hit rate':>9} {'stale':>6} {'saved s':>8} {'ms/hit':>7}")
+    for name, t in stats["tiers"].items():
+        print(f"{name:10} {t['lookups']:8} {t['hits']:6} {t['hit_rate']:9.1%} {t['stale']:6} "
+              f"{t['saved_ms'] / 1000:8.1f} {t['saved_ms_per_hit']:7.1f}")
+    print(f"{'overall':10} {stats['requests']:8} {stats['requests'] - stats['misses']:6} "
+          f"{stats['hit_rate']:9.1%} {'':6} {stats['saved_ms'] / 1000:8.1f}")
+    print(f"\nlatency without cache  p50 {percentile(baseline, 0.5):7.1f} ms  p95 {percentile(baseline, 0.95):7.1f} ms")
+    print(f"latency with cache     p50 {percentile(cached, 0.5):7.1f} ms  p95 {percentile(cached, 0.95):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Chat endpoint load test: time to first token, full-answer latency and requests/sec.
+
+Serves api/main.py with uvicorn in this process. Retrieval and the LLM are
+stubs with configurable latency, and the query embedding uses the local
+HashingBackend. Requests stream the SSE response over real HTTP.
+
+    python benchmarks/bench_chat.py --requests 500 --concurrency 50
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+
+import httpx
+import uvicorn
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from api.main import create_app
+from api.chat import ChatService, StubChat, StubRetriever
+from processor.embedder import Embedder, HashingBackend
+from db.sqlite_client import MetadataStore
+
+QUERIES = [
+    "What does the Karnataka AI policy say about data sharing?",
+    "Which states have set up an AI centre of excellence?",
+    "Summarise the Digital Personal Data Protection Act provisions on consent.",
+    "कृत्रिम बुद्धिमत्ता पर उत्तर प्रदेश सरकार की नीति क्या है?",
+    "Is facial recognition used by state police in Telangana?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+async def one(client: httpx.AsyncClient, query: str) -> tuple:
+    start = time.perf_counter()
+    first = None
+    event = None
+    async with client.stream("POST", "/chat", json={"query": query}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "token" and first is None:
+                first = time.perf_counter()
+            elif line.startswith("data: ") and event == "error":
+                raise RuntimeError(json.loads(line[6:])["error"])
+    end = time.perf_counter()
+    return (first or end) - start, end - start
+
+
+async def load(base_url: str, n: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def run(i):
+            async with semaphore:
+                return await one(client, QUERIES[i % len(QUERIES)])
+
+        await run(0)   # warm up the connection pool and the app
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run(i) for i in range(n)))
+        return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--retrieval-ms", type=float, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    service = ChatService(Embedder(HashingBackend()), StubRetriever(delay=args.retrieval_ms / 1000),
+                          StubChat(args.first_token_ms / 1000, args.token_ms / 1000), MetadataStore())
+    port = free_port()
+    server = serve(create_app(service), port)
+    try:
+        results, elapsed = asyncio.run(load(f"http://127.0.0.1:{port}", args.requests, args.concurrency))
+    finally:
+        server.should_exit = True
+
+    ttft = [r[0] * 1000 for r in results]
+    total = [r[1] * 1000 for r in results]
+    print(f"{args.requests} requests, concurrency {args.concurrency}  "
+          f"(stub retrieval {args.retrieval_ms:.0f} ms, first token {args.first_token_ms:.0f} ms, "
+          f"{args.token_ms:.0f} ms/token)")
+    print(f"  time to first token  p50 {percentile(ttft, 0.5):7.1f} ms   p95 {percentile(ttft, 0.95):7.1f} ms")
+    print(f"  full answer          p50 {percentile(total, 0.5):7.1f} ms   p95 {percentile(total, 0.95):7.1f} ms")
+    print(f"  throughput           {args.requests / elapsed:7.1f} requests/sec")
+
+
+if __name__ == "__main__":
+    main()
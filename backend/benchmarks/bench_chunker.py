@@ -0,0 +1,86 @@
+"""Chunker throughput (docs/sec) and peak memory on a synthetic corpus.
+
+    python benchmarks/bench_chunker.py --docs 100000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.chunker import iter_documents, iter_chunks
+
+STATES = ["Karnataka", "Kerala", "Tamil Nadu", "Uttar Pradesh", "Maharashtra", "Delhi"]
+SENTENCES = [
+    "The State Government may, by notification, constitute an Artificial Intelligence Mission.",
+    "Every data fiduciary shall process personal data only for a lawful purpose.",
+    "The department shall publish an annual report on the adoption of AI in governance.",
+    "Nothing in this section shall apply to anonymised data used for research purposes.",
+    "राज्य सरकार कृत्रिम बुद्धिमत्ता के उपयोग हेतु दिशानिर्देश जारी करेगी।",
+    "इस अधिनियम के प्रयोजनों के लिए डेटा का अर्थ सूचना का कोई प्रतिनिधित्व है।",
+]
+
+
+def synthetic_doc(i: int, rng: random.Random) -> dict:
+    lines = []
+    for section in range(1, rng.randint(3, 12)):
+        lines.append(f"Section {section}. Provisions relating to item {i}-{section}")
+        for clause in "abcd"[:rng.randint(1, 4)]:
+            body = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 6)))
+            lines.append(f"({clause}) {body}")
+    text = "\n".join(lines)
+    return {"url": f"https://example.gov.in/doc/{i}", "state": rng.choice(STATES), "text": text}
+
+
+def write_corpus(path: str, n: int, seed: int = 7):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps(synthetic_doc(i, rng), ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.jsonl")
+        write_corpus(path, args.docs)
+        size_mb = os.path.getsize(path) / 1e6
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        docs = chunks = tokens = 0
+
+        def counted(stream):
+            nonlocal docs
+            for doc in stream:
+                docs += 1
+                yield doc
+
+        start = time.perf_counter()
+        for chunk in iter_chunks(counted(iter_documents(path)),
+                                 max_tokens=args.max_tokens, overlap=args.overlap):
+            chunks += 1
+            tokens += chunk["token_count"]
+        elapsed = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"corpus      : {docs} docs, {size_mb:.1f} MB")
+    print(f"chunks      : {chunks} ({tokens / max(chunks, 1):.0f} tokens avg)")
+    print(f"elapsed     : {elapsed:.2f}s")
+    print(f"throughput  : {docs / elapsed:,.0f} docs/sec, {size_mb / elapsed:.1f} MB/sec")
+    print(f"peak RSS    : {rss_after / 1024:.1f} MB (grew {(rss_after - rss_before) / 1024:.1f} MB while chunking)")
+
+
+if __name__ == "__main__":
+    main()
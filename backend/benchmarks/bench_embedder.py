@@ -0,0 +1,81 @@
+"""Offline embedder benchmark: batching, concurrency and cache hit rate.
+
+Uses the local HashingBackend, optionally with simulated per-request latency
+to stand in for a remote provider.
+
+    python benchmarks/bench_embedder.py --chunks 20000 --latency 0.2
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.chunker import iter_chunks
+from processor.embedder import Embedder, EmbeddingCache, HashingBackend
+from bench_chunker import synthetic_doc
+
+
+class SlowBackend(HashingBackend):
+    max_items = 256
+
+    def __init__(self, dim, latency):
+        super().__init__(dim)
+        self.latency = latency
+
+    async def embed(self, texts):
+        await asyncio.sleep(self.latency)
+        return await super().embed(texts)
+
+
+def run(embedder, chunks):
+    start = time.perf_counter()
+    requests_before = embedder.requests
+    n = 0
+    for batch, vectors in embedder.embed_chunks(chunks):
+        n += len(batch)
+    return n, time.perf_counter() - start, embedder.requests - requests_before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    chunks = []
+    i = 0
+    while len(chunks) < args.chunks:
+        chunks.extend(iter_chunks([synthetic_doc(i, rng)], max_tokens=256))
+        i += 1
+    chunks = chunks[:args.chunks]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(os.path.join(tmp, "emb.db"))
+        backend = SlowBackend(args.dim, args.latency) if args.latency else HashingBackend(args.dim)
+        embedder = Embedder(backend, cache=cache, max_concurrency=args.concurrency)
+
+        n, cold, cold_requests = run(embedder, chunks)
+        print(f"cold : {n} chunks in {cold:.2f}s ({n / cold:,.0f} chunks/sec, {cold_requests} requests)")
+
+        cache.hits = cache.misses = 0
+        n, warm, warm_requests = run(embedder, chunks)
+        print(f"warm : {n} chunks in {warm:.2f}s ({n / warm:,.0f} chunks/sec, {warm_requests} requests, "
+              f"hit rate {cache.hits / max(cache.hits + cache.misses, 1):.0%})")
+
+        cache.close()
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        print(f"cache: {size / 1e6:.1f} MB on disk, {args.dim * cache.dtype.itemsize} bytes/vector")
+
+
+if __name__ == "__main__":
+    main()
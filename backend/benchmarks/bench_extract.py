@@ -0,0 +1,129 @@
+"""Boilerplate extraction throughput (pages/sec) on saved HTML pages.
+
+Compares the old per-tag / per-line scans from scraper/run.py against
+scraper/extract.py (bs4 and lxml modes) and checks the text is identical.
+
+    python benchmarks/bench_extract.py --rounds 50
+    python benchmarks/bench_extract.py --fixtures /path/to/saved/pages
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+from bs4 import BeautifulSoup
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.extract import extract_main_text
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+
+def legacy_parse_static(html: str) -> str:
+    # scraper/run.py parse_static() before scraper/extract.py, kept as the baseline
+    soup = BeautifulSoup(html, 'lxml')
+    for tag in soup(['nav', 'footer', 'script', 'style',
+                     'header', 'aside', 'iframe', 'noscript']):
+        tag.decompose()
+
+    JUNK_WORDS = ['related', 'sidebar', 'ads', 'social', 'share',
+                  'comment', 'newsletter', 'recommended', 'trending',
+                  'taboola', 'sponsored', 'tags', 'author']
+
+    for tag in soup.find_all(True):
+        if not hasattr(tag, 'attrs') or tag.attrs is None:
+            continue
+        label = ' '.join(tag.attrs.get('class', [])) + ' ' + str(tag.attrs.get('id', ''))
+        if any(j in label.lower() for j in JUNK_WORDS):
+            tag.decompose()
+
+    main = (soup.find('article') or soup.find('main') or
+            soup.find('div', {'class': lambda c: c and 'article' in ' '.join(c).lower()}) or
+            soup)
+
+    raw_lines = main.get_text(separator='\n', strip=True).split('\n')
+    clean_lines = []
+
+    for line in raw_lines:
+        line = line.strip()
+        if len(line) < 40:
+            continue
+
+        line_lower = line.lower()
+
+        HARD_STOP = [
+            'murder case', 'iran war', 'israel war', 'viral video',
+            'taboola', 'sponsored links', 'download app',
+            '(this story has not been edited',
+            'auto-generated from pti',
+            'पत्रकारिता में', 'फ्रीलांसिंग', 'डिजिटल मीडिया में कार्यरत',
+            'वायरल खबरें', 'विज्ञापन'
+        ]
+        if any(signal in line_lower for signal in HARD_STOP):
+            break
+
+        SOFT_JUNK = [
+            'read more', 'tags:', 'author:', 'share this',
+            'जरूर पढ़ें', 'यह भी पढ़ें', 'ये भी पढ़ें'
+        ]
+        if any(signal in line_lower for signal in SOFT_JUNK):
+            continue
+
+        clean_lines.append(line)
+
+    return '\n'.join(clean_lines)
+
+
+def load_pages(directory: str) -> dict:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.htm*"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def run(name, fn, pages, rounds) -> dict:
+    out = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page, html in pages.items():
+            out[page] = fn(html)
+    elapsed = time.perf_counter() - start
+    n = rounds * len(pages)
+    print(f"{name:8} {n:6} pages  {elapsed:7.2f}s  {n / elapsed:8.1f} pages/sec")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    if not pages:
+        sys.exit(f"no .html files in {args.fixtures}")
+    mb = sum(len(h.encode()) for h in pages.values()) / 1e6
+    print(f"{len(pages)} pages, {mb:.2f} MB, {args.rounds} rounds\n")
+
+    baseline = run("legacy", legacy_parse_static, pages, args.rounds)
+    modes = {
+        "bs4": run("bs4", lambda h: extract_main_text(h, parser="bs4"), pages, args.rounds),
+        "lxml": run("lxml", lambda h: extract_main_text(h, parser="lxml"), pages, args.rounds),
+    }
+
+    print()
+    ok = True
+    for mode, texts in modes.items():
+        diff = [p for p in pages if texts[p] != baseline[p]]
+        ok &= not diff
+        print(f"{mode:8} {'identical' if not diff else 'DIFFERS: ' + ', '.join(diff)}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Text normalization throughput (MB/sec): the old per-module helpers vs scaper/normalizer.py.
+
+English, Hindi and mixed page text, one call per document and through the
+batch normalize_docs() API.
+
+    python benchmarks/bench_normalizer.py --docs 5000
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import unicodedata
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.normalizer import normalize_text, normalize_docs
+
+
+# justai/utils.py and scaper/hasher.py before scaper/normalizer.py, kept as the baseline
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def legacy_normalize_for_hash(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+ENGLISH = [
+    "The Ministry of Electronics and Information Technology released a draft framework",
+    "on the responsible use of artificial intelligence in public services.",
+    "Share this article", "Advertisement",
+    "State governments are expected to set up   AI  centres of excellence by 2026.",
+    "Read more:   Digital Personal Data Protection Rules notified",
+]
+HINDI = [
+    "राज्य सरकार ने कृत्रिम बुद्धिमत्ता के उपयोग के लिए नई नीति जारी की है ।",
+    "इस योजना के तहत २०२५ तक ५०० स्कूलों में एआई प्रयोगशालाएँ खोली जाएँगी|",
+    "विज्ञापन", "यह भी पढ़ें",
+    "मुख्यमंत्री ने कहा कि डिजिटल​ शासन से नागरिकों को लाभ होगा ॥",
+]
+
+
+def synthetic_text(lines: list, rng: random.Random) -> str:
+    out = []
+    for _ in range(rng.randint(40, 120)):
+        line = rng.choice(lines)
+        out.append(line)
+        if rng.random() < 0.1:
+            out.append(line)  # repeated share bar / menu echo
+        if rng.random() < 0.2:
+            out.append("   \t ")
+    return "\n".join(out)
+
+
+def throughput(name, fn, texts):
+    mb = sum(len(t.encode()) for t in texts) / 1e6
+    start = time.perf_counter()
+    for t in texts:
+        fn(t)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:24} {mb / elapsed:8.1f} MB/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpora = {
+        "english": [synthetic_text(ENGLISH, rng) for _ in range(args.docs)],
+        "hindi": [synthetic_text(HINDI, rng) for _ in range(args.docs)],
+        "mixed": [synthetic_text(ENGLISH + HINDI, rng) for _ in range(args.docs)],
+    }
+
+    for name, texts in corpora.items():
+        print(f"{name} ({len(texts)} docs)")
+        throughput("legacy clean_text", legacy_clean_text, texts)
+        throughput("legacy normalize_for_hash", legacy_normalize_for_hash, texts)
+        throughput("normalize_text", normalize_text, texts)
+        throughput("normalize_text (hash)", lambda t: normalize_text(t, lowercase=True, keep_lines=False), texts)
+
+    docs = [{"url": f"https://example.gov.in/{i}", "state": "orissa", "title": "  AI  policy ",
+             "text": t} for i, t in enumerate(corpora["mixed"])]
+    mb = sum(len(d["text"].encode()) for d in docs) / 1e6
+    start = time.perf_counter()
+    n = sum(1 for _ in normalize_docs(docs))
+    elapsed = time.perf_counter() - start
+    print(f"\nnormalize_docs: {n} docs, {mb / elapsed:.1f} MB/sec, state -> {docs[0]['state']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Qdrant ingest throughput (points/sec) and filtered query latency.
+
+Runs against Qdrant's in-memory local mode unless --url is given.
+
+    python benchmarks/bench_qdrant.py --points 50000 --queries 200
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from db.qdrant_client import QdrantStore, get_client
+
+STATES = ["Karnataka", "Kerala", "Tamil Nadu", "Uttar Pradesh", "Maharashtra", "Delhi"]
+SOURCES = ["JustAI", "PRS", "state_portal"]
+
+
+def synthetic_chunks(n: int, rng):
+    for i in range(n):
+        yield {
+            "chunk_id": f"{i:016x}-{0:08d}",
+            "doc_hash": f"{i // 4:032x}",
+            "url": f"https://example.gov.in/doc/{i // 4}",
+            "state": STATES[rng.integers(len(STATES))],
+            "source": SOURCES[rng.integers(len(SOURCES))],
+            "page_type": "article",
+            "published_date": f"20{rng.integers(18, 26)}-0{rng.integers(1, 10)}-01T00:00:00",
+            "text": f"chunk {i}",
+        }
+
+
+def percentile(values, p):
+    return float(np.percentile(np.asarray(values) * 1000, p))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    client = get_client(url=args.url) if args.url else get_client(location=":memory:")
+    store = QdrantStore("bench_chunks", client=client)
+    if client.collection_exists(store.collection):
+        client.delete_collection(store.collection)
+    store.ensure_collection(args.dim)
+
+    chunks = list(synthetic_chunks(args.points, rng))
+    vectors = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+
+    start = time.perf_counter()
+    store.upsert_chunks(chunks, vectors, batch_size=args.batch_size, parallel=args.parallel, wait=True)
+    ingest = time.perf_counter() - start
+    print(f"ingest   : {args.points} points in {ingest:.2f}s ({args.points / ingest:,.0f} points/sec)")
+
+    start = time.perf_counter()
+    store.upsert_chunks(chunks[:1000], vectors[:1000], batch_size=args.batch_size, wait=True)
+    assert store.count() == args.points, "re-ingest must not duplicate points"
+    print(f"re-ingest: 1000 points in {time.perf_counter() - start:.2f}s, count still {store.count()}")
+
+    for label, filters in (("unfiltered", {}),
+                           ("state", {"state": "Kerala"}),
+                           ("state+source+date", {"state": "Kerala", "source": "PRS",
+                                                  "published_after": "2022-01-01T00:00:00"})):
+        latencies = []
+        for q in rng.standard_normal((args.queries, args.dim), dtype=np.float32):
+            t = time.perf_counter()
+            store.search(q, limit=10, **filters)
+            latencies.append(time.perf_counter() - t)
+        print(f"query    : {label:18} p50 {percentile(latencies, 50):7.2f} ms   "
+              f"p95 {percentile(latencies, 95):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Keyword relevance: precision/recall on labelled fixtures, per-page decisions and throughput (MB/sec).
+
+Compares the old substring scan from prs.is_ai_relevant with
+processor/relevance.py. The pages section runs both on the saved HTML,
+PRS and JustAI pages and sets the scoring cost against extracting the
+page, which every scraped page pays anyway.
+
+    python benchmarks/bench_relevance.py --docs 20000
+    python benchmarks/bench_relevance.py --pages /path/to/saved/pages
+"""
+import os
+import sys
+import json
+import glob
+import time
+import random
+import argparse
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.relevance import RelevanceScorer
+from scraper.extract import extract_main_text
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "relevance.jsonl")
+PAGES = [os.path.join(os.path.dirname(__file__), "fixtures", d) for d in ("html", "prs", "justai")]
+
+# prs.py before processor/relevance.py, kept as the baseline
+AI_KEYWORDS = [
+    'artificial intelligence', 'machine learning', 'deep learning',
+    'ai', 'neural network', 'robotics', 'autonomous system',
+    'computer vision', 'natural language processing', 'chatbot'
+]
+
+
+def legacy_is_ai_relevant(text):
+    if not text:
+        return False
+    text = text.lower()
+    return any(keyword in text for keyword in AI_KEYWORDS)
+
+
+def load_fixtures(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def precision_recall(predict, items) -> tuple:
+    tp = fp = fn = 0
+    for item in items:
+        got = predict(item["text"])
+        tp += got and item["relevant"]
+        fp += got and not item["relevant"]
+        fn += not got and item["relevant"]
+    return tp / ((tp + fp) or 1), tp / ((tp + fn) or 1), fp
+
+
+def synthetic_corpus(n: int, items: list, rng: random.Random) -> list:
+    # bill-summary sized texts: mostly unrelated sentences, some fixture lines mixed in
+    filler = [i["text"] for i in items if not i["relevant"]]
+    return [" ".join(rng.choice(filler if rng.random() < 0.9 else [x["text"] for x in items])
+                     for _ in range(rng.randint(20, 80))) for _ in range(n)]
+
+
+def load_pages(dirs: list) -> list:
+    # (name, html) for saved .html pages and the posts of WordPress JSON dumps
+    pages = []
+    for d in dirs:
+        for path in sorted(glob.glob(os.path.join(d, "*.html"))):
+            with open(path, encoding="utf-8") as f:
+                pages.append((os.path.relpath(path, os.path.dirname(d)), f.read()))
+        for path in sorted(glob.glob(os.path.join(d, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                for post in json.load(f):
+                    pages.append((post["link"], post["content"]["rendered"]))
+    return pages
+
+
+def timed_ms(fn, arg, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(arg)
+    return result, (time.perf_counter() - start) / rounds * 1000
+
+
+def page_report(pages: list, scorer: RelevanceScorer):
+    print(f"{'page':36} {'chars':>6} {'legacy':>7} {'scorer':>7} {'score':>6}  {'score ms':>8} {'extract ms':>10}")
+    differ = 0
+    for name, html in pages:
+        text, extract_ms = timed_ms(extract_main_text, html, rounds=5)
+        result, score_ms = timed_ms(scorer.score, text)
+        legacy = legacy_is_ai_relevant(text)
+        differ += legacy != result.relevant
+        print(f"{name[-36:]:36} {len(text):6} {'keep' if legacy else 'drop':>7} "
+              f"{'keep' if result.relevant else 'drop':>7} {result.score:6}  {score_ms:8.3f} {extract_ms:10.2f}"
+              + ("   <- differs" if legacy != result.relevant else ""))
+    print(f"{differ} of {len(pages)} pages decided differently")
+
+
+def throughput(name, fn, texts):
+    mb = sum(len(t.encode()) for t in texts) / 1e6
+    start = time.perf_counter()
+    hits = sum(1 for t in texts if fn(t))
+    elapsed = time.perf_counter() - start
+    print(f"{name:10} {len(texts) / elapsed:10.0f} docs/sec  {mb / elapsed:7.1f} MB/sec  "
+          f"{hits / len(texts):6.1%} flagged")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--pages", nargs="*", default=PAGES, help="directories of saved pages")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    items = load_fixtures(args.fixtures)
+    scorer = RelevanceScorer()
+
+    print(f"{len(items)} labelled texts\n")
+    for name, fn in (("legacy", legacy_is_ai_relevant), ("scorer", scorer.is_relevant)):
+        p, r, fp = precision_recall(fn, items)
+        print(f"{name:10} precision {p:.2f}  recall {r:.2f}  false positives {fp}")
+
+    pages = load_pages(args.pages)
+    print(f"\n{len(pages)} saved pages")
+    page_report(pages, scorer)
+
+    texts = synthetic_corpus(args.docs, items, random.Random(args.seed))
+    print(f"\n{len(texts)} synthetic documents")
+    throughput("legacy", legacy_is_ai_relevant, texts)
+    throughput("scorer", scorer.is_relevant, texts)
+    start = time.perf_counter()
+    n = sum(1 for _ in scorer.score_many(texts))
+    print(f"{'score_many':10} {n / (time.perf_counter() - start):10.0f} docs/sec  (full scores + terms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Render pool: pages/min, per-page latency and memory per browser on JS-built fixture pages.
+
+A stub HTTP server in this process serves pages whose text only appears after
+a script fetches it from /api, plus slow images, fonts and video for the
+resource blocking to skip. Each configuration renders every page and runs the
+rendered HTML through parse_static, the scrape_static extraction path.
+Memory is the RSS of the Chromium processes under this one (Linux /proc).
+
+    python benchmarks/bench_render.py --pages 200 --browsers 1,2,4
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.render import RenderPool, BLOCKED_RESOURCES
+from scraper.run import parse_static
+
+PARAGRAPH = ("The state government has notified a policy on the use of artificial intelligence in public "
+             "services, covering data governance, procurement of AI systems and an ethics committee. ")
+
+SHELL = """<!doctype html><html><head><title>Portal page {n}</title>
+<link rel="stylesheet" href="/font/{n}.css"><style>@font-face {{font-family: x; src: url(/font/{n}.woff2)}}</style>
+</head><body><header>Department of IT</header><main id="content">Loading…</main>
+{images}<video src="/media/{n}.mp4" autoplay muted></video>
+<script>
+fetch("/api/{n}").then(r => r.json()).then(d => {{
+  document.getElementById("content").innerHTML = d.paragraphs.map(p => "<p>" + p + "</p>").join("");
+  document.body.setAttribute("data-ready", "1");
+}});
+</script></body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    asset_delay = 0.15
+    api_delay = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        kind, _, name = self.path.strip("/").partition("/")
+        n = name.split(".")[0].split("-")[0]
+        if kind == "page":
+            images = "".join(f'<img src="/img/{n}-{i}.png">' for i in range(6))
+            self._send(SHELL.format(n=n, images=images).encode(), "text/html; charset=utf-8")
+        elif kind == "api":
+            time.sleep(self.api_delay)
+            self._send(json.dumps({"paragraphs": [f"{PARAGRAPH} Notification {n}.{i}." for i in range(8)]}).encode(),
+                       "application/json")
+        elif kind in ("img", "font", "media"):
+            time.sleep(self.asset_delay)
+            self._send(b"\0" * 20000, "application/octet-stream")
+        else:
+            self.send_error(404)
+
+
+def serve(asset_ms: float, api_ms: float) -> ThreadingHTTPServer:
+    FixtureHandler.asset_delay = asset_ms / 1000
+    FixtureHandler.api_delay = api_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def chromium_rss() -> int:
+    """Bytes resident in Chromium processes descended from this one."""
+    parents, names = {}, {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        names[int(pid)] = stat[stat.index("(") + 1:stat.rindex(")")]
+        parents[int(pid)] = int(stat[stat.rindex(")") + 2:].split()[1])
+
+    def descends(pid):
+        while pid > 1:
+            pid = parents.get(pid, 0)
+            if pid == os.getpid():
+                return True
+        return False
+
+    total = 0
+    for pid, name in names.items():
+        if ("chrom" in name or "headless" in name) and descends(pid):
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    total += next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+            except (OSError, StopIteration):
+                pass
+    return total
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000 if values else 0.0
+
+
+async def run(urls: list, browsers: int, contexts: int, block: bool, selector, timeout: float,
+              host_rate: float) -> dict:
+    pool = RenderPool(browsers=browsers, contexts=contexts, timeout=timeout, selector=selector,
+                      block=BLOCKED_RESOURCES if block else None,
+                      per_host_rate=host_rate, per_host_burst=max(1, int(host_rate)))
+    async with pool:
+        await pool.render(urls[0])   # first navigation warms the shared caches; untimed
+        start = time.perf_counter()
+        latencies, complete, peak = [], 0, 0
+        async for result in pool.render_many(urls):
+            latencies.append(result.elapsed)
+            if result.ok and len(parse_static(result.text)) >= 500:
+                complete += 1
+            if len(latencies) % 20 == 0:
+                peak = max(peak, chromium_rss())
+        elapsed = time.perf_counter() - start
+        peak = max(peak, chromium_rss())
+    return {"pages": len(urls), "complete": complete, "elapsed": elapsed, "latencies": latencies,
+            "rss_per_browser": peak / browsers, "stats": pool.stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--browsers", default="1,2,4", help="browser counts to compare")
+    parser.add_argument("--contexts", type=int, default=4)
+    parser.add_argument("--asset-ms", type=float, default=150, help="delay of each image/font/video")
+    parser.add_argument("--api-ms", type=float, default=50, help="delay of the XHR that fills the page")
+    parser.add_argument("--selector", default=None, help='wait for e.g. "body[data-ready]" instead of idle')
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--host-rate", type=float, default=1000.0,
+                        help="navigations/sec to the fixture server; lower it to see the per-host limit")
+    args = parser.parse_args()
+
+    server = serve(args.asset_ms, args.api_ms)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/page/{i}" for i in range(args.pages)]
+
+    print(f"{args.pages} pages, {args.contexts} contexts per browser, assets {args.asset_ms:.0f} ms, "
+          f"api {args.api_ms:.0f} ms, wait for {args.selector or 'network idle'}\n")
+    print(f"{'browsers':>8} {'block':>6} {'pages/min':>10} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'complete':>9} {'MB/browser':>11} {'blocked':>8} {'timeouts':>9}")
+    try:
+        for browsers in (int(b) for b in args.browsers.split(",")):
+            for block in (False, True):
+                r = asyncio.run(run(urls, browsers, args.contexts, block, args.selector, args.timeout,
+                                    args.host_rate))
+                print(f"{browsers:8} {'yes' if block else 'no':>6} {r['pages'] / r['elapsed'] * 60:10.0f} "
+                      f"{percentile(r['latencies'], 0.5):8.0f} {percentile(r['latencies'], 0.95):8.0f} "
+                      f"{r['complete']:>4}/{r['pages']:<4} {r['rss_per_browser'] / 1024 ** 2:11.0f} "
+                      f"{r['stats']['blocked']:8} {r['stats']['timeouts']:9}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
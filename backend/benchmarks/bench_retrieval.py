@@ -0,0 +1,169 @@
+"""Hybrid retrieval: recall@k and query latency of vector-only, BM25-only and RRF-fused search.
+
+Labelled queries and their target chunks come from fixtures/retrieval.json
+(initiative IDs like KA_3, IT Act sections, bill titles and a few topical
+questions). They are hidden among synthetic distractor chunks built from the
+same vocabulary. Vectors use the local HashingBackend in Qdrant's in-memory
+mode; with a real embedding model the identifier queries are harder for the
+vector side, not easier.
+
+    python benchmarks/bench_retrieval.py --distractors 10000
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.embedder import HashingBackend
+from processor.retriever import HybridRetriever
+from db.qdrant_client import QdrantStore, get_client
+from db.inverted_index import InvertedIndex
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "retrieval.json")
+
+STATES = ["Karnataka", "Kerala", "Tamil Nadu", "Telangana", "Maharashtra", "Uttar Pradesh", "Odisha"]
+PROGRAMS = ["AI Centre of Excellence", "Police crime analytics", "Startup Mission AI grants",
+            "AI Mission", "face recognition pilot", "AI for agriculture", "data exchange",
+            "e-governance chatbot", "machine learning for welfare delivery", "AI skilling programme"]
+TOPICS = ["Artificial Intelligence (Ethics)", "Digital India", "Data Protection (Amendment)",
+          "Online Safety", "Robotics (Liability)", "Algorithmic Accountability", "Deepfake (Labelling)"]
+FILLER = ["The department will publish guidelines for government use of artificial intelligence.",
+          "Startups get access to anonymised datasets and compute credits.",
+          "Police use machine learning to analyse crime records and CCTV footage.",
+          "The policy covers data governance, consent and transparency of AI systems.",
+          "A committee will review the impact on privacy and public order."]
+
+
+def load_fixtures(path=FIXTURES) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fixture_chunks(fixtures: dict) -> list:
+    return [{"chunk_id": f"fx-{d['id']}", "url": f"https://fixtures.local/{d['id']}", "state": d["state"],
+             "source": d["source"], "title": d["title"], "text": d["text"]} for d in fixtures["docs"]]
+
+
+def distractors(n: int, fixtures: dict, rng: random.Random) -> list:
+    """Chunks that share the fixtures' vocabulary but not their identifiers."""
+    taken = {d["title"].split()[0] for d in fixtures["docs"]}
+    out = []
+    while len(out) < n:
+        i = len(out)
+        kind = rng.random()
+        state = rng.choice(STATES)
+        if kind < 0.45:
+            code = f"{state[:2].upper()}_{rng.randint(1, 400)}"
+            if code in taken:
+                continue
+            title = f"{code} {state} {rng.choice(PROGRAMS)}"
+            text = f"{code}: {state} {rng.choice(PROGRAMS)}. {rng.choice(FILLER)} {rng.choice(FILLER)}"
+            source = "initiatives"
+        elif kind < 0.7:
+            section = f"{rng.randint(1, 90)}{rng.choice(['', 'B', 'C', 'D'])}"
+            if section in ("66A", "69A", "79"):
+                continue
+            title = f"Information Technology Act, Section {section}"
+            text = f"Section {section} of the Information Technology Act, 2000. {rng.choice(FILLER)}"
+            state, source = None, "PRS"
+        elif kind < 0.85:
+            title = f"The {rng.choice(TOPICS)} Bill, {rng.randint(2015, 2025)}"
+            text = f"{title} {rng.choice(FILLER).lower()} {rng.choice(FILLER)}"
+            state, source = None, "PRS"
+        else:
+            title = f"{state} AI policy update"
+            text = f"The {state} government {rng.choice(FILLER).lower()} {rng.choice(FILLER)}"
+            source = "state_portal"
+        out.append({"chunk_id": f"syn-{i}", "url": f"https://synthetic.local/{i}", "state": state,
+                    "source": source, "title": title, "text": text})
+    return out
+
+
+def recall(hits: list, relevant: set) -> float:
+    return len(relevant & {h["chunk_id"] for h in hits}) / len(relevant)
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distractors", type=int, default=10000)
+    parser.add_argument("--ks", default="1,5,10")
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over the queries")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    ks = [int(k) for k in args.ks.split(",")]
+
+    fixtures = load_fixtures()
+    chunks = fixture_chunks(fixtures) + distractors(args.distractors, fixtures, random.Random(args.seed))
+    backend = HashingBackend()
+    vectors = asyncio.run(backend.embed([c["text"] for c in chunks]))
+
+    store = QdrantStore("bench_retrieval", client=get_client(location=":memory:"))
+    if store.client.collection_exists(store.collection):
+        store.client.delete_collection(store.collection)
+    store.ensure_collection(backend.dim)
+    store.upsert_chunks(chunks, vectors, wait=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = InvertedIndex(tmp)
+        start = time.perf_counter()
+        for i in range(0, len(chunks), 1000):
+            index.add(chunks[i:i + 1000])
+            if index.flush_due():
+                index.flush()
+        index.flush()
+        build = time.perf_counter() - start
+        stats = index.stats()
+        hybrid = HybridRetriever(store, index, candidates=args.candidates)
+
+        queries = fixtures["queries"]
+        qvecs = asyncio.run(backend.embed([q["query"] for q in queries]))
+        depth = max(ks)
+        methods = {
+            "vector": lambda q, v: store.search(v, limit=depth, state=q.get("state")),
+            "bm25": lambda q, v: index.search(q["query"], limit=depth, state=q.get("state")),
+            "hybrid": lambda q, v: hybrid.search(v, limit=depth, query=q["query"], state=q.get("state")),
+        }
+        results, latency = {}, {}
+        for name, search in methods.items():
+            results[name] = [search(q, v) for q, v in zip(queries, qvecs)]
+            latency[name] = []
+            for _ in range(args.repeat):
+                for q, v in zip(queries, qvecs):
+                    t = time.perf_counter()
+                    search(q, v)
+                    latency[name].append(time.perf_counter() - t)
+
+    print(f"{len(chunks)} chunks ({args.distractors} distractors), {len(queries)} labelled queries")
+    print(f"keyword index: built in {build:.2f}s ({len(chunks) / build:,.0f} chunks/sec), "
+          f"{len(stats['segments'])} segments, {sum(s['postings'] for s in stats['segments'].values()):,} postings\n")
+    kinds = sorted({q["kind"] for q in queries})
+    print(f"{'method':8} {'kind':11}" + "".join(f" {'R@' + str(k):>6}" for k in ks))
+    for name in methods:
+        for kind in kinds + ["all"]:
+            rows = [(q, hits) for q, hits in zip(queries, results[name]) if kind in ("all", q["kind"])]
+            cells = [np.mean([recall(hits[:k], {f"fx-{r}" for r in q["relevant"]}) for q, hits in rows])
+                     for k in ks]
+            print(f"{name:8} {kind:11}" + "".join(f" {c:6.2f}" for c in cells))
+    print(f"\n{'method':8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, values in latency.items():
+        print(f"{name:8} {percentile(values, 0.5):8.2f} {percentile(values, 0.95):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
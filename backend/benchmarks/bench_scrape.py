@@ -0,0 +1,181 @@
+"""Scrape and ingest hot paths: ms per document and MB/s on saved HTML, PDF and DOCX fixtures.
+
+Each case replays fixtures through the function the scrapers call:
+
+    scrape_static        fixtures/html from a local http.server; cold (empty
+                         HttpCache each round) and warm (fresh cache hits)
+    parse_static         the same pages, extraction only, bs4 and lxml
+    html_to_text         JustAI post bodies (fixtures/justai/posts.json)
+    parse_bill_details   PRS bill pages, the parsing half of get_bill_details
+    extract_from_docx    an initiatives .docx (fixtures/docx)
+    extract_pages        a policy PDF through pdfplumber (fixtures/pdf)
+
+The cold scrape_static rounds run through an Instrument, so the report also
+shows where a fetch spends its time. --save keeps the numbers; --compare
+marks every case that got slower than a saved run by more than --tolerance.
+
+    python benchmarks/bench_scrape.py --rounds 20 --save /tmp/before.json
+    python benchmarks/bench_scrape.py --rounds 20 --compare /tmp/before.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, "scaper", "pdf-files"),
+             os.path.join(BACKEND_DIR, "scaper", "scraping", "justai"),
+             os.path.join(BACKEND_DIR, "scaper", "scraping", "prs")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from scraper.http_cache import HttpCache
+from scraper.instrument import Instrument
+from scraper.run import scrape_static, parse_static
+from ingest import html_to_text
+from prs import parse_bill_details
+from docx_to_index import extract_from_docx
+from ingestion import extract_pages, page_count
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000
+
+
+def run(fn, items: list, rounds: int, setup=None) -> dict:
+    """items are (argument, size in bytes); fn(argument) once per item per round."""
+    latencies, elapsed = [], 0.0
+    fn(items[0][0])     # imports and lazy compiles happen here, untimed
+    for r in range(rounds):
+        if setup:
+            setup(r)
+        for arg, _ in items:
+            start = time.perf_counter()
+            fn(arg)
+            latencies.append(time.perf_counter() - start)
+        elapsed += sum(latencies[-len(items):])
+    size = sum(n for _, n in items) * rounds
+    return {"docs": len(items), "ms_per_doc": elapsed / len(latencies) * 1000,
+            "p50_ms": percentile(latencies, 0.5), "p95_ms": percentile(latencies, 0.95),
+            "mb_per_sec": size / elapsed / 1024 ** 2}
+
+
+def cases(base_url: str, tmp: str, instrument: Instrument) -> dict:
+    pages = sorted(glob.glob(os.path.join(FIXTURES, "html", "*.html")))
+    html = [(read(p), os.path.getsize(p)) for p in pages]
+    urls = [(f"{base_url}/{os.path.basename(p)}", os.path.getsize(p)) for p in pages]
+
+    posts = json.loads(read(os.path.join(FIXTURES, "justai", "posts.json")))
+    bodies = [(p["content"]["rendered"], len(p["content"]["rendered"].encode())) for p in posts]
+    bills = [(read(p), os.path.getsize(p)) for p in sorted(glob.glob(os.path.join(FIXTURES, "prs", "*.html")))]
+    docx = [(p, os.path.getsize(p)) for p in sorted(glob.glob(os.path.join(FIXTURES, "docx", "*.docx")))]
+    pdfs = [(p, os.path.getsize(p)) for p in sorted(glob.glob(os.path.join(FIXTURES, "pdf", "*.pdf")))]
+
+    cold = {}
+
+    def fresh_cache(r):
+        # every round starts without a cached copy, so each call goes to the server
+        if "cache" in cold:
+            cold["cache"].close()
+        cold["cache"] = HttpCache(os.path.join(tmp, f"cold-{r}"))
+
+    fresh_cache(-1)
+    warm = HttpCache(os.path.join(tmp, "warm"))
+
+    return {
+        "scrape_static cold": (lambda u: scrape_static(u, cache=cold["cache"], instrument=instrument),
+                               urls, fresh_cache),
+        "scrape_static warm": (lambda u: scrape_static(u, cache=warm), urls, None),
+        "parse_static bs4": (parse_static, html, None),
+        "parse_static lxml": (functools.partial(parse_static, parser="lxml"), html, None),
+        "html_to_text": (html_to_text, bodies, None),
+        "parse_bill_details": (parse_bill_details, bills, None),
+        "extract_from_docx": (lambda p: extract_from_docx(p, "Karnataka"), docx, None),
+        "extract_pages": (lambda p: extract_pages(p, 0, page_count(p)), pdfs, None),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    print(f"\n{'case':22} {'before ms':>10} {'now ms':>10} {'change':>8}")
+    slower = 0
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["ms_per_doc"]
+        change = r["ms_per_doc"] / before - 1 if before else 0.0
+        flag = "  REGRESSION" if change > tolerance else ""
+        slower += bool(flag)
+        print(f"{name:22} {before:10.3f} {r['ms_per_doc']:10.3f} {change:+8.1%}{flag}")
+    print(f"\n{slower} case(s) slower than the baseline by more than {tolerance:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--only", default=None, help="comma-separated case names (prefix match)")
+    parser.add_argument("--save", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="a --save file from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    server = serve(os.path.join(FIXTURES, "html"))
+    instrument = Instrument(log_path=None)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            selected = cases(f"http://127.0.0.1:{server.server_address[1]}", tmp, instrument)
+            if args.only:
+                prefixes = args.only.split(",")
+                selected = {k: v for k, v in selected.items() if any(k.startswith(p) for p in prefixes)}
+
+            print(f"{args.rounds} rounds\n")
+            print(f"{'case':22} {'docs':>5} {'ms/doc':>9} {'p50 ms':>9} {'p95 ms':>9} {'MB/s':>8}")
+            for name, (fn, items, setup) in selected.items():
+                if not items:
+                    print(f"{name:22}  no fixtures")
+                    continue
+                r = results[name] = run(fn, items, args.rounds, setup)
+                print(f"{name:22} {r['docs']:5} {r['ms_per_doc']:9.3f} {r['p50_ms']:9.3f} "
+                      f"{r['p95_ms']:9.3f} {r['mb_per_sec']:8.3f}")
+    finally:
+        server.shutdown()
+
+    if instrument.histograms["total"].n:
+        print(f"\nscrape_static cold, per stage\n{instrument.report()}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults → {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f), args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Raw document storage: one pretty-printed JSON file per URL vs scraper/store.py.
+
+Reports write time, full-corpus read (directory walk vs sequential segment
+scan), random reads by URL, bytes on disk and file count.
+
+    python benchmarks/bench_store.py --docs 20000
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.store import RawStore
+from benchmarks.bench_chunker import synthetic_doc
+
+
+def legacy_path(root: str, doc: dict) -> str:
+    # scraper/run.py save_page() before scraper/store.py
+    folder = os.path.join(root, doc["state"].lower().replace(' ', '_').replace('&', 'and'))
+    return os.path.join(folder, hashlib.md5(doc["url"].encode()).hexdigest()[:12] + ".json")
+
+
+def legacy_write(root: str, docs):
+    for doc in docs:
+        path = legacy_path(root, doc)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False, indent=2)
+
+
+def legacy_scan(root: str):
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            with open(os.path.join(dirpath, name), encoding="utf-8") as f:
+                yield json.load(f)
+
+
+def disk_usage(root: str) -> tuple:
+    total = files = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            total += os.path.getsize(os.path.join(dirpath, name))
+            files += 1
+    return total, files
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:18} {time.perf_counter() - start:7.2f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--segment-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [synthetic_doc(i, rng) for i in range(args.docs)]
+    sample = [d["url"] for d in rng.sample(docs, min(args.reads, len(docs)))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_root = os.path.join(tmp, "raw")
+        print(f"{args.docs} documents\n\nper-URL JSON files")
+        timed("write", lambda: legacy_write(legacy_root, docs))
+        n = timed("full read (walk)", lambda: sum(1 for _ in legacy_scan(legacy_root)))
+        by_url = {d["url"]: legacy_path(legacy_root, d) for d in docs}
+        timed(f"{len(sample)} random reads", lambda: [json.load(open(by_url[u], encoding="utf-8"))
+                                                      for u in sample])
+        size, files = disk_usage(legacy_root)
+        print(f"  {'on disk':18} {size / 1e6:7.1f} MB in {files} files")
+
+        print("\nsegment store")
+        with RawStore(os.path.join(tmp, "store"), segment_bytes=args.segment_mb * 1024 ** 2,
+                      writer=True) as store:
+            timed("write", lambda: store.put_many(docs))
+            m = timed("full read (scan)", lambda: sum(1 for _ in store.scan()))
+            timed(f"{len(sample)} random reads", lambda: [store.get(u) for u in sample])
+            # a re-scrape of half the corpus leaves superseded versions behind
+            store.put_many(docs[: len(docs) // 2])
+            timed("compact", store.compact)
+        size, files = disk_usage(os.path.join(tmp, "store"))
+        print(f"  {'on disk':18} {size / 1e6:7.1f} MB in {files} files")
+        assert n == m == len(docs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+from collections import Counter
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.normalizer import normalize_text
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+INDEX_DIR = os.path.join(DATA_DIR, "keyword_index")
+MANIFEST = "manifest.json"
+
+DEFAULT_FLUSH_CHUNKS = 4096
+DEFAULT_MAX_SEGMENTS = 8
+DEFAULT_RELOAD_EVERY = 5.0
+
+# BM25 parameters (Robertson/Lucene defaults)
+K1 = 1.2
+B = 0.75
+
+# per-chunk fields kept next to the postings, enough to filter and to fetch the payload
+DOC_FIELDS = ("chunk_id", "url", "doc_hash", "state", "source", "page_type", "title")
+FILTER_FIELDS = ("state", "source", "page_type")
+
+# whole words, so identifiers survive as one term: "KA_3" -> "ka_3", "Section 43A" -> "section", "43a"
+_TERM = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was "
+    "were will with what which who how does do".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Index-side terms. Chunk text is already normalized by the refresh pipeline."""
+    return [t for t in _TERM.findall(text.lower()) if t not in STOPWORDS]
+
+
+def query_terms(query: str) -> list:
+    """Unique terms of a user query, normalized the way chunk text was."""
+    return list(dict.fromkeys(tokenize(normalize_text(query, keep_lines=False))))
+
+
+class Segment:
+    """One immutable slice of the index; every array is memory-mapped.
+
+    <name>.terms.json    sorted vocabulary
+    <name>.offsets.npy   int64, term i's postings are [offsets[i], offsets[i + 1])
+    <name>.postings.npy  int32 local chunk ids, ascending within a term
+    <name>.tf.npy        uint16 term frequencies, parallel to postings
+    <name>.len.npy       int32 chunk lengths in terms
+    <name>.live.npy      bool, cleared in place when a chunk is deleted
+    <name>.docs.jsonl    DOC_FIELDS per chunk
+    """
+
+    def __init__(self, directory: str, name: str, writable=False):
+        self.name = name
+        base = os.path.join(directory, name)
+        with open(base + ".terms.json", encoding="utf-8") as f:
+            self.vocab = {t: i for i, t in enumerate(json.load(f))}
+        self.offsets = np.load(base + ".offsets.npy", mmap_mode="r")
+        self.postings = np.load(base + ".postings.npy", mmap_mode="r")
+        self.tfs = np.load(base + ".tf.npy", mmap_mode="r")
+        self.lengths = np.load(base + ".len.npy", mmap_mode="r")
+        self.live = np.load(base + ".live.npy", mmap_mode="r+" if writable else "r")
+        with open(base + ".docs.jsonl", encoding="utf-8") as f:
+            self.docs = [json.loads(line) for line in f]
+        self.fields = {k: np.array([d.get(k) or "" for d in self.docs]) for k in FILTER_FIELDS}
+        self.norm = None   # K1 * (1 - B + B * len / avgdl), set by InvertedIndex
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def span(self, term: str):
+        i = self.vocab.get(term)
+        if i is None:
+            return None
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def df(self, term: str) -> int:
+        span = self.span(term)
+        return span[1] - span[0] if span else 0
+
+    def mask(self, filters: dict):
+        mask = np.array(self.live, dtype=bool)
+        for key, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                mask &= np.isin(self.fields[key], list(value))
+            else:
+                mask &= self.fields[key] == value
+        return mask
+
+    @staticmethod
+    def files(directory: str, name: str) -> list:
+        return [os.path.join(directory, name + ext) for ext in
+                (".terms.json", ".offsets.npy", ".postings.npy", ".tf.npy", ".len.npy", ".live.npy", ".docs.jsonl")]
+
+    @staticmethod
+    def write(directory: str, name: str, docs: list, postings: dict, lengths):
+        """`postings`: term -> (ids, tfs) arrays. Written before the manifest names the segment."""
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[t][0]) for t in terms])
+        base = os.path.join(directory, name)
+        with open(base + ".terms.json", "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+        np.save(base + ".offsets.npy", offsets)
+        np.save(base + ".postings.npy", np.concatenate([postings[t][0] for t in terms]).astype(np.int32)
+                if terms else np.zeros(0, dtype=np.int32))
+        np.save(base + ".tf.npy", np.concatenate([postings[t][1] for t in terms]).astype(np.uint16)
+                if terms else np.zeros(0, dtype=np.uint16))
+        np.save(base + ".len.npy", np.asarray(lengths, dtype=np.int32))
+        np.save(base + ".live.npy", np.ones(len(docs), dtype=bool))
+        with open(base + ".docs.jsonl", "w", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+
+class InvertedIndex:
+    """BM25 keyword index over chunk text, built incrementally from disk segments.
+
+    add() buffers chunks; flush() writes them out as a new immutable segment
+    and publishes it in the manifest, so chunks become searchable at flush.
+    delete_doc() tombstones a page's chunks in the memory-mapped live masks,
+    and a flush that leaves more than `max_segments` segments merges the
+    smallest ones, dropping tombstones. Document frequencies count every
+    chunk still in a segment, deleted or not, until it is merged away.
+
+    One writer process at a time; readers (read_only=True) pick up new
+    segments by re-reading the manifest at most every `reload_every` seconds.
+    """
+
+    def __init__(self, directory=INDEX_DIR, read_only=False, flush_chunks=DEFAULT_FLUSH_CHUNKS,
+                 max_segments=DEFAULT_MAX_SEGMENTS, reload_every=DEFAULT_RELOAD_EVERY):
+        self.directory = directory
+        self.read_only = read_only
+        self.flush_chunks = flush_chunks
+        self.max_segments = max_segments
+        self.reload_every = reload_every
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.segments = []
+        self.by_url = {}          # url -> [(segment name, local id)]
+        self.buffer = []          # [(doc fields, Counter of terms, length)]
+        self.next_segment = 1
+        self.total_docs = 0
+        self.avgdl = 0.0
+        self._mtime = None
+        self._checked = 0.0
+        self.reload()
+
+    @staticmethod
+    def exists(directory=INDEX_DIR) -> bool:
+        return os.path.exists(os.path.join(directory, MANIFEST))
+
+    # --- manifest ---
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def reload(self):
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return
+        mtime = os.path.getmtime(path)
+        if mtime == self._mtime:
+            return
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        with self._lock:
+            current = {s.name: s for s in self.segments}
+            self.segments = [current.get(name) or Segment(self.directory, name, not self.read_only)
+                             for name in manifest["segments"]]
+            self.next_segment = manifest["next_segment"]
+            self._mtime = mtime
+            self._reindex(urls=not self.read_only)
+
+    def _maybe_reload(self):
+        if self.read_only and time.monotonic() - self._checked >= self.reload_every:
+            self._checked = time.monotonic()
+            self.reload()
+
+    def _publish(self):
+        manifest = {"segments": [s.name for s in self.segments], "next_segment": self.next_segment,
+                    "chunks": self.total_docs, "updated_at": time.time()}
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path())
+        self._mtime = os.path.getmtime(self._manifest_path())
+
+    def _map_urls(self, segments):
+        for seg in segments:
+            for i in np.flatnonzero(seg.live):
+                self.by_url.setdefault(seg.docs[i]["url"], []).append((seg.name, int(i)))
+
+    def _reindex(self, urls=True):
+        # live chunk count and length normalization after any change to the segments;
+        # the url map (writer only) is rebuilt here and extended in place by flush()
+        if urls:
+            self.by_url = {}
+            self._map_urls(self.segments)
+        total, length = 0, 0
+        for seg in self.segments:
+            live = np.asarray(seg.live, dtype=bool)
+            total += int(np.count_nonzero(live))
+            length += int(np.asarray(seg.lengths)[live].sum())
+        self.total_docs = total
+        self.avgdl = length / total if total else 0.0
+        for seg in self.segments:
+            seg.norm = K1 * (1 - B + B * np.asarray(seg.lengths, dtype=np.float32) / (self.avgdl or 1.0))
+
+    # --- writes ---
+
+    def add(self, chunks) -> int:
+        n = 0
+        for chunk in chunks:
+            terms = tokenize(chunk.get("text") or "")
+            self.buffer.append(({k: chunk.get(k) for k in DOC_FIELDS}, Counter(terms), len(terms)))
+            n += 1
+        return n
+
+    def flush_due(self) -> bool:
+        return len(self.buffer) >= self.flush_chunks
+
+    def delete_doc(self, url: str) -> int:
+        """Tombstone every chunk of a page, buffered or flushed."""
+        before = len(self.buffer)
+        self.buffer = [b for b in self.buffer if b[0]["url"] != url]
+        removed = before - len(self.buffer)
+        by_name = {s.name: s for s in self.segments}
+        for name, i in self.by_url.pop(url, []):
+            by_name[name].live[i] = False
+            removed += 1
+        return removed
+
+    def _name(self) -> str:
+        name = f"seg-{self.next_segment:06d}"
+        self.next_segment += 1
+        return name
+
+    def flush(self) -> int:
+        """Write buffered chunks as a new segment; returns how many."""
+        if self.read_only:
+            raise RuntimeError("read-only index")
+        for seg in self.segments:
+            seg.live.flush()
+        buffered, self.buffer = self.buffer, []
+        if buffered:
+            postings = {}
+            for i, (_, counts, _) in enumerate(buffered):
+                for term, tf in counts.items():
+                    postings.setdefault(term, ([], []))
+                    postings[term][0].append(i)
+                    postings[term][1].append(min(tf, 65535))
+            name = self._name()
+            Segment.write(self.directory, name, [b[0] for b in buffered],
+                          {t: (np.asarray(ids), np.asarray(tfs)) for t, (ids, tfs) in postings.items()},
+                          [b[2] for b in buffered])
+            segment = Segment(self.directory, name, writable=True)
+            with self._lock:
+                self.segments = self.segments + [segment]
+                self._map_urls([segment])
+        # segments whose chunks were all re-indexed or deleted go without a rewrite
+        dead = [s.name for s in self.segments if not s.live.any()]
+        with self._lock:
+            self.segments = [s for s in self.segments if s.name not in dead]
+            self._reindex(urls=False)   # new chunks and tombstones both change the stats
+        if len(self.segments) > self.max_segments:
+            # merge the smaller half, so big segments are rewritten only rarely
+            by_size = sorted(self.segments, key=len)
+            self.merge(by_size[:len(by_size) // 2 + 1])
+        else:
+            self._publish()
+        self._remove(dead)
+        return len(buffered)
+
+    def _remove(self, names):
+        # readers that still map the old files keep them until they reload
+        for name in names:
+            for path in Segment.files(self.directory, name):
+                os.remove(path)
+
+    def merge(self, segments=None) -> dict:
+        """Rewrite `segments` (default: all) as one segment without their deleted chunks."""
+        if self.read_only:
+            raise RuntimeError("read-only index")
+        segments = list(self.segments if segments is None else segments)
+        if not segments:
+            return {"merged": 0, "dropped": 0}
+        docs, lengths, parts = [], [], {}
+        for seg in segments:
+            live = np.asarray(seg.live, dtype=bool)
+            # local id -> id in the merged segment, -1 for deleted chunks
+            remap = np.where(live, np.cumsum(live) - 1 + len(docs), -1).astype(np.int64)
+            for term, i in seg.vocab.items():
+                start, end = int(seg.offsets[i]), int(seg.offsets[i + 1])
+                ids = remap[seg.postings[start:end]]
+                keep = ids >= 0
+                if keep.any():
+                    parts.setdefault(term, []).append((ids[keep], seg.tfs[start:end][keep]))
+            docs.extend(d for d, alive in zip(seg.docs, live) if alive)
+            lengths.extend(np.asarray(seg.lengths)[live].tolist())
+
+        name = self._name()
+        Segment.write(self.directory, name, docs,
+                      {t: (np.concatenate([p[0] for p in ps]), np.concatenate([p[1] for p in ps]))
+                       for t, ps in parts.items()}, lengths)
+        merged = Segment(self.directory, name, writable=True)
+        gone = {s.name for s in segments}
+        with self._lock:
+            # the merged segment takes the place of the first one it replaces
+            first = min(i for i, s in enumerate(self.segments) if s.name in gone)
+            rest = [s for s in self.segments if s.name not in gone]
+            self.segments = rest[:first] + [merged] + rest[first:]
+            self._reindex()
+        self._publish()
+        self._remove(gone)
+        return {"merged": len(segments), "chunks": len(docs),
+                "dropped": sum(len(s) for s in segments) - len(docs)}
+
+    # --- reads ---
+
+    def search(self, query: str, limit=10, state=None, source=None, page_type=None) -> list:
+        """Top `limit` live chunks by BM25, restricted to the given state/source/page_type
+        (a value or a list of values) before scoring."""
+        self._maybe_reload()
+        terms = query_terms(query)
+        segments, n = self.segments, self.total_docs
+        if not terms or not n:
+            return []
+        filters = {k: v for k, v in (("state", state), ("source", source), ("page_type", page_type))
+                   if v is not None}
+        idf = {}
+        for term in terms:
+            df = sum(seg.df(term) for seg in segments)
+            if df:
+                idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+        found = []
+        for seg in segments:
+            scores = None
+            for term, weight in idf.items():
+                span = seg.span(term)
+                if span is None:
+                    continue
+                ids = seg.postings[span[0]:span[1]]
+                tf = seg.tfs[span[0]:span[1]].astype(np.float32)
+                if scores is None:
+                    scores = np.zeros(len(seg), dtype=np.float32)
+                # ids are unique within a term, so fancy-index += is safe
+                scores[ids] += weight * tf * (K1 + 1) / (tf + seg.norm[ids])
+            if scores is None:
+                continue
+            candidates = np.flatnonzero(seg.mask(filters) & (scores > 0))
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            found.extend((float(scores[i]), seg, int(i)) for i in candidates)
+
+        found.sort(key=lambda f: -f[0])
+        return [{"score": score, **seg.docs[i]} for score, seg, i in found[:limit]]
+
+    # --- maintenance ---
+
+    def stats(self) -> dict:
+        return {"chunks": self.total_docs, "urls": len(self.by_url), "buffered": len(self.buffer),
+                "avg_terms": round(self.avgdl, 1),
+                "segments": {s.name: {"chunks": len(s), "live": int(np.count_nonzero(s.live)),
+                                      "terms": len(s.vocab), "postings": len(s.postings)}
+                             for s in self.segments}}
+
+    def close(self):
+        if not self.read_only and (self.buffer or self.segments):
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 keyword index over chunk text")
+    parser.add_argument("command", choices=["stats", "merge", "search"])
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--dir", default=INDEX_DIR)
+    parser.add_argument("--state", default=None)
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if not InvertedIndex.exists(args.dir):
+        sys.exit(f"no index at {args.dir}")
+    if args.command == "search":
+        index = InvertedIndex(args.dir, read_only=True)
+        for hit in index.search(args.query, args.limit, state=args.state, source=args.source):
+            print(f"{hit['score']:7.3f}  {hit['chunk_id']}  {hit.get('state') or '-':15} {hit['url']}")
+        return
+    with InvertedIndex(args.dir) as index:
+        if args.command == "merge":
+            print(index.merge())
+        json.dump(index.stats(), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
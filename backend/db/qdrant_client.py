@@ -0,0 +1,200 @@
+import os
+import uuid
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+QDRANT_DIR = os.path.join(DATA_DIR, "qdrant")
+
+COLLECTION = "legal_chunks"
+
+# fixed namespace so a chunk_id always maps to the same point id
+POINT_NAMESPACE = uuid.UUID("6f1c52a2-8d0e-4b8e-9a57-3f4f0e1c2d11")
+
+KEYWORD_FIELDS = ["state", "source", "page_type", "url", "doc_hash"]
+DATETIME_FIELDS = ["published_date"]
+
+PAYLOAD_FIELDS = ["chunk_id", "doc_hash", "url", "title", "state", "source", "page_type",
+                  "published_date", "ordinal", "text"]
+
+
+def resolve_target(location=None, url=None, path=None, api_key=None) -> dict:
+    """Explicit arguments first, then QDRANT_URL, then QDRANT_PATH, then data/qdrant.
+
+    The pipeline and the API both resolve through here, so with nothing set
+    they read and write the same on-disk index. That is Qdrant's local mode,
+    which only one process can open at a time: run a refresh and serve the
+    API together only against a server, with QDRANT_URL set for both.
+    There is no silent in-memory fallback; benchmarks ask for
+    location=":memory:" explicitly.
+    """
+    if not (location or url or path):
+        url = os.environ.get("QDRANT_URL")
+        path = None if url else os.environ.get("QDRANT_PATH", QDRANT_DIR)
+        api_key = api_key or os.environ.get("QDRANT_API_KEY")
+    return {"location": location, "url": url, "path": path, "api_key": api_key}
+
+
+def is_local(client) -> bool:
+    """Local mode (in-process, on disk or in memory) rather than a server."""
+    options = client.init_options
+    return options.get("location") == ":memory:" or bool(options.get("path"))
+
+
+def is_in_memory(client) -> bool:
+    return client.init_options.get("location") == ":memory:"
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(location=None, url=None, path=None, api_key=None) -> QdrantClient:
+    """One client per target (see resolve_target), shared by everything in the process."""
+    return QdrantClient(**resolve_target(location, url, path, api_key))
+
+
+def point_id(chunk_id: str) -> str:
+    return str(uuid.uuid5(POINT_NAMESPACE, chunk_id))
+
+
+class QdrantStore:
+
+    def __init__(self, collection=COLLECTION, client=None):
+        self.collection = collection
+        self.client = client or get_client()
+        # local mode keeps everything in this process; threads buy nothing there
+        self.local = is_local(self.client)
+        self.in_memory = is_in_memory(self.client)
+
+    def ensure_collection(self, dim: int, distance=models.Distance.COSINE, on_disk=False):
+        if not self.client.collection_exists(self.collection):
+            self.client.create_collection(
+                self.collection,
+                vectors_config=models.VectorParams(size=dim, distance=distance, on_disk=on_disk),
+            )
+        self.create_payload_indexes()
+
+    def create_payload_indexes(self):
+        if self.local:
+            return  # local mode filters by scanning and warns on index creation
+        for field in KEYWORD_FIELDS:
+            self.client.create_payload_index(self.collection, field, models.PayloadSchemaType.KEYWORD)
+        for field in DATETIME_FIELDS:
+            self.client.create_payload_index(self.collection, field, models.PayloadSchemaType.DATETIME)
+
+    @staticmethod
+    def to_points(chunks, vectors) -> list:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return [
+            models.PointStruct(
+                id=point_id(chunk["chunk_id"]),
+                vector=vector.tolist(),
+                payload={k: chunk[k] for k in PAYLOAD_FIELDS if chunk.get(k) is not None},
+            )
+            for chunk, vector in zip(chunks, vectors)
+        ]
+
+    def upsert_chunks(self, chunks, vectors, batch_size=256, parallel=4, wait=False) -> int:
+        """Upsert chunks in batches; re-ingesting a chunk overwrites its point.
+
+        `wait=False` returns as soon as Qdrant has accepted each batch, which is
+        what bulk ingest wants; pass `wait=True` when the caller queries right after.
+        """
+        chunks = list(chunks)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        batches = [(chunks[i:i + batch_size], vectors[i:i + batch_size])
+                   for i in range(0, len(chunks), batch_size)]
+
+        def send(batch):
+            self.client.upsert(self.collection, points=self.to_points(*batch), wait=wait)
+            return len(batch[0])
+
+        if self.local or parallel <= 1:
+            return sum(send(b) for b in batches)
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            return sum(pool.map(send, batches))
+
+    def delete_doc(self, url: str):
+        """Drop every chunk of a document, e.g. before re-ingesting a changed version."""
+        self.client.delete(
+            self.collection,
+            points_selector=models.FilterSelector(filter=models.Filter(must=[
+                models.FieldCondition(key="url", match=models.MatchValue(value=url))
+            ])),
+        )
+
+    @staticmethod
+    def build_filter(state=None, source=None, page_type=None, published_after=None,
+                     published_before=None):
+        must = []
+        for key, value in (("state", state), ("source", source), ("page_type", page_type)):
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                must.append(models.FieldCondition(key=key, match=models.MatchAny(any=list(value))))
+            else:
+                must.append(models.FieldCondition(key=key, match=models.MatchValue(value=value)))
+        if published_after or published_before:
+            must.append(models.FieldCondition(
+                key="published_date",
+                range=models.DatetimeRange(gte=published_after, lte=published_before),
+            ))
+        return models.Filter(must=must) if must else None
+
+    def search(self, vector, limit=5, state=None, source=None, page_type=None,
+               published_after=None, published_before=None, score_threshold=None) -> list:
+        query_filter = self.build_filter(state, source, page_type, published_after, published_before)
+        resp = self.client.query_points(
+            self.collection,
+            query=np.asarray(vector, dtype=np.float32).tolist(),
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=True,
+            score_threshold=score_threshold,
+        )
+        return [{"id": p.id, "score": p.score, **(p.payload or {})} for p in resp.points]
+
+    def get_chunks(self, chunk_ids) -> dict:
+        """chunk_id -> payload for the chunks that exist."""
+        points = self.client.retrieve(self.collection, ids=[point_id(c) for c in chunk_ids], with_payload=True)
+        return {p.payload["chunk_id"]: {"id": p.id, **p.payload} for p in points if p.payload}
+
+    def count(self) -> int:
+        return self.client.count(self.collection, exact=True).count
+
+
+def get_async_client(location=None, url=None, path=None, api_key=None) -> AsyncQdrantClient:
+    """Same target resolution as get_client(). Not cached: the API creates one
+    in its lifespan and closes it on shutdown."""
+    return AsyncQdrantClient(**resolve_target(location, url, path, api_key))
+
+
+class AsyncQdrantSearch:
+    """QdrantStore.search() on an AsyncQdrantClient, for request handlers."""
+
+    def __init__(self, client: AsyncQdrantClient, collection=COLLECTION):
+        self.client = client
+        self.collection = collection
+
+    async def search(self, vector, limit=5, state=None, source=None, page_type=None,
+                     published_after=None, published_before=None, score_threshold=None, query=None) -> list:
+        # `query` (the question text) is only used by the hybrid retriever
+        query_filter = QdrantStore.build_filter(state, source, page_type, published_after, published_before)
+        resp = await self.client.query_points(
+            self.collection,
+            query=np.asarray(vector, dtype=np.float32).tolist(),
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=True,
+            score_threshold=score_threshold,
+        )
+        return [{"id": p.id, "score": p.score, **(p.payload or {})} for p in resp.points]
+
+    async def get_chunks(self, chunk_ids) -> dict:
+        points = await self.client.retrieve(self.collection, ids=[point_id(c) for c in chunk_ids],
+                                            with_payload=True)
+        return {p.payload["chunk_id"]: {"id": p.id, **p.payload} for p in points if p.payload}
+
+    async def close(self):
+        await self.client.close()
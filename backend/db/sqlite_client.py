@@ -0,0 +1,277 @@
+import os
+import json
+import sqlite3
+import argparse
+import functools
+from datetime import datetime
+
+from sqlalchemy import (
+    Column, Index, Integer, MetaData, String, Table, Text, create_engine, event, select,
+)
+from sqlalchemy.dialects.sqlite import insert
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+DB_FILE = os.path.join(DATA_DIR, "legalbot.db")
+
+metadata = MetaData()
+
+sources = Table(
+    "sources", metadata,
+    Column("url", String, primary_key=True),
+    Column("state", String),
+    Column("type", String),             # static_html / js_rendered / pdf / error: ...
+    Column("classified_at", String),
+    Index("ix_sources_state", "state"),
+    Index("ix_sources_type", "type"),
+)
+
+documents = Table(
+    "documents", metadata,
+    Column("url", String, primary_key=True),
+    Column("state", String),
+    Column("source", String),           # state_portal / JustAI / PRS / initiatives
+    Column("doc_type", String),         # html / pdf / web / wp_post
+    Column("initiative_id", String),
+    Column("title", Text),
+    Column("status", String),           # pending / success / updated / unchanged / empty / irrelevant / failed
+    Column("content_hash", String),
+    Column("indexed_hash", String),
+    Column("file", String),
+    Column("processed_pages", Integer, default=0),
+    Column("fetched_at", String),
+    Column("changed_at", String),
+    Column("error", Text),
+    Index("ix_documents_state_status", "state", "status"),
+    Index("ix_documents_type_status", "doc_type", "status"),
+    Index("ix_documents_changed_at", "changed_at"),
+)
+
+chunks = Table(
+    "chunks", metadata,
+    Column("chunk_id", String, primary_key=True),
+    Column("doc_url", String, nullable=False),
+    Column("doc_hash", String),
+    Column("ordinal", Integer),
+    Column("start", Integer),
+    Column("end", Integer),
+    Column("token_count", Integer),
+    Index("ix_chunks_doc_url", "doc_url"),
+)
+
+
+def _set_pragmas(dbapi_conn, _):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA busy_timeout=30000")
+    cur.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_engine(path=DB_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", _set_pragmas)
+    metadata.create_all(engine)
+    return engine
+
+
+def now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+class MetadataStore:
+    """Sources, documents and chunks in one SQLite file (WAL mode).
+
+    Writes are batched upserts (one executemany per call); reads go through
+    the url/state/status/changed_at indexes.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.engine = get_engine(path)
+
+    # --- writes ---
+
+    def _upsert(self, table, rows) -> int:
+        rows = [r for r in rows if r]
+        if not rows:
+            return 0
+        key = [c.name for c in table.primary_key.columns]
+        known = set(table.columns.keys())
+
+        # executemany needs identical keys per statement, so group partial rows
+        groups = {}
+        for row in rows:
+            row = {k: v for k, v in row.items() if k in known}
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        with self.engine.begin() as conn:
+            for cols, group in groups.items():
+                stmt = insert(table)
+                update = {c: stmt.excluded[c] for c in cols if c not in key}
+                stmt = stmt.on_conflict_do_update(index_elements=key, set_=update) if update \
+                    else stmt.on_conflict_do_nothing(index_elements=key)
+                conn.execute(stmt, group)
+        return len(rows)
+
+    def upsert_sources(self, rows) -> int:
+        return self._upsert(sources, rows)
+
+    def upsert_documents(self, rows) -> int:
+        return self._upsert(documents, rows)
+
+    def upsert_chunks(self, rows) -> int:
+        return self._upsert(chunks, rows)
+
+    def replace_chunks(self, doc_url: str, rows):
+        with self.engine.begin() as conn:
+            conn.execute(chunks.delete().where(chunks.c.doc_url == doc_url))
+        return self.upsert_chunks(rows)
+
+    def set_status(self, url: str, status: str, **fields):
+        with self.engine.begin() as conn:
+            conn.execute(documents.update().where(documents.c.url == url)
+                         .values(status=status, **fields))
+
+    # --- reads ---
+
+    def _rows(self, stmt) -> list:
+        with self.engine.connect() as conn:
+            return [dict(r._mapping) for r in conn.execute(stmt)]
+
+    def find_sources(self, state=None, source_type=None) -> list:
+        stmt = select(sources)
+        for col, value in ((sources.c.state, state), (sources.c.type, source_type)):
+            if isinstance(value, (list, tuple, set)):
+                stmt = stmt.where(col.in_(list(value)))
+            elif value is not None:
+                stmt = stmt.where(col == value)
+        return self._rows(stmt)
+
+    def get_document(self, url: str):
+        rows = self._rows(select(documents).where(documents.c.url == url))
+        return rows[0] if rows else None
+
+    def get_documents(self, urls) -> dict:
+        """url -> document row for every URL that is known."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        return {r["url"]: r for r in self._rows(select(documents).where(documents.c.url.in_(urls)))}
+
+    def find_documents(self, state=None, status=None, doc_type=None, source=None, limit=None) -> list:
+        stmt = select(documents)
+        for col, value in ((documents.c.state, state), (documents.c.status, status),
+                           (documents.c.doc_type, doc_type), (documents.c.source, source)):
+            if value is not None:
+                stmt = stmt.where(col == value)
+        if limit:
+            stmt = stmt.limit(limit)
+        return self._rows(stmt)
+
+    def pending_pdfs(self, state=None) -> list:
+        return self.find_documents(state=state, status="pending", doc_type="pdf")
+
+    def changed_since(self, since: str) -> list:
+        return self._rows(select(documents).where(documents.c.changed_at >= since)
+                          .order_by(documents.c.changed_at))
+
+    def unindexed(self) -> list:
+        """Documents whose current content has not been chunked and embedded."""
+        return self._rows(select(documents).where(
+            documents.c.content_hash.is_not(None),
+            (documents.c.indexed_hash.is_(None)) | (documents.c.indexed_hash != documents.c.content_hash),
+        ))
+
+    def chunks_for(self, doc_url: str) -> list:
+        return self._rows(select(chunks).where(chunks.c.doc_url == doc_url).order_by(chunks.c.ordinal))
+
+    # --- migration from the JSON files ---
+
+    def migrate_from_json(self, sources_file=None, pdf_queue=None, web_queue=None,
+                          raw_dir=None, justai_jsonl=None, hash_index=None) -> dict:
+        counts = {}
+
+        if sources_file and os.path.exists(sources_file):
+            with open(sources_file, encoding="utf-8") as f:
+                counts["sources"] = self.upsert_sources(
+                    {"url": s["url"], "state": s.get("state"), "type": s.get("type")}
+                    for s in json.load(f)
+                )
+
+        for path, doc_type in ((pdf_queue, "pdf"), (web_queue, "web")):
+            if path and os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    counts[f"{doc_type}_queue"] = self.upsert_documents(
+                        {"url": item["url"], "state": item.get("state"), "source": "initiatives",
+                         "doc_type": doc_type, "initiative_id": item.get("initiative_id"),
+                         "title": item.get("title"), "status": item.get("status", "pending"),
+                         "processed_pages": item.get("processed_pages", 0)}
+                        for item in json.load(f)
+                    )
+
+        if raw_dir and os.path.isdir(raw_dir):
+            rows = []
+            for root, _, files in os.walk(raw_dir):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    path = os.path.join(root, name)
+                    with open(path, encoding="utf-8") as f:
+                        doc = json.load(f)
+                    rows.append({"url": doc["url"], "state": doc.get("state"), "source": "state_portal",
+                                 "doc_type": "html", "status": "success", "content_hash": doc.get("hash"),
+                                 "file": path, "fetched_at": doc.get("scraped_at"),
+                                 "changed_at": doc.get("scraped_at")})
+                    if len(rows) >= 1000:
+                        counts["raw"] = counts.get("raw", 0) + self.upsert_documents(rows)
+                        rows = []
+            counts["raw"] = counts.get("raw", 0) + self.upsert_documents(rows)
+
+        if justai_jsonl and os.path.exists(justai_jsonl):
+            rows = []
+            with open(justai_jsonl, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    doc = json.loads(line)
+                    rows.append({"url": doc["url"], "source": doc.get("source", "JustAI"),
+                                 "doc_type": "wp_post", "title": doc.get("title"), "status": "success",
+                                 "fetched_at": doc.get("scraped_at"), "changed_at": doc.get("scraped_at")})
+            counts["justai"] = self.upsert_documents(rows)
+
+        if hash_index and os.path.exists(hash_index):
+            # content hashes from scaper/hasher.py's index; timestamps there are epoch seconds
+            conn = sqlite3.connect(hash_index)
+            rows = [{"url": url, "content_hash": digest, "indexed_hash": indexed,
+                     "changed_at": datetime.utcfromtimestamp(changed).isoformat() if changed else None}
+                    for url, digest, indexed, changed in conn.execute(
+                        "SELECT url, content_hash, indexed_hash, changed_at FROM pages")]
+            conn.close()
+            counts["hash_index"] = self.upsert_documents(rows)
+
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the legacy JSON state into SQLite")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--sources", default="scraper/sources_classified.json")
+    parser.add_argument("--pdf-queue", default=os.path.join(DATA_DIR, "pdf_queue.json"))
+    parser.add_argument("--web-queue", default=os.path.join(DATA_DIR, "web_queue.json"))
+    parser.add_argument("--raw-dir", default=os.path.join(DATA_DIR, "raw"))
+    parser.add_argument("--justai", default="scaper/scraping/justai/data/raw/justai_raw.jsonl")
+    parser.add_argument("--hash-index", default=os.path.join(DATA_DIR, "hash_index.db"))
+    args = parser.parse_args()
+
+    counts = MetadataStore(args.db).migrate_from_json(
+        sources_file=args.sources, pdf_queue=args.pdf_queue, web_queue=args.web_queue,
+        raw_dir=args.raw_dir, justai_jsonl=args.justai, hash_index=args.hash_index,
+    )
+    for name, n in counts.items():
+        print(f"{name:12} {n}")
+
+
+if __name__ == "__main__":
+    main()
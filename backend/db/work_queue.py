@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import socket
+
+from sqlalchemy import Column, Float, Index, Integer, String, Table, Text, UniqueConstraint, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from db.sqlite_client import DB_FILE, get_engine, metadata
+
+work_items = Table(
+    "work_items", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("queue", String, nullable=False),        # pdf / web
+    Column("url", String, nullable=False),
+    Column("payload", Text),                        # the original queue entry as JSON
+    Column("status", String, nullable=False),       # pending / leased / done / failed
+    Column("attempts", Integer, default=0),
+    Column("max_attempts", Integer, default=5),
+    Column("lease_owner", String),
+    Column("lease_expires", Float),
+    Column("available_at", Float, default=0.0),     # retry backoff
+    Column("processed_pages", Integer, default=0),  # PDF checkpoint
+    Column("last_error", Text),
+    Column("updated_at", Float),
+    UniqueConstraint("queue", "url", name="uq_work_items_queue_url"),
+    Index("ix_work_items_claim", "queue", "status", "available_at"),
+)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _item(row) -> dict:
+    item = dict(row._mapping)
+    item["payload"] = json.loads(item["payload"] or "{}")
+    return item
+
+
+class WorkQueue:
+    """Durable queue in SQLite with leases, retries and page checkpoints.
+
+    Workers `claim()` an item, which leases it for `lease_seconds`. A worker
+    that dies simply lets the lease lapse and the item is handed out again,
+    resuming from its last `checkpoint()`. Failed items are retried with
+    backoff up to `max_attempts`, then parked as "failed".
+    """
+
+    def __init__(self, name: str, path=DB_FILE, lease_seconds=300, max_attempts=5, retry_backoff=60):
+        self.name = name
+        self.path = path
+        self.engine = get_engine(path)
+        metadata.create_all(self.engine, tables=[work_items])
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def enqueue(self, items) -> int:
+        """Add items keyed by URL; items already queued (in any state) are left alone."""
+        now = time.time()
+        rows = [{"queue": self.name, "url": item["url"], "status": item.get("status", "pending"),
+                 "payload": json.dumps(item, ensure_ascii=False), "attempts": 0,
+                 "max_attempts": self.max_attempts, "available_at": 0.0,
+                 "processed_pages": item.get("processed_pages", 0), "updated_at": now}
+                for item in items]
+        if not rows:
+            return 0
+        stmt = insert(work_items).on_conflict_do_nothing(index_elements=["queue", "url"])
+        with self.engine.begin() as conn:
+            return conn.execute(stmt, rows).rowcount
+
+    def import_json(self, path: str) -> int:
+        """Carry over status and processed_pages from a legacy data/*_queue.json file."""
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+        for item in items:
+            if item.get("status") not in ("pending", "done", "failed"):
+                item["status"] = "pending"
+        return self.enqueue(items)
+
+    def claim(self, worker=None, lease_seconds=None):
+        """Atomically lease the next available item, or return None."""
+        worker = worker or worker_id()
+        now = time.time()
+        lease = now + (lease_seconds or self.lease_seconds)
+        t = work_items
+
+        available = (
+            select(t.c.id).where(
+                t.c.queue == self.name,
+                t.c.available_at <= now,
+                t.c.attempts < t.c.max_attempts,
+                (t.c.status == "pending") | ((t.c.status == "leased") & (t.c.lease_expires < now)),
+            ).order_by(t.c.id).limit(1).scalar_subquery()
+        )
+        stmt = (t.update().where(t.c.id == available)
+                .values(status="leased", lease_owner=worker, lease_expires=lease,
+                        attempts=t.c.attempts + 1, updated_at=now)
+                .returning(*t.c))
+
+        with self.engine.connect() as conn:
+            # take the write lock up front so concurrent claimers serialize here
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            self._reap(conn, now)
+            row = conn.execute(stmt).first()
+            conn.commit()
+        return _item(row) if row else None
+
+    def _reap(self, conn, now):
+        # leases that lapsed on their last allowed attempt are not handed out again
+        t = work_items
+        conn.execute(t.update().where(
+            t.c.queue == self.name, t.c.status == "leased", t.c.lease_expires < now,
+            t.c.attempts >= t.c.max_attempts,
+        ).values(status="failed", last_error="lease expired on final attempt", updated_at=now))
+
+    def _owned(self, item_id, worker):
+        t = work_items
+        return t.update().where(t.c.id == item_id, t.c.lease_owner == (worker or worker_id()),
+                                t.c.status == "leased")
+
+    def heartbeat(self, item_id, worker=None, lease_seconds=None) -> bool:
+        now = time.time()
+        with self.engine.begin() as conn:
+            res = conn.execute(self._owned(item_id, worker).values(
+                lease_expires=now + (lease_seconds or self.lease_seconds), updated_at=now))
+        return res.rowcount == 1
+
+    def checkpoint(self, item_id, processed_pages: int, worker=None) -> bool:
+        """Persist progress and extend the lease; False means the lease was lost."""
+        now = time.time()
+        with self.engine.begin() as conn:
+            res = conn.execute(self._owned(item_id, worker).values(
+                processed_pages=processed_pages, lease_expires=now + self.lease_seconds,
+                updated_at=now))
+        return res.rowcount == 1
+
+    def complete(self, item_id, worker=None) -> bool:
+        with self.engine.begin() as conn:
+            res = conn.execute(self._owned(item_id, worker).values(
+                status="done", lease_owner=None, lease_expires=None, updated_at=time.time()))
+        return res.rowcount == 1
+
+    def fail(self, item_id, error: str, worker=None) -> bool:
+        t = work_items
+        now = time.time()
+        with self.engine.begin() as conn:
+            row = conn.execute(select(t.c.attempts, t.c.max_attempts).where(t.c.id == item_id)).first()
+            if row is None:
+                return False
+            attempts, max_attempts = row
+            res = conn.execute(self._owned(item_id, worker).values(
+                status="failed" if attempts >= max_attempts else "pending",
+                available_at=now + self.retry_backoff * 2 ** (attempts - 1),
+                lease_owner=None, lease_expires=None, last_error=str(error)[:500], updated_at=now))
+        return res.rowcount == 1
+
+    def requeue_failed(self) -> int:
+        t = work_items
+        with self.engine.begin() as conn:
+            return conn.execute(t.update().where(t.c.queue == self.name, t.c.status == "failed")
+                                .values(status="pending", attempts=0, available_at=0.0)).rowcount
+
+    def requeue_done(self) -> int:
+        """Hand finished items out again from page 0, e.g. to pick up documents
+        that changed upstream."""
+        t = work_items
+        with self.engine.begin() as conn:
+            return conn.execute(t.update().where(t.c.queue == self.name, t.c.status == "done")
+                                .values(status="pending", attempts=0, available_at=0.0,
+                                        processed_pages=0, updated_at=time.time())).rowcount
+
+    def stats(self) -> dict:
+        t = work_items
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(t.c.status, func.count()).where(t.c.queue == self.name)
+                                .group_by(t.c.status))
+            return {status: n for status, n in rows}
@@ -0,0 +1,211 @@
+import os
+import re
+import json
+import hashlib
+
+from scraper.store import RawStore, is_store
+
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP = 64
+
+# Rough, tokenizer-free count: a word (Latin or Devanagari) or a punctuation mark
+# is one token. Good enough to budget chunks; pass count= for exact counts.
+_TOKEN = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+|[^\w\s]")
+_LINE = re.compile(r"[^\n]+")
+_NONSPACE = re.compile(r"\S+")
+_SENTENCE_END = re.compile(r"(?<=[.!?;:।॥])\s+")
+
+# Lines that open a new structural unit in statutes, bills and policy notes.
+HEADING = re.compile(
+    r"""^\s*(?:
+        (?:chapter|part|section|sec\.|article|schedule|clause|rule|regulation|annexure)\s+[\dIVXLC]+
+      | (?:अध्याय|भाग|धारा|खंड|खण्ड|नियम|अनुच्छेद|अनुसूची)\s*[\d०-९]+
+      | [\d०-९]+(?:\.[\d०-९]+)*[.)]\s
+      | \((?:[a-z]{1,2}|[ivxlc]+|\d+|[०-९]+|[क-ह])\)\s
+      | [a-z][.)]\s
+    )""",
+    re.I | re.X,
+)
+
+
+def count_tokens(text: str) -> int:
+    return len(_TOKEN.findall(text))
+
+
+def doc_text(doc: dict) -> str:
+    # scrape_static output stores "text"; wp_post_to_doc stores "raw_text"
+    return doc.get("text") or doc.get("raw_text") or ""
+
+
+def doc_hash(doc: dict) -> str:
+    return doc.get("hash") or hashlib.md5(doc_text(doc).encode()).hexdigest()
+
+
+def iter_documents(*paths):
+    """Stream documents from raw JSON files, JSONL files, directories of them,
+    or a scraper/store.py segment store (read sequentially)."""
+    for path in paths:
+        if is_store(path):
+            with RawStore(path) as store:
+                yield from store.scan()
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith((".json", ".jsonl")):
+                        yield from iter_documents(os.path.join(root, name))
+        elif path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                yield from data
+            else:
+                yield data
+
+
+def _units(text: str, max_tokens: int, count):
+    """Yield (start, end, tokens, is_heading) spans, splitting oversized lines."""
+    for m in _LINE.finditer(text):
+        line = m.group()
+        stripped = line.strip()
+        if not stripped:
+            continue
+        start = m.start() + (len(line) - len(line.lstrip()))
+        end = start + len(stripped)
+        tokens = count(stripped)
+        heading = bool(HEADING.match(stripped))
+
+        if tokens <= max_tokens:
+            yield start, end, tokens, heading
+            continue
+
+        # oversized line: break at sentence ends first, then hard-split on tokens
+        pos = start
+        for piece in _SENTENCE_END.split(stripped):
+            p_start = text.index(piece, pos)
+            p_end = p_start + len(piece)
+            pos = p_end
+            p_tokens = count(piece)
+            if p_tokens <= max_tokens:
+                yield p_start, p_end, p_tokens, heading
+                heading = False
+                continue
+            for cut, stop, cut_tokens in _hard_split(text, p_start, p_end, max_tokens, count):
+                yield cut, stop, cut_tokens, heading
+                heading = False
+
+
+def _hard_split(text: str, start: int, end: int, max_tokens: int, count):
+    """Yield (start, end, tokens) pieces of text[start:end], each within max_tokens by `count`."""
+    if count is count_tokens:
+        marks = [start + t.end() for t in _TOKEN.finditer(text, start, end)]
+        cut = start
+        for i in range(max_tokens, len(marks) + max_tokens, max_tokens):
+            stop = marks[min(i, len(marks)) - 1]
+            if stop > cut:
+                yield cut, stop, count(text[cut:stop])
+            cut = stop
+        return
+
+    # any other counter (a model tokenizer): the longest run of whole words
+    # that it still fits in the budget, found by bisection
+    ends = [m.end() for m in _NONSPACE.finditer(text, start, end)]
+    cut, i = start, 0
+    while i < len(ends):
+        lo, hi = i, len(ends)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if count(text[cut:ends[mid]]) <= max_tokens:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo > i:
+            stop, i = ends[lo - 1], lo
+        else:
+            # a single word over the budget: cut inside it
+            lo, hi = cut + 1, ends[i]
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if count(text[cut:mid]) <= max_tokens:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            stop = lo
+        yield cut, stop, count(text[cut:stop])
+        cut = stop
+        while cut < end and text[cut].isspace():
+            cut += 1
+
+
+def chunk_document(doc: dict, max_tokens=DEFAULT_MAX_TOKENS, overlap=DEFAULT_OVERLAP,
+                   count=count_tokens):
+    """Yield token-budgeted chunks of one document.
+
+    Lines are packed greedily. A section/clause heading starts a new chunk once
+    the current one is at least half full, so chunks tend to follow the
+    document's own structure; chunks cut only by the budget carry `overlap`
+    tokens of trailing context into the next one. Chunk IDs are the document
+    hash plus the chunk's character offset, so they are stable across runs.
+    """
+    text = doc_text(doc)
+    if not text:
+        return
+    digest = doc_hash(doc)
+    meta = {k: doc.get(k) for k in ("url", "state", "source", "title", "page_type", "published_date")
+            if doc.get(k) is not None}
+
+    ordinal = 0
+    current = []   # [(start, end, tokens)]
+    size = 0
+
+    def emit(units):
+        nonlocal ordinal
+        start, end = units[0][0], units[-1][1]
+        chunk = {
+            "chunk_id": f"{digest[:16]}-{start:08d}",
+            "doc_hash": digest,
+            "ordinal": ordinal,
+            "start": start,
+            "end": end,
+            "token_count": sum(u[2] for u in units),
+            "text": text[start:end],
+            **meta,
+        }
+        ordinal += 1
+        return chunk
+
+    for start, end, tokens, heading in _units(text, max_tokens, count):
+        if current and heading and size >= max_tokens // 2:
+            yield emit(current)
+            current, size = [], 0
+
+        elif current and size + tokens > max_tokens:
+            yield emit(current)
+            carry, carried = [], 0
+            for unit in reversed(current):
+                if carried + unit[2] > overlap or carried + unit[2] + tokens > max_tokens:
+                    break
+                carry.insert(0, unit)
+                carried += unit[2]
+            current, size = carry, carried
+
+        current.append((start, end, tokens))
+        size += tokens
+
+    if current:
+        yield emit(current)
+
+
+def iter_chunks(docs, max_tokens=DEFAULT_MAX_TOKENS, overlap=DEFAULT_OVERLAP, count=count_tokens):
+    for doc in docs:
+        yield from chunk_document(doc, max_tokens=max_tokens, overlap=overlap, count=count)
+
+
+def chunk_files(*paths, **kwargs):
+    """Stream chunks straight from raw JSON/JSONL on disk."""
+    return iter_chunks(iter_documents(*paths), **kwargs)
@@ -0,0 +1,244 @@
+import os
+import re
+import asyncio
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from processor.chunker import count_tokens
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+CACHE_FILE = os.path.join(DATA_DIR, "embeddings.db")
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+# --- Backends ---
+
+def utf8_bytes(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def bpe_counter(model: str):
+    """Exact token count for `model` via tiktoken; without it (not installed, or
+    its encoding file can't be downloaded) the UTF-8 byte length, which a
+    byte-level BPE never exceeds. A word count is no bound at all: one
+    Devanagari word is often several tokens."""
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception:
+        return utf8_bytes
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class OpenAIBackend:
+    # per-request limits (300k tokens per request); count_tokens never undercounts
+    max_items = 2048
+    max_tokens = 280_000
+
+    def __init__(self, model="text-embedding-3-small", dimensions=None, client=None):
+        self.model = model if dimensions is None else f"{model}@{dimensions}"
+        self._name = model
+        self.dimensions = dimensions
+        self.client = client or AsyncOpenAI()
+        self.count_tokens = bpe_counter(model)
+
+    async def embed(self, texts: list) -> np.ndarray:
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        resp = await self.client.embeddings.create(model=self._name, input=texts, **kwargs)
+        data = sorted(resp.data, key=lambda d: d.index)
+        return np.asarray([d.embedding for d in data], dtype=np.float32)
+
+
+_HASH_TOKEN = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+
+
+class HashingBackend:
+    """Deterministic local embeddings (signed feature hashing of words and bigrams).
+
+    No network and no model weights, so it is useful for offline benchmarks and
+    tests; similarity reflects lexical overlap only.
+    """
+    max_items = 4096
+    max_tokens = 1_000_000
+    count_tokens = staticmethod(count_tokens)
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        words = _HASH_TOKEN.findall(text.lower())
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature in words + [a + " " + b for a, b in zip(words, words[1:])]:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    async def embed(self, texts: list) -> np.ndarray:
+        return np.stack([self._vector(t) for t in texts])
+
+
+# --- Cache ---
+
+class EmbeddingCache:
+    """Content-addressed vector store keyed by (model, chunk hash).
+
+    Vectors are stored as raw float16 bytes by default (float32 if asked for)
+    rather than lists of Python floats.
+    """
+
+    def __init__(self, path=CACHE_FILE, dtype="float16"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                model TEXT NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                dtype TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, chunk_hash)
+            )
+        """)
+        self._db.commit()
+
+    def get_many(self, model: str, hashes: list) -> dict:
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                for h, dtype, blob in self._db.execute(
+                    f"SELECT chunk_hash, dtype, vector FROM vectors WHERE model = ? AND chunk_hash IN ({marks})",
+                    [model, *batch]
+                ):
+                    found[h] = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+        self.hits += len(found)
+        self.misses += len(set(hashes)) - len(found)
+        return found
+
+    def put_many(self, model: str, items):
+        rows = [(model, h, self.dtype.name, np.asarray(v, dtype=self.dtype).tobytes()) for h, v in items]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+# --- Embedder ---
+
+class Embedder:
+    """Batches texts up to the backend's item/token limits (counted with the
+    backend's own count_tokens unless `count` is given), runs at most
+    `max_concurrency` requests at once, and never re-embeds a cached chunk.
+
+    The sync wrappers (embed_texts, embed_chunks) run on a loop the Embedder
+    owns; use them from one thread, and not from inside a running loop."""
+
+    def __init__(self, backend=None, cache=None, max_concurrency=4, count=None):
+        self.backend = backend or OpenAIBackend()
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.count = count or getattr(self.backend, "count_tokens", count_tokens)
+        self.requests = 0
+        self._loop = None
+
+    @property
+    def model(self) -> str:
+        return self.backend.model
+
+    def batches(self, texts: list):
+        batch, tokens = [], 0
+        for i, text in enumerate(texts):
+            n = self.count(text)
+            if batch and (len(batch) >= self.backend.max_items or tokens + n > self.backend.max_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append(i)
+            tokens += n
+        if batch:
+            yield batch
+
+    async def aembed_texts(self, texts: list) -> np.ndarray:
+        hashes = [chunk_hash(t) for t in texts]
+        vectors = self.cache.get_many(self.model, hashes) if self.cache else {}
+
+        # embed each distinct missing text once
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in vectors:
+                missing.setdefault(h, t)
+        todo_hashes = list(missing)
+        todo_texts = list(missing.values())
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(idx):
+            async with semaphore:
+                out = await self.backend.embed([todo_texts[i] for i in idx])
+                self.requests += 1
+            if self.cache:
+                # what a later cache hit returns, so a text embeds the same either way
+                out = np.asarray(out).astype(self.cache.dtype).astype(np.float32)
+            fresh = [(todo_hashes[i], v) for i, v in zip(idx, out)]
+            if self.cache:
+                self.cache.put_many(self.model, fresh)
+            vectors.update(fresh)
+
+        await asyncio.gather(*(run(idx) for idx in self.batches(todo_texts)))
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[h] for h in hashes]).astype(np.float32, copy=False)
+
+    def _run(self, awaitable):
+        # every sync call shares one loop: the backend's async client (its
+        # connection pool) is bound to the loop it first ran on
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(awaitable)
+
+    def embed_texts(self, texts: list) -> np.ndarray:
+        return self._run(self.aembed_texts(texts))
+
+    async def aembed_chunks(self, chunks, window=1024):
+        """Yield (chunks, vectors) windows from a (possibly endless) chunk stream."""
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= window:
+                yield batch, await self.aembed_texts([c["text"] for c in batch])
+                batch = []
+        if batch:
+            yield batch, await self.aembed_texts([c["text"] for c in batch])
+
+    def embed_chunks(self, chunks, window=1024):
+        """aembed_chunks() for sync callers, every window on the same loop."""
+        windows = self.aembed_chunks(chunks, window)
+        try:
+            while True:
+                try:
+                    yield self._run(windows.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(windows.aclose())
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
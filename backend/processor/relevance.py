@@ -0,0 +1,132 @@
+import re
+import functools
+from collections import Counter
+from dataclasses import dataclass, field
+
+from processor.chunker import doc_text
+
+# Term -> weight. Matching is case-insensitive, on whole words, and allows an
+# English plural ("chatbots", "neural networks").
+DEFAULT_KEYWORDS = {
+    # English
+    'artificial intelligence': 3, 'machine learning': 3, 'deep learning': 3,
+    'generative ai': 3, 'large language model': 3, 'neural network': 3,
+    'natural language processing': 3, 'computer vision': 2,
+    'facial recognition': 2, 'autonomous system': 2, 'chatbot': 2,
+    'ai': 2, 'a.i.': 2, 'llm': 2, 'robotics': 2, 'algorithmic': 1,
+    # Hindi
+    'कृत्रिम बुद्धिमत्ता': 3, 'कृत्रिम बुद्धि': 3, 'आर्टिफिशियल इंटेलिजेंस': 3,
+    'मशीन लर्निंग': 3, 'डीप लर्निंग': 3, 'जनरेटिव एआई': 3, 'न्यूरल नेटवर्क': 3,
+    'एआई': 2, 'चैटबॉट': 2, 'रोबोटिक्स': 2,
+}
+
+DEFAULT_THRESHOLD = 2
+
+# letters that continue a word; Devanagari vowel signs are not \w in Python's re
+_WORD = r"\w\u0900-\u0963\u0966-\u097F"
+_is_word = re.compile(rf"[{_WORD}]").match
+
+
+def _keyword_pattern(keyword: str):
+    # starts with the keyword itself, so re finds candidates with its literal-prefix search;
+    # the word boundary before it is checked on the (few) candidates
+    return re.compile(re.escape(keyword).replace(r"\ ", r"\s+") + rf"(?:e?s)?(?![{_WORD}])")
+
+
+@dataclass
+class Relevance:
+    score: float = 0.0
+    matches: Counter = field(default_factory=Counter)
+    relevant: bool = False
+
+    @property
+    def terms(self) -> list:
+        return sorted(self.matches)
+
+
+class RelevanceScorer:
+    """Whole-word, case-insensitive keyword matching, one regex per keyword.
+
+    A keyword is only matched when its first word occurs in the lowercased
+    text at all (a plain substring test, the cost of the old scan), and
+    then on word boundaries, so 'ai' no longer matches inside "said" or
+    "maintain". Overlapping hits go to the longest ("generative ai", not
+    "ai"). score = sum(weight * hits); a text is relevant at >= threshold.
+    """
+
+    def __init__(self, keywords=None, threshold=DEFAULT_THRESHOLD):
+        keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+        if not isinstance(keywords, dict):
+            keywords = {k: 1 for k in keywords}
+        self.weights = {k.lower(): w for k, w in keywords.items()}
+        self.threshold = threshold
+        # heaviest first: is_relevant() is settled by the first whole-word hit of one of those
+        self.keywords = [(k, k.split()[0], _keyword_pattern(k))
+                         for k in sorted(self.weights, key=lambda k: (-self.weights[k], k))]
+        self.decisive = [kw for kw in self.keywords if self.weights[kw[0]] >= threshold]
+
+    @staticmethod
+    def _hits(low: str, keywords):
+        for term, first, pattern in keywords:
+            if first not in low:
+                continue
+            for m in pattern.finditer(low):
+                start = m.start()
+                if start == 0 or not _is_word(low, start - 1):
+                    yield start, m.end(), term
+
+    def _matches(self, low: str) -> Counter:
+        matches, end = Counter(), -1
+        for start, neg_end, term in sorted((s, -e, t) for s, e, t in self._hits(low, self.keywords)):
+            if start >= end:
+                matches[term] += 1
+                end = -neg_end
+        return matches
+
+    def score(self, text: str) -> Relevance:
+        if not text:
+            return Relevance()
+        matches = self._matches(text.lower())
+        score = sum(self.weights.get(t, 0) * n for t, n in matches.items())
+        return Relevance(score, matches, score >= self.threshold)
+
+    def is_relevant(self, *texts) -> bool:
+        """Like score().relevant, but stops at the first hit that reaches the threshold."""
+        for text in texts:
+            low = (text or "").lower()
+            if next(self._hits(low, self.decisive), None) is not None:
+                return True
+            if len(self.decisive) < len(self.keywords):
+                matches = self._matches(low)
+                if sum(self.weights[t] * n for t, n in matches.items()) >= self.threshold:
+                    return True
+        return False
+
+    def score_many(self, texts):
+        """Score an iterable of texts lazily, one Relevance per text."""
+        for text in texts:
+            yield self.score(text)
+
+    def filter_docs(self, docs, text=doc_text, annotate=True):
+        """Yield only relevant docs; with annotate, add relevance/matched_terms fields."""
+        for doc in docs:
+            rel = self.score(text(doc))
+            if not rel.relevant:
+                continue
+            if annotate:
+                doc["relevance"] = rel.score
+                doc["matched_terms"] = rel.terms
+            yield doc
+
+
+@functools.lru_cache(maxsize=None)
+def get_scorer() -> RelevanceScorer:
+    return RelevanceScorer()
+
+
+def score(text: str) -> Relevance:
+    return get_scorer().score(text)
+
+
+def is_relevant(*texts) -> bool:
+    return get_scorer().is_relevant(*texts)
@@ -0,0 +1,95 @@
+import asyncio
+
+DEFAULT_RRF_K = 60
+DEFAULT_CANDIDATES = 50
+
+KEYWORD_FILTERS = ("state", "source", "page_type")
+# date ranges only exist in Qdrant; a query with one uses vector search alone
+VECTOR_ONLY = ("published_after", "published_before")
+
+
+def rrf(*rankings, k=DEFAULT_RRF_K, weights=None) -> list:
+    """Reciprocal rank fusion of ranked hit lists keyed by chunk_id.
+
+    score = sum(weight / (k + rank)) over the lists a chunk appears in. Only
+    ranks matter, so BM25 and cosine scores never have to be calibrated
+    against each other. Fields of the earlier list win when both have them.
+    """
+    fused = {}
+    for n, hits in enumerate(rankings):
+        weight = weights[n] if weights else 1.0
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit["chunk_id"])
+            if entry is None:
+                entry = fused[hit["chunk_id"]] = {**hit, "score": 0.0, "ranks": [None] * len(rankings)}
+            else:
+                entry.update((key, value) for key, value in hit.items() if key not in entry)
+            entry["score"] += weight / (k + rank)
+            entry["ranks"][n] = rank
+    return sorted(fused.values(), key=lambda h: -h["score"])
+
+
+def _split_filters(filters: dict) -> tuple:
+    keyword = {k: filters.get(k) for k in KEYWORD_FILTERS}
+    return keyword, all(filters.get(k) is None for k in VECTOR_ONLY)
+
+
+def _fill(fused: list, payloads: dict) -> list:
+    out = []
+    for hit in fused:
+        if "text" not in hit:
+            payload = payloads.get(hit["chunk_id"])
+            if payload is None:
+                continue   # in the keyword index but not (yet) in Qdrant
+            hit = {**payload, **hit}
+        out.append(hit)
+    return out
+
+
+class HybridRetriever:
+    """Qdrant vector search + BM25 keyword search, fused with RRF.
+
+    Both sides fetch `candidates` hits under the same state/source filter.
+    Keyword-only hits carry no text, so their payloads are fetched from
+    Qdrant by chunk_id. Filters the keyword index cannot apply (published
+    date ranges) fall back to vector search alone.
+    """
+
+    def __init__(self, vector, keyword, k=DEFAULT_RRF_K, candidates=DEFAULT_CANDIDATES, weights=None):
+        self.vector = vector
+        self.keyword = keyword
+        self.k = k
+        self.candidates = candidates
+        self.weights = weights
+
+    def search(self, vector, limit=5, query=None, **filters) -> list:
+        depth = max(self.candidates, limit)
+        dense = self.vector.search(vector, limit=depth, **filters)
+        keyword_filters, usable = _split_filters(filters)
+        if not usable or not query:
+            return dense[:limit]
+        sparse = self.keyword.search(query, limit=depth, **keyword_filters)
+        fused = rrf(dense, sparse, k=self.k, weights=self.weights)[:limit]
+        missing = [h["chunk_id"] for h in fused if "text" not in h]
+        return _fill(fused, self.vector.get_chunks(missing) if missing else {})
+
+
+class AsyncHybridRetriever(HybridRetriever):
+    """HybridRetriever for the API: AsyncQdrantSearch for vectors, and the BM25
+    search (numpy over memory-mapped postings) in a worker thread meanwhile."""
+
+    async def search(self, vector, limit=5, query=None, **filters) -> list:
+        depth = max(self.candidates, limit)
+        keyword_filters, usable = _split_filters(filters)
+        if not usable or not query:
+            return (await self.vector.search(vector, limit=depth, **filters))[:limit]
+        dense, sparse = await asyncio.gather(
+            self.vector.search(vector, limit=depth, **filters),
+            asyncio.to_thread(self.keyword.search, query, depth, **keyword_filters),
+        )
+        fused = rrf(dense, sparse, k=self.k, weights=self.weights)[:limit]
+        missing = [h["chunk_id"] for h in fused if "text" not in h]
+        return _fill(fused, await self.vector.get_chunks(missing) if missing else {})
+
+    async def close(self):
+        await self.vector.close()
@@ -1,12 +1,20 @@
-import requests 
+import os
+import sys
 from bs4 import BeautifulSoup
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.http_cache import cached_get
+
 def classify_url(url: str) -> str:
 
     if url.lower().endswith(".pdf"):
         return 'pdf'
     
     try:
-        r= requests.get(url, timeout= 10 , headers={ 'User-agent' : 'Mozilla/5.0'})
+        r= cached_get(url, timeout= 10)
         soup = BeautifulSoup(r.text, "html.parser")
 
         for tags in soup(["script", "style"]):
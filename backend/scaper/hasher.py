@@ -0,0 +1,266 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from dataclasses import dataclass
+
+from scaper.normalizer import normalize_text
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+INDEX_FILE = os.path.join(DATA_DIR, "hash_index.db")
+
+SIMHASH_BITS = 64
+NEAR_DUP_DISTANCE = 3   # <= 3 differing bits out of 64 is the same page for our purposes
+
+# bump when normalize_for_hash changes; rows hashed under an older scheme are
+# re-hashed in place on their next check instead of being reported as changed
+HASH_VERSION = 2
+
+_WORD = re.compile(r"\w+")
+_WS = re.compile(r"\s+")
+
+
+def normalize_for_hash(text: str) -> str:
+    return normalize_text(text, lowercase=True, keep_lines=False)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.md5(normalize_for_hash(text).encode()).hexdigest()
+
+
+def legacy_content_hash(text: str, version: int) -> str:
+    """content_hash() as an earlier HASH_VERSION computed it."""
+    if version == 1:
+        text = _WS.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+        return hashlib.md5(text.encode()).hexdigest()
+    raise ValueError(f"unknown hash version {version}")
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """64-bit Charikar simhash over word shingles of the normalized text."""
+    words = _WORD.findall(normalize_for_hash(text))
+    if len(words) < shingle:
+        features = [" ".join(words)] if words else []
+    else:
+        features = [" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+    if not features:
+        return 0
+
+    bits = [
+        format(int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "big"), "064b")
+        for f in features
+    ]
+    half = len(bits) / 2
+    fingerprint = 0
+    # column i of the bit strings is bit (63 - i) of every feature hash
+    for column in zip(*bits):
+        fingerprint = (fingerprint << 1) | (column.count("1") > half)
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _bands(fingerprint: int):
+    # four 16-bit bands: two fingerprints within 3 bits share at least one band exactly
+    return [(fingerprint >> shift) & 0xFFFF for shift in (48, 32, 16, 0)]
+
+
+@dataclass
+class Change:
+    url: str
+    status: str              # "new" | "changed" | "unchanged"
+    content_hash: str
+    simhash: int
+    previous_hash: str = None
+    distance: int = None     # simhash distance from the previous version
+    duplicate_of: str = None # another URL carrying (nearly) the same text
+
+    @property
+    def changed(self) -> bool:
+        return self.status != "unchanged"
+
+
+class HashIndex:
+    """Persistent URL -> (content hash, simhash, first/last seen) index.
+
+    `update()` is called for every scraped page; only pages whose normalized
+    text differs from the last recorded version come back as changed.
+    `pending()` lists documents whose current hash has not been chunked and
+    embedded yet, and `mark_indexed()` is called once they have been.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                simhash TEXT NOT NULL,
+                band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER,
+                first_seen REAL,
+                last_seen REAL,
+                changed_at REAL,
+                change_count INTEGER DEFAULT 0,
+                duplicate_of TEXT,
+                indexed_hash TEXT
+            )
+        """)
+        for i in range(4):
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_pages_band{i} ON pages(band{i})")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_pages_changed ON pages(changed_at)")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}
+        if "hash_version" not in columns:
+            # rows written before the column existed were hashed with scheme 1
+            self._db.execute("ALTER TABLE pages ADD COLUMN hash_version INTEGER DEFAULT 1")
+        self._db.commit()
+
+    def get(self, url: str):
+        with self._lock:
+            return self._db.execute(
+                "SELECT content_hash, simhash, last_seen, changed_at, hash_version, duplicate_of "
+                "FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def check(self, url: str, text: str) -> Change:
+        """Compare `text` with the last recorded version without persisting anything."""
+        digest = content_hash(text)
+        fingerprint = simhash(text)
+        row = self.get(url)
+
+        if row is None:
+            return Change(url, "new", digest, fingerprint,
+                          duplicate_of=self.near_duplicate(fingerprint, exclude=url))
+
+        previous_hash, previous_simhash, version = row[0], int(row[1], 16), row[4] or 1
+        if previous_hash == digest or (
+                version != HASH_VERSION and previous_hash == legacy_content_hash(text, version)):
+            if row[5] and not self.still_duplicates(row[5], fingerprint):
+                # same text, but the page it duplicated has since changed: it stands alone now
+                # (or duplicates another page), so it goes downstream like a changed page
+                return Change(url, "changed", digest, fingerprint, previous_hash=previous_hash, distance=0,
+                              duplicate_of=self.near_duplicate(fingerprint, exclude=url))
+            # same text; under an older scheme record() moves the row to the new hash
+            return Change(url, "unchanged", digest, fingerprint, previous_hash=previous_hash, distance=0)
+        # a changed page may have stopped (or started) duplicating another URL
+        return Change(url, "changed", digest, fingerprint, previous_hash=previous_hash,
+                      distance=hamming(fingerprint, previous_simhash),
+                      duplicate_of=self.near_duplicate(fingerprint, exclude=url))
+
+    def still_duplicates(self, other_url: str, fingerprint: int, max_distance=NEAR_DUP_DISTANCE) -> bool:
+        """Whether `other_url`'s current text is still within max_distance of `fingerprint`."""
+        with self._lock:
+            row = self._db.execute("SELECT simhash FROM pages WHERE url = ?", (other_url,)).fetchone()
+        return row is not None and hamming(fingerprint, int(row[0], 16)) <= max_distance
+
+    def near_duplicate(self, fingerprint: int, exclude: str = None, max_distance=NEAR_DUP_DISTANCE):
+        bands = _bands(fingerprint)
+        with self._lock:
+            candidates = self._db.execute(
+                "SELECT url, simhash FROM pages WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?",
+                bands
+            ).fetchall()
+        for url, other in candidates:
+            if url != exclude and hamming(fingerprint, int(other, 16)) <= max_distance:
+                return url
+        return None
+
+    def update(self, url: str, text: str) -> Change:
+        """Check `text` against the index and record the outcome."""
+        change = self.check(url, text)
+        self.record(change)
+        return change
+
+    def record(self, change: Change):
+        now = time.time()
+        fp = format(change.simhash, "016x")
+        with self._lock:
+            if change.status == "new":
+                self._db.execute(
+                    "INSERT INTO pages (url, content_hash, simhash, band0, band1, band2, band3, "
+                    "first_seen, last_seen, changed_at, change_count, duplicate_of, hash_version) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                    (change.url, change.content_hash, fp, *_bands(change.simhash),
+                     now, now, now, change.duplicate_of, HASH_VERSION)
+                )
+            elif change.status == "changed" and change.previous_hash == change.content_hash:
+                # a stale duplicate_of re-evaluated; the text itself did not change
+                self._db.execute("UPDATE pages SET last_seen = ?, duplicate_of = ? WHERE url = ?",
+                                 (now, change.duplicate_of, change.url))
+            elif change.status == "changed":
+                self._db.execute(
+                    "UPDATE pages SET content_hash = ?, simhash = ?, band0 = ?, band1 = ?, band2 = ?, "
+                    "band3 = ?, last_seen = ?, changed_at = ?, change_count = change_count + 1, "
+                    "duplicate_of = ?, hash_version = ? WHERE url = ?",
+                    (change.content_hash, fp, *_bands(change.simhash), now, now,
+                     change.duplicate_of, HASH_VERSION, change.url)
+                )
+            elif change.previous_hash and change.previous_hash != change.content_hash:
+                # re-hashed under the current scheme: the text (and its embedding) is the same,
+                # so an index entry for the old hash now stands for the new one
+                self._db.execute(
+                    "UPDATE pages SET content_hash = ?, simhash = ?, band0 = ?, band1 = ?, band2 = ?, "
+                    "band3 = ?, last_seen = ?, hash_version = ?, "
+                    "indexed_hash = CASE WHEN indexed_hash = content_hash THEN ? ELSE indexed_hash END "
+                    "WHERE url = ?",
+                    (change.content_hash, fp, *_bands(change.simhash), now, HASH_VERSION,
+                     change.content_hash, change.url)
+                )
+            else:
+                self._db.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (now, change.url))
+            self._db.commit()
+
+    def touch(self, url: str):
+        """Mark a page as seen without re-hashing (e.g. after an HTTP 304)."""
+        with self._lock:
+            self._db.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def changed_since(self, since: float) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url FROM pages WHERE changed_at >= ? ORDER BY changed_at", (since,)
+            ).fetchall()
+        return [url for (url,) in rows]
+
+    def history(self, urls) -> dict:
+        """url -> (first_seen, last_seen, change_count) for the URLs already indexed."""
+        urls, out = list(urls), {}
+        with self._lock:
+            for i in range(0, len(urls), 500):
+                part = urls[i:i + 500]
+                out.update((url, (first, last, count)) for url, first, last, count in self._db.execute(
+                    f"SELECT url, first_seen, last_seen, change_count FROM pages "
+                    f"WHERE url IN ({','.join('?' * len(part))})", part))
+        return out
+
+    def pending(self) -> list:
+        """(url, content_hash) pairs whose current version has not been indexed yet."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, content_hash FROM pages WHERE duplicate_of IS NULL "
+                "AND (indexed_hash IS NULL OR indexed_hash != content_hash)"
+            ).fetchall()
+
+    def mark_indexed(self, items):
+        """`items` is an iterable of (url, content_hash) that has been chunked and embedded."""
+        with self._lock:
+            self._db.executemany(
+                "UPDATE pages SET indexed_hash = ? WHERE url = ?",
+                [(digest, url) for url, digest in items]
+            )
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
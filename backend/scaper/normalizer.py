@@ -0,0 +1,142 @@
+import re
+import unicodedata
+
+# --- Precompiled patterns ---
+
+# zero-width space/joiners, word joiner, BOM, soft hyphen: invisible, but they
+# split words and change hashes
+_INVISIBLE = re.compile(r"[\u200b-\u200d\u2060\ufeff\u00ad]")
+# what can change under NFKC in ASCII/Hindi text: any other character (stress
+# marks and precomposed nukta letters included), a nukta that composes with
+# na/ra/lla, and a nukta after a virama (reordered). Text without any of these
+# is already normalized and skips unicodedata.normalize().
+_NEEDS_NFKC = re.compile(r"[^\x00-\x7f\u0900-\u0950\u0955-\u0957\u0960-\u097f"
+                         r"\u200b-\u200d\u2060\ufeff\u00ad]"
+                         r"|[\u0928\u0930\u0933]\u093c|\u094d\u093c")
+_INLINE_WS = re.compile(r"[^\S\n]+")
+_WS = re.compile(r"\s+")
+
+# Devanagari: a pipe typed for a danda after a word
+_PIPE_DANDA = re.compile(r"\|(?:(?<=[\u0900-\u097F]\|)|(?<=[\u0900-\u097F] \|))")
+_DEVANAGARI = re.compile(r"[\u0900-\u097F]")
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+
+def _devanagari(text: str, fold_digits: bool) -> str:
+    # runs after whitespace folding, so a stray space before a danda is exactly one space
+    if "|" in text:
+        text = _PIPE_DANDA.sub("\u0964", text)
+    text = text.replace(" \u0964", "\u0964").replace(" \u0965", "\u0965")
+    return text.translate(_DEVANAGARI_DIGITS) if fold_digits else text
+
+
+def _fold_lines(text: str) -> str:
+    # one space between words, no blank lines, and a line repeated back to back
+    # (share bars, "Advertisement", menu echoes) kept once
+    out, previous = [], None
+    for line in _INLINE_WS.sub(" ", text).split("\n"):
+        line = line.strip()
+        if line and line != previous:
+            out.append(line)
+            previous = line
+    return "\n".join(out)
+
+
+def normalize_text(text: str, lowercase=False, keep_lines=True, fold_digits=False) -> str:
+    """The one normalization every scraper applies before hashing and chunking.
+
+    NFKC, invisible characters dropped, Devanagari danda cleanup, whitespace
+    folded (per line with keep_lines, else to single spaces). ASCII text skips
+    the Unicode steps entirely.
+    """
+    if not text:
+        return ""
+    if text.isascii():
+        text = _fold_lines(text) if keep_lines else _WS.sub(" ", text).strip()
+        return text.lower() if lowercase else text
+    if _NEEDS_NFKC.search(text):
+        text = unicodedata.normalize("NFKC", text)
+    text = _INVISIBLE.sub("", text)
+    text = _fold_lines(text) if keep_lines else _WS.sub(" ", text).strip()
+    if _DEVANAGARI.search(text):
+        text = _devanagari(text, fold_digits)
+    return text.lower() if lowercase else text
+
+
+def normalize_many(texts, **kwargs):
+    """Lazily normalize a list or stream of texts."""
+    for text in texts:
+        yield normalize_text(text, **kwargs)
+
+
+def normalize_docs(docs, fields=("text", "raw_text", "summary", "title"), **kwargs):
+    """Normalize the text fields of a list or stream of documents in place, yielding each."""
+    for doc in docs:
+        for name in fields:
+            if doc.get(name):
+                doc[name] = normalize_text(doc[name], keep_lines=name in ("text", "raw_text"), **kwargs)
+        if doc.get("state"):
+            doc["state"] = canonical_state(doc["state"]) or doc["state"]
+        yield doc
+
+
+# --- Headers and state names ---
+
+def normalize_header(text: str) -> str:
+    return _WS.sub(" ", text.strip().lower())
+
+
+CANONICAL_STATES = {
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
+    "Goa", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand",
+    "Karnataka", "Kerala", "Madhya Pradesh", "Maharashtra", "Manipur",
+    "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Punjab", "Rajasthan",
+    "Sikkim", "Tamil Nadu", "Telangana", "Tripura",
+    "Uttar Pradesh", "Uttarakhand", "West Bengal",
+    "Jammu And Kashmir", "Ladakh", "Delhi", "Puducherry", "Lakshadweep",
+    "Andaman And Nicobar Islands", "Chandigarh",
+    "Dadra And Nagar Haveli And Daman And Diu",
+}
+
+STATE_ALIASES = {
+    "orissa": "Odisha",
+    "pondicherry": "Puducherry",
+    "uttaranchal": "Uttarakhand",
+    "j and k": "Jammu And Kashmir",
+    "jandk": "Jammu And Kashmir",
+    "jammu kashmir": "Jammu And Kashmir",
+    "nct of delhi": "Delhi",
+    "new delhi": "Delhi",
+    "andaman nicobar": "Andaman And Nicobar Islands",
+    "andaman and nicobar": "Andaman And Nicobar Islands",
+    "tamilnadu": "Tamil Nadu",
+    "chattisgarh": "Chhattisgarh",
+}
+
+_STATES = {s.lower(): s for s in CANONICAL_STATES}
+_STATE_NOISE = re.compile(r"ai\s*initiatives?|\bai\b|\bin\b|\bstate\b|\bgovernment\b|\bof\b(?=\s*$)")
+_SEPARATORS = re.compile(r"[_\-]+")
+
+
+def _state_key(name: str) -> str:
+    name = _SEPARATORS.sub(" ", name.lower()).replace("&", " and ")
+    return _WS.sub(" ", name).strip()
+
+
+def canonical_state(name: str):
+    """'orissa', 'J&K', 'tamil_nadu' -> canonical name; None if not a known state/UT."""
+    if not name:
+        return None
+    key = _state_key(name)
+    return _STATES.get(key) or STATE_ALIASES.get(key) or STATE_ALIASES.get(key.replace(" ", ""))
+
+
+def infer_state_name(filename: str) -> str:
+    """State from a file name like 'AI initiatives in Tamil_Nadu.docx'."""
+    name = filename.lower().replace(".docx", "")
+    name = _state_key(_STATE_NOISE.sub(" ", _SEPARATORS.sub(" ", name)))
+    state = canonical_state(name)
+    if state is None:
+        print(f"Unknown state inferred: '{name}' from '{filename}'")
+        return name.title()
+    return state
@@ -1,12 +1,24 @@
 import json
-import os 
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from db.work_queue import WorkQueue
 
 INPUT_FILE = "data/initiatives_index.json"
-OUTPUT_FILE = "data/pdf_queue.json"
+LEGACY_QUEUE_FILE = "data/pdf_queue.json"
 
 with open(INPUT_FILE, "r", encoding="utf-8") as f:
     initiatives = json.load(f)["initiatives"]
 
+queue = WorkQueue("pdf")
+
+# Keep the progress recorded by the old whole-file queue, if there is one
+if os.path.exists(LEGACY_QUEUE_FILE):
+    print(f"Imported {queue.import_json(LEGACY_QUEUE_FILE)} items from {LEGACY_QUEUE_FILE}")
 
 pdf_queue = []
 
@@ -23,8 +35,6 @@ for item in initiatives:
                 "processed_pages": 0
             })
 
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(pdf_queue, f, indent=2, ensure_ascii=False)
-
+added = queue.enqueue(pdf_queue)
 
-print(f"PDF queue created with {len(pdf_queue)} PDFs")
\ No newline at end of file
+print(f"PDF queue: {added} new of {len(pdf_queue)} PDFs, status {queue.stats()}")
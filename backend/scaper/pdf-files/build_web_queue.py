@@ -1,11 +1,25 @@
 import json
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from db.work_queue import WorkQueue
 
 INPUT_FILE = "data/initiatives_index.json"
-OUTPUT_FILE = "data/web_queue.json"
+LEGACY_QUEUE_FILE = "data/web_queue.json"
 
 with open(INPUT_FILE, "r", encoding="utf-8") as f:
     initiatives = json.load(f)["initiatives"]
 
+queue = WorkQueue("web")
+
+# Keep the progress recorded by the old whole-file queue, if there is one
+if os.path.exists(LEGACY_QUEUE_FILE):
+    print(f"Imported {queue.import_json(LEGACY_QUEUE_FILE)} items from {LEGACY_QUEUE_FILE}")
+
 web_queue = []
 
 for item in initiatives:
@@ -20,7 +34,7 @@ for item in initiatives:
                 "status": "pending"
             })
 
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(web_queue, f, indent=2, ensure_ascii=False)
+added = queue.enqueue(web_queue)
 
-print(f"✅ Web queue created with {len(web_queue)} pages")
+print(f"✅ Web queue: {added} new of {len(web_queue)} pages, status {queue.stats()}")
+print("Drain it with: python scaper/pipeline.py --web-queue")
@@ -1,50 +1,26 @@
 import os 
 import re
+import sys
 import json 
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from docx import Document
 from datetime import datetime
 
-STATE_DOCS='State-wise AI initiatives'
-OUTPUT_FILE='data/initiatives_index.json'
-
-os.makedirs("data", exist_ok=True)
-CANONICAL_STATES = {
-    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
-    "Goa", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand",
-    "Karnataka", "Kerala", "Madhya Pradesh", "Maharashtra", "Manipur",
-    "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Punjab", "Rajasthan",
-    "Sikkim", "Tamil Nadu", "Telangana", "Tripura",
-    "Uttar Pradesh", "Uttarakhand", "West Bengal",
-    "Jammu And Kashmir", "Ladakh", "Delhi",'Puducherry','lakshadweep'
-}
-VALID_STATES = {s.lower() for s in CANONICAL_STATES}
-
-
-def infer_state_name(filename):
-    name = filename.lower()
-    name = name.replace(".docx", "")
-
-    # remove common noise phrases
-    name = re.sub(r"ai\s*initiatives?", "", name)
-    name = re.sub(r"\bai\b", "", name)
-    name = re.sub(r"\bin\b", "", name)
-
-    # normalize separators
-    name = name.replace("_", " ").replace("-", " ")
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
-    # clean symbols
-    name = name.replace("&", "and")
+from scaper.normalizer import normalize_header, normalize_text, infer_state_name
 
-    # collapse spaces
-    name = re.sub(r"\s+", " ", name).strip()
-    if name not in VALID_STATES:
-        print(f"Unknown state inferred: '{name}' from '{filename}'")
-
-    return name.title()
-
-def normalize_header(text):
-    return re.sub(r'\s+', ' ', text.strip().lower())
+STATE_DOCS='State-wise AI initiatives'
+OUTPUT_FILE='data/initiatives_index.json'
+CACHE_FILE='data/initiatives_cache.json'
 
+# bump whenever extract_from_docx (or what it calls) would return something
+# different for the same file; cached entries from another version are re-parsed
+EXTRACTOR_VERSION = 2    # 2: cells go through normalize_text, states through infer_state_name
 
 URL_REGEX = re.compile(
     r'((?:https?://|www\.)[^\s\)\]]+|'
@@ -122,7 +98,7 @@ def extract_from_docx(path, state):
         headers = [normalize_header(c.text) for c in table.rows[0].cells]
 
         for idx,row in enumerate(table.rows[1:], start=1):
-            values= [c.text.strip() for c in row.cells]
+            values= [normalize_text(c.text) for c in row.cells]
             raw=dict(zip(headers, values))
             clean=normalize_row(raw)
 
@@ -141,23 +117,117 @@ def extract_from_docx(path, state):
             })
 
     return initiatives
-    
-all_data = []
-
-for file in os.listdir(STATE_DOCS):
-    if not file.lower().endswith('.docx') or file.startswith('~$'):
-        continue
-
-    state = infer_state_name(file)
-    path = os.path.join(STATE_DOCS, file)
-
-    initiatives = extract_from_docx(path, state)
-    all_data.extend(initiatives)
 
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump({
-        "generated_at": datetime.utcnow().isoformat(),
-        "initiatives": all_data
-    }, f, indent=2, ensure_ascii=False)
 
-print("DOCX to initiative index created")
\ No newline at end of file
+# --- Per-file cache: only changed .docx files are parsed again ---
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_cache(path=CACHE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_cache(cache, path=CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def is_fresh(entry, st, path):
+    """Cache hit on (extractor version, mtime, size); a touched file with the same bytes is still a hit."""
+    if not entry or entry.get("version") != EXTRACTOR_VERSION or entry["size"] != st.st_size:
+        return False
+    if entry["mtime"] == st.st_mtime:
+        return True
+    if entry["sha1"] == file_digest(path):
+        entry["mtime"] = st.st_mtime
+        return True
+    return False
+
+
+def parse_file(path, state):
+    # runs in a worker process
+    return {"version": EXTRACTOR_VERSION, "sha1": file_digest(path),
+            "initiatives": extract_from_docx(path, state)}
+
+
+def iter_state_docs(docs_dir=STATE_DOCS):
+    for file in sorted(os.listdir(docs_dir)):
+        if not file.lower().endswith('.docx') or file.startswith('~$'):
+            continue
+        yield file, os.path.join(docs_dir, file)
+
+
+def write_index(entries, output=OUTPUT_FILE):
+    """Stream the index file one initiative at a time; same layout as before."""
+    tmp = output + ".tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write('{\n  "generated_at": %s,\n  "initiatives": [' % json.dumps(datetime.utcnow().isoformat()))
+        for entry in entries:
+            for item in entry["initiatives"]:
+                body = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+                f.write(("," if count else "") + "\n    " + body)
+                count += 1
+        f.write("\n  ]\n}" if count else "]\n}")
+    os.replace(tmp, output)
+    return count
+
+
+def build_index(docs_dir=STATE_DOCS, output=OUTPUT_FILE, cache_file=CACHE_FILE, workers=None, force=False):
+    """Rebuild the initiative index, re-parsing only .docx files that changed.
+
+    Returns {"files", "parsed", "initiatives"}.
+    """
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    cache = {} if force else load_cache(cache_file)
+    files = list(iter_state_docs(docs_dir))
+
+    todo = []
+    for file, path in files:
+        st = os.stat(path)
+        if not is_fresh(cache.get(path), st, path):
+            todo.append((path, st, infer_state_name(file)))
+
+    def store(path, st, state, parsed):
+        cache[path] = {"mtime": st.st_mtime, "size": st.st_size, "state": state, **parsed}
+
+    # a pool only pays off when several files changed
+    if len(todo) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(parse_file, path, state): (path, st, state)
+                       for path, st, state in todo}
+            for future in as_completed(futures):
+                store(*futures[future], future.result())
+    else:
+        for path, st, state in todo:
+            store(path, st, state, parse_file(path, state))
+
+    # files that were deleted drop out of the cache and the index
+    current = {path for _, path in files}
+    cache = {path: entry for path, entry in cache.items() if path in current}
+    save_cache(cache, cache_file)
+
+    count = write_index((cache[path] for _, path in files), output)
+    return {"files": len(files), "parsed": len(todo), "initiatives": count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build data/initiatives_index.json from the state DOCX files")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="ignore the cache and re-parse every file")
+    args = parser.parse_args()
+
+    stats = build_index(workers=args.workers, force=args.force)
+    print(f"DOCX to initiative index created: {stats['initiatives']} initiatives from "
+          f"{stats['files']} files ({stats['parsed']} re-parsed)")
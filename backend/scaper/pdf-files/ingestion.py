@@ -0,0 +1,260 @@
+import os
+import sys
+import glob
+import json
+import asyncio
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+import pdfplumber
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from db.work_queue import WorkQueue, worker_id
+from scraper.http_cache import get_default_cache
+from scaper import pipeline
+from db.sqlite_client import MetadataStore
+from db.qdrant_client import get_client
+from processor.chunker import chunk_document
+
+DATA_DIR = os.path.abspath(os.path.join(BACKEND_DIR, "..", "data"))
+PDF_DIR = os.path.join(DATA_DIR, "pdf")
+# one file per PDF being ingested, written only by the worker holding its lease
+STAGING_DIR = os.path.join(DATA_DIR, "chunks", "pdf")
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
+}
+
+PAGES_PER_TASK = 8
+
+
+def pdf_key(url: str) -> str:
+    return hashlib.md5(url.encode()).hexdigest()[:12]
+
+
+def download_pdf(url: str, timeout=60, cache=None) -> str:
+    """Stream the PDF to disk in 1 MB pieces; the response is never held in memory.
+
+    A PDF already on disk is revalidated with a conditional GET (validators
+    kept in the HttpCache) and only downloaded again when it changed.
+    """
+    os.makedirs(PDF_DIR, exist_ok=True)
+    cache = cache or get_default_cache()
+    path = os.path.join(PDF_DIR, pdf_key(url) + ".pdf")
+    # always revalidated, however recent: a claimed PDF is one someone wants checked
+    entry = cache.get(url) if os.path.exists(path) else None
+    headers = {**HEADERS, **(cache.conditional_headers(entry) if entry else {})}
+
+    tmp = f"{path}.{os.getpid()}.part"
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=timeout) as r:
+            if r.status_code == 304 and entry:
+                cache.revalidated(entry, r.headers)
+                return path
+            r.raise_for_status()
+            with open(tmp, "wb") as f:
+                for block in r.iter_content(chunk_size=1 << 20):
+                    f.write(block)
+        cache.put_file(url, r.status_code, r.headers, tmp)
+        os.replace(tmp, path)
+    finally:
+        # a failed or interrupted download leaves nothing behind
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def page_count(path: str) -> int:
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(path: str, start: int, stop: int) -> list:
+    """Extract text for pages [start, stop) (0-based). Runs in a worker process."""
+    out = []
+    with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            out.append((page.page_number - 1, page.extract_text() or ""))
+            # drop the parsed layout objects so memory stays flat on long PDFs
+            page.close()
+    return out
+
+
+def page_doc(item: dict, page_no: int, text: str) -> dict:
+    url = item["url"]
+    return {
+        "url": url,
+        "page": page_no + 1,
+        "state": item.get("state"),
+        "title": item.get("title"),
+        "initiative_id": item.get("initiative_id"),
+        "source": "initiatives",
+        "text": text,
+        "hash": hashlib.md5(f"{url}#page={page_no + 1}\n{text}".encode()).hexdigest(),
+    }
+
+
+def staging_path(url: str, digest: str) -> str:
+    return os.path.join(STAGING_DIR, f"{pdf_key(url)}.{digest[:12]}.jsonl")
+
+
+def load_staged(path: str) -> dict:
+    """chunk_id -> chunk from a PDF's staging file, read once per claim. A
+    kill mid-write can leave a torn last line; it is cut off, so the next
+    append starts on a line of its own."""
+    staged = {}
+    if not os.path.exists(path):
+        return staged
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].decode("utf-8").splitlines():
+        chunk = json.loads(line)
+        staged[chunk["chunk_id"]] = chunk
+    return staged
+
+
+def ingest_item(item: dict, queue: WorkQueue, pool: ProcessPoolExecutor, inflight: int,
+                worker: str, meta: MetadataStore) -> tuple:
+    """Extract, chunk and checkpoint one claimed PDF.
+
+    Returns (chunks, pages, digest), where chunks is every chunk of the PDF
+    (this attempt's and earlier ones'), or None when the file is the one
+    already indexed. A page batch is written to the PDF's staging file
+    before it is checkpointed; chunks an earlier attempt wrote past its last
+    checkpoint are recognised by chunk ID and not written again.
+    """
+    url = item["url"]
+    payload = {**item["payload"], "url": url}
+    path = download_pdf(url)
+    digest = file_digest(path)
+    total = page_count(path)
+    if meta.get_documents([url]).get(url, {}).get("indexed_hash") == digest:
+        return None, total, digest
+
+    staging = staging_path(url, digest)
+    for old in glob.glob(os.path.join(STAGING_DIR, pdf_key(url) + ".*.jsonl")):
+        if old != staging:
+            os.remove(old)      # staged from a version of the PDF that has since changed
+    staged = load_staged(staging)
+    # the checkpoint counts pages of the file it was made on; no staged chunks, no resume
+    done = (item["processed_pages"] or 0) if staged else 0
+    print(f"  {total} pages, resuming at {done}" if done else f"  {total} pages")
+    os.makedirs(STAGING_DIR, exist_ok=True)
+
+    # keep a bounded window of page batches in flight, consumed in page order
+    window = []
+    starts = iter(range(done, total, PAGES_PER_TASK))
+
+    def submit_next():
+        start = next(starts, None)
+        if start is not None:
+            window.append(pool.submit(extract_pages, path, start, min(start + PAGES_PER_TASK, total)))
+
+    for _ in range(inflight):
+        submit_next()
+
+    while window:
+        pages = window.pop(0).result()
+        submit_next()
+        lines = []
+        for page_no, text in pages:
+            for chunk in chunk_document(page_doc(payload, page_no, text)):
+                if chunk["chunk_id"] in staged:
+                    continue
+                # chunk IDs stay per page; doc_hash is the whole file's, like documents.content_hash
+                chunk["doc_hash"] = digest
+                staged[chunk["chunk_id"]] = chunk
+                lines.append(json.dumps(chunk, ensure_ascii=False) + "\n")
+        if lines:
+            with open(staging, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        done = pages[-1][0] + 1 if pages else done
+        if not queue.checkpoint(item["id"], done, worker=worker):
+            raise RuntimeError("lease lost")
+
+    chunks = list(staged.values())
+    for chunk in chunks:
+        chunk["doc_chunks"] = len(chunks)
+    return chunks, total, digest
+
+
+def run(index_args, max_items=None, workers=None, recheck=False):
+    queue = WorkQueue("pdf")
+    store = MetadataStore()
+    worker = worker_id()
+    inflight = 2 * (workers or os.cpu_count() or 1)
+    if recheck:
+        print(f"{queue.requeue_done()} finished PDFs queued again")
+
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while max_items is None or processed < max_items:
+            item = queue.claim(worker=worker)
+            if item is None:
+                break
+            processed += 1
+            print(f"[{processed}] {item['payload'].get('state', ''):20} | {item['url'][:60]}")
+
+            try:
+                chunks, pages, digest = ingest_item(item, queue, pool, inflight, worker, store)
+                if chunks is None:
+                    queue.complete(item["id"], worker=worker)
+                    print("  unchanged since it was indexed")
+                    continue
+                if chunks:
+                    _, job = asyncio.run(pipeline.index_chunks(index_args, chunks))
+                    if not job.indexed and not job.qdrant.in_memory:
+                        # the pipeline logs stage errors and goes on; keep the staged chunks for a retry
+                        raise RuntimeError("chunks were not indexed")
+                    os.remove(staging_path(item["url"], digest))
+                queue.complete(item["id"], worker=worker)
+                store.upsert_documents([{
+                    "url": item["url"], "state": item["payload"].get("state"), "source": "initiatives",
+                    "doc_type": "pdf", "initiative_id": item["payload"].get("initiative_id"),
+                    "title": item["payload"].get("title"), "status": "success", "processed_pages": pages,
+                    "content_hash": digest,
+                    "fetched_at": datetime.utcnow().isoformat(), "changed_at": datetime.utcnow().isoformat(),
+                }])
+                print(f"  OK — {len(chunks)} chunks indexed")
+
+            except Exception as e:
+                queue.fail(item["id"], str(e), worker=worker)
+                print(f"  FAIL — {str(e)[:70]}")
+
+    print(f"\nDone: {processed} PDFs this run, queue status {queue.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drain the PDF work queue")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: cores)")
+    parser.add_argument("--max-items", type=int, default=None)
+    parser.add_argument("--recheck", action="store_true",
+                        help="queue finished PDFs again; unchanged ones are revalidated and skipped")
+    parser.add_argument("--hashing", action="store_true", help="offline HashingBackend embeddings")
+    parser.add_argument("--qdrant-url", default=None)
+    parser.add_argument("--qdrant-path", default=None)
+    args = parser.parse_args()
+
+    index_args = pipeline.build_parser().parse_args(["--log-every", "0"])
+    index_args.hashing, index_args.qdrant_url, index_args.qdrant_path = \
+        args.hashing, args.qdrant_url, args.qdrant_path
+    run(index_args, max_items=args.max_items, workers=args.workers, recheck=args.recheck)
+    # local-mode Qdrant flushes on close; left to interpreter shutdown it can fail
+    get_client(**pipeline.qdrant_target(index_args)).close()
@@ -0,0 +1,697 @@
+import os
+import sys
+import json
+import fcntl
+import time
+import asyncio
+import argparse
+import contextlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.fetcher import AsyncFetcher
+from scraper.render import RenderPool
+from scraper.http_cache import get_default_cache
+from scraper.classify import probe_url
+from scraper.extract import parse_html, extract_tree
+from scraper.instrument import Histogram, Instrument, get_instrument, timed
+from scraper.store import RawStore
+from scraper.run import save_page, save_documents
+from scaper.normalizer import normalize_text
+from scaper.hasher import HashIndex
+from processor.chunker import chunk_document, doc_text
+from processor.embedder import Embedder, EmbeddingCache, HashingBackend
+from db.qdrant_client import QDRANT_DIR, QdrantStore, get_client
+from db.inverted_index import InvertedIndex
+from db.sqlite_client import MetadataStore, now
+from db.work_queue import WorkQueue, worker_id
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+METRICS_FILE = os.path.join(DATA_DIR, "logs", "pipeline_metrics.json")
+INDEX_LOCK = os.path.join(DATA_DIR, "index.lock")
+
+# crawler document fields carried onto every chunk (see processor/chunker.py)
+DOC_META = ("title", "page_type", "published_date")
+
+_DONE = object()
+
+
+# --- Metrics ---
+
+@dataclass
+class StageMetrics:
+    received: int = 0
+    emitted: int = 0
+    skipped: int = 0
+    errors: int = 0
+    busy: float = 0.0            # seconds spent inside the stage function, summed over workers
+    first: float = None
+    last: float = None
+    depth_max: int = 0
+    depth_samples: list = field(default_factory=list)
+    latency: Histogram = field(default_factory=Histogram)
+
+    @property
+    def items_per_sec(self) -> float:
+        if not self.received or self.first is None or self.last <= self.first:
+            return 0.0
+        return self.received / (self.last - self.first)
+
+    def sample(self, depth: int):
+        self.depth_max = max(self.depth_max, depth)
+        self.depth_samples.append(depth)
+
+    def to_dict(self) -> dict:
+        samples = self.depth_samples
+        return {
+            "received": self.received, "emitted": self.emitted,
+            "skipped": self.skipped, "errors": self.errors,
+            "busy_sec": round(self.busy, 3),
+            "items_per_sec": round(self.items_per_sec, 2),
+            "queue_depth_max": self.depth_max,
+            "queue_depth_avg": round(sum(samples) / len(samples), 2) if samples else 0,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_p99": self.latency.quantile(0.99),
+            "latency": self.latency.to_dict(),
+        }
+
+
+# --- Stages ---
+
+@dataclass
+class Stage:
+    """One step of the pipeline.
+
+    `fn(item)` returns the item for the next stage, or None to drop it
+    (counted as skipped). With `fanout` it returns a list and every element
+    goes on. With `batch` > 1 it is called with a list of up to `batch`
+    items and returns a list. `kind` decides where fn runs: "async" (a
+    coroutine function on the event loop), "thread" or "process" (a pool of
+    `workers`; process stages need a module-level fn and picklable items).
+    """
+    name: str
+    fn: object
+    kind: str = "thread"
+    workers: int = 1
+    batch: int = 1
+    batch_wait: float = 0.05
+    fanout: bool = False
+    metrics: StageMetrics = field(default_factory=StageMetrics)
+
+
+class Pipeline:
+    """Streams items through stages connected by bounded queues.
+
+    Every stage runs its own workers concurrently with the others, so a
+    slow stage fills its input queue and pauses the stages upstream instead
+    of buffering the whole run in memory. Per-stage counters, queue depth
+    samples and latency histograms are kept in `stage.metrics`.
+    """
+
+    def __init__(self, stages, queue_size=64, sample_every=0.25, log_every=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.sample_every = sample_every
+        self.log_every = log_every
+        self.started = self.finished = None
+
+    async def _call(self, stage: Stage, executor, arg):
+        if stage.kind == "async":
+            return await stage.fn(arg)
+        return await asyncio.get_running_loop().run_in_executor(executor, stage.fn, arg)
+
+    async def _take(self, stage: Stage, queue: asyncio.Queue):
+        item = await queue.get()
+        if stage.batch <= 1 or item is _DONE:
+            return item
+        batch, deadline = [item], time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch:
+            try:
+                item = await asyncio.wait_for(queue.get(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                break
+            if item is _DONE:
+                queue.put_nowait(item)   # finish this batch; the next take() sees the end
+                break
+            batch.append(item)
+        return batch
+
+    async def _worker(self, stage: Stage, executor, inbox, outbox):
+        m = stage.metrics
+        while (arg := await self._take(stage, inbox)) is not _DONE:
+            n = len(arg) if stage.batch > 1 else 1
+            start = time.monotonic()
+            m.received += n
+            if m.first is None:
+                m.first = start
+            try:
+                result = await self._call(stage, executor, arg)
+            except Exception as e:
+                m.errors += n
+                if m.errors <= 5:
+                    print(f"  [{stage.name}] {type(e).__name__}: {str(e)[:100]}")
+                result = None
+            else:
+                if result is None:
+                    m.skipped += n
+            elapsed = time.monotonic() - start
+            m.busy += elapsed
+            m.latency.observe(elapsed)
+            m.last = time.monotonic()
+
+            if result is None:
+                continue
+            for out in (result if stage.fanout or stage.batch > 1 else [result]):
+                if out is None:
+                    continue
+                m.emitted += 1
+                if outbox is not None:
+                    await outbox.put(out)
+        inbox.put_nowait(_DONE)   # let sibling workers see the end too
+
+    async def _run_stage(self, stage: Stage, inbox, outbox):
+        executor = None
+        if stage.kind == "thread":
+            executor = ThreadPoolExecutor(stage.workers, thread_name_prefix=stage.name)
+        elif stage.kind == "process":
+            executor = ProcessPoolExecutor(stage.workers)
+        try:
+            await asyncio.gather(*(self._worker(stage, executor, inbox, outbox)
+                                   for _ in range(stage.workers)))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    async def _monitor(self, queues):
+        last_log = time.monotonic()
+        while True:
+            await asyncio.sleep(self.sample_every)
+            for stage, queue in zip(self.stages, queues):
+                stage.metrics.sample(queue.qsize())
+            if self.log_every and time.monotonic() - last_log >= self.log_every:
+                last_log = time.monotonic()
+                print("  " + "  ".join(f"{s.name} {s.metrics.received}/{q.qsize()}q"
+                                       for s, q in zip(self.stages, queues)))
+
+    async def _feed(self, source, queue):
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                await queue.put(item)
+        else:
+            for item in source:
+                await queue.put(item)
+        await queue.put(_DONE)
+
+    async def run(self, source) -> dict:
+        """Push every item of `source` (iterable or async iterable) through all stages."""
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        self.started = time.monotonic()
+        monitor = asyncio.create_task(self._monitor(queues))
+        try:
+            await asyncio.gather(
+                self._feed(source, queues[0]),
+                *(self._run_stage(stage, queues[i], queues[i + 1] if i + 1 < len(queues) else None)
+                  for i, stage in enumerate(self.stages)),
+            )
+        finally:
+            monitor.cancel()
+            self.finished = time.monotonic()
+        return self.metrics()
+
+    def metrics(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - (self.started or time.monotonic())
+        return {
+            "elapsed_sec": round(elapsed, 3),
+            "stages": {s.name: {"kind": s.kind, "workers": s.workers, **s.metrics.to_dict()}
+                       for s in self.stages},
+        }
+
+    def report(self) -> str:
+        """Table of where the time went, one row per stage."""
+        m = self.metrics()
+        busy_total = sum(s["busy_sec"] for s in m["stages"].values()) or 1
+        lines = [f"{'stage':10} {'kind':7} {'w':>3} {'in':>7} {'out':>7} {'skip':>6} {'err':>5} "
+                 f"{'items/s':>9} {'busy s':>8} {'share':>6} {'q max':>6} {'q avg':>6} "
+                 f"{'p50':>7} {'p95':>7} {'p99':>7}"]
+        for name, s in m["stages"].items():
+            lines.append(
+                f"{name:10} {s['kind']:7} {s['workers']:3} {s['received']:7} {s['emitted']:7} "
+                f"{s['skipped']:6} {s['errors']:5} {s['items_per_sec']:9.1f} {s['busy_sec']:8.2f} "
+                f"{s['busy_sec'] / busy_total:6.1%} {s['queue_depth_max']:6} {s['queue_depth_avg']:6.1f} "
+                f"{s['latency_p50']:7.3f} {s['latency_p95']:7.3f} {s['latency_p99']:7.3f}")
+        lines.append(f"total {m['elapsed_sec']:.2f}s wall clock")
+        return "\n".join(lines)
+
+
+# --- Refresh: classify -> fetch -> extract -> normalize -> dedupe -> chunk -> embed -> index ---
+
+def _quiet(*_):
+    pass
+
+
+def extract_page(item: dict) -> dict:
+    # process stage: decoding and parsing both happen in the worker
+    if "content" in item:
+        timings = item["timings"]
+        with timed(timings, "parse"):
+            html = item.pop("content").decode(item.pop("encoding") or "utf-8", errors="replace")
+            tree = parse_html(html)
+        with timed(timings, "extract"):
+            item["text"] = extract_tree(tree)
+    return item
+
+
+def normalize_page(item: dict) -> dict:
+    with timed(item["timings"], "extract"):
+        item["text"] = normalize_text(item["text"])
+    return item
+
+
+def chunk_page(doc: dict) -> list:
+    chunks = list(chunk_document(doc))
+    for chunk in chunks:
+        chunk["doc_chunks"] = len(chunks)
+    return chunks
+
+
+class Refresh:
+    """State shared by the refresh stages: the fetcher, hash index, raw store,
+    embedder, vector store and keyword index, plus the per-URL records written
+    at the end. With an Instrument, each page's fetch/parse/extract/write
+    timings are logged once its record is settled (after dedupe, or at fetch
+    for failed and unchanged pages)."""
+
+    def __init__(self, fetcher, index, store, embedder, qdrant, meta, cache=None,
+                 reclassify=False, force=False, keywords=None, renderer=None,
+                 instrument: Instrument = None, drop_irrelevant=False):
+        self.fetcher = fetcher
+        self.instrument = instrument
+        self.renderer = renderer
+        self.index = index
+        self.store = store
+        self.embedder = embedder
+        self.qdrant = qdrant
+        self.keywords = keywords
+        self.meta = meta
+        self.cache = cache
+        self.reclassify = reclassify
+        self.force = force
+        self.drop_irrelevant = drop_irrelevant
+        # pages hashed in an earlier run whose chunks never made it into the index
+        self.pending = dict(index.pending())
+        self.records = {}
+        self.classified = []
+        self.collection_ready = False
+        self.cleared = set()
+        self.done = defaultdict(list)
+        self.unflushed = []
+        self.indexed = []
+
+    async def classify(self, source: dict):
+        if self.reclassify or not source.get("type"):
+            source["type"] = await probe_url(self.fetcher, source["url"], self.cache)
+            self.classified.append(source)
+        if source["type"] == "static_html" or (source["type"] == "js_rendered" and self.renderer):
+            return source
+        return None
+
+    async def fetch(self, source: dict):
+        url = source["url"]
+        if url in self.records:
+            return None   # listed under more than one state; the first one wins
+        record = self.records[url] = {
+            "url": url, "state": source["state"],
+            "status": None, "chars": 0,
+            "file": None, "error": None,
+            "scraped_at": datetime.utcnow().isoformat()
+        }
+        if source["type"] == "js_rendered":
+            fetched = await self.renderer.render(url)
+        else:
+            fetched = await self.fetcher.fetch(url)
+        item = {"url": url, "state": source["state"], "timings": dict(fetched.timings),
+                "bytes": len(fetched.content), "http": fetched.status, "cached": fetched.from_cache}
+        if not fetched.ok:
+            record["status"] = "failed"
+            record["error"] = (fetched.error or f"HTTP {fetched.status}")[:120]
+            self.log_timings(item)
+            raise RuntimeError(f"{url[:60]}: {record['error']}")
+
+        if fetched.not_modified and url in self.index:
+            self.index.touch(url)
+            record["status"] = "unchanged"
+            doc = self.store.get(url) if url in self.pending or self.force else None
+            if doc is None:
+                self.log_timings(item)
+                return None
+            item["text"] = doc["text"]
+        else:
+            item["content"], item["encoding"] = fetched.content, fetched.encoding
+        return item
+
+    def accept(self, doc: dict):
+        # a document a crawler already fetched (PRS bill, JustAI post): straight to normalize
+        url = doc["url"]
+        if url in self.records:
+            return None
+        self.records[url] = {
+            "url": url, "state": doc.get("state"),
+            "source": doc["source"], "doc_type": doc["doc_type"],
+            "status": None, "chars": 0,
+            "file": None, "error": None,
+            "scraped_at": datetime.utcnow().isoformat()
+        }
+        text = doc_text(doc)
+        return {"url": url, "state": doc.get("state"), "text": text, "timings": {},
+                "bytes": len(text.encode()), "http": None, "cached": False,
+                "source": doc["source"], "meta": {k: doc[k] for k in DOC_META if doc.get(k) is not None}}
+
+    def log_timings(self, item: dict):
+        if self.instrument is not None:
+            record = self.records[item["url"]]
+            self.instrument.record(item["url"], item["timings"], record["status"], state=record["state"],
+                                   http=item["http"], bytes=item["bytes"], cached=item["cached"])
+
+    def dedupe(self, item: dict):
+        url, record = item["url"], self.records[item["url"]]
+        save_page(url, item["state"], item["text"], record, self.index, self.store, log=_quiet,
+                  timings=item["timings"], source=item.get("source"), drop_irrelevant=self.drop_irrelevant)
+        self.log_timings(item)
+        status = record["status"]
+        forward = status in ("success", "updated") or (
+            status == "unchanged" and (self.force or self.pending.get(url) == record.get("hash")))
+        if not forward:
+            return None
+        return {"url": url, "state": item["state"], "source": item.get("source", "state_portal"),
+                "text": item["text"], "hash": record["hash"], **item.get("meta", {})}
+
+    async def embed(self, chunks: list):
+        vectors = await self.embedder.aembed_texts([c["text"] for c in chunks])
+        return [(chunks, vectors)]
+
+    def index_batch(self, batch: tuple):
+        chunks, vectors = batch
+        if not self.collection_ready:
+            self.qdrant.ensure_collection(vectors.shape[1])
+            self.collection_ready = True
+        # a changed page's old chunks go before its first new batch lands
+        for url in {c["url"] for c in chunks} - self.cleared:
+            self.qdrant.delete_doc(url)
+            if self.keywords is not None:
+                self.keywords.delete_doc(url)
+            self.cleared.add(url)
+        self.qdrant.upsert_chunks(chunks, vectors)
+        if self.keywords is not None:
+            self.keywords.add(chunks)
+
+        finished = []
+        for c in chunks:
+            rows = self.done[c["url"]]
+            rows.append({k: c[k] for k in ("chunk_id", "doc_hash", "ordinal", "start", "end", "token_count")}
+                        | {"doc_url": c["url"]})
+            if len(rows) == c["doc_chunks"]:
+                finished.append((c["url"], c["doc_hash"]))
+        for url, digest in finished:
+            self.meta.replace_chunks(url, self.done.pop(url))
+        self.unflushed.extend(finished)
+        if self.keywords is None or self.keywords.flush_due():
+            self.commit()
+        return len(chunks)
+
+    def commit(self):
+        # a page counts as indexed once its chunks are searchable in both indexes
+        if self.keywords is not None:
+            self.keywords.flush()
+        if self.qdrant.in_memory:
+            # those vectors die with the process; the pages must be embedded again next run
+            self.unflushed = []
+            return
+        self.index.mark_indexed(self.unflushed)
+        self.indexed.extend(self.unflushed)
+        self.unflushed = []
+
+    def stages(self, classify_workers=32, fetch_workers=None, extract_workers=None,
+               chunk_workers=None, embed_workers=2, embed_batch=256) -> list:
+        return [
+            Stage("classify", self.classify, "async", classify_workers),
+            Stage("fetch", self.fetch, "async", fetch_workers or self.fetcher.concurrency),
+            Stage("extract", extract_page, "process", extract_workers or os.cpu_count() or 1),
+        ] + self.index_stages(chunk_workers, embed_workers, embed_batch)
+
+    def document_stages(self, chunk_workers=None, embed_workers=2, embed_batch=256) -> list:
+        return [Stage("accept", self.accept, "thread", 1)] + \
+            self.index_stages(chunk_workers, embed_workers, embed_batch)
+
+    def index_stages(self, chunk_workers=None, embed_workers=2, embed_batch=256) -> list:
+        # normalize onwards, shared by fetched pages and crawler documents
+        cpus = os.cpu_count() or 1
+        return [
+            Stage("normalize", normalize_page, "thread", 1),
+            Stage("dedupe", self.dedupe, "thread", 1),
+            Stage("chunk", chunk_page, "process", chunk_workers or max(1, cpus // 2), fanout=True),
+        ] + self.chunk_stages(embed_workers, embed_batch)
+
+    def chunk_stages(self, embed_workers=2, embed_batch=256) -> list:
+        # for chunks made elsewhere (the PDF work queue chunks pages in its own pool)
+        return [
+            Stage("embed", self.embed, "async", embed_workers, batch=embed_batch),
+            Stage("index", self.index_batch, "thread", 1),
+        ]
+
+    def save(self):
+        self.commit()
+        if self.classified:
+            self.meta.upsert_sources(
+                {"url": s["url"], "state": s["state"], "type": s["type"], "classified_at": now()}
+                for s in self.classified)
+        save_documents(list(self.records.values()))
+        self.meta.upsert_documents({"url": url, "indexed_hash": digest} for url, digest in self.indexed)
+
+
+def load_sources(path: str, limit=None) -> list:
+    with open(path, encoding="utf-8") as f:
+        sources = json.load(f)
+    return sources[:limit] if limit else sources
+
+
+@contextlib.contextmanager
+def index_lock(path=INDEX_LOCK):
+    """Held by every run that writes the indexes: the keyword index and the raw
+    store take one writer at a time, and a refresh, a scheduler job and the PDF
+    queue can otherwise overlap. Waits for the current holder."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def qdrant_target(args) -> dict:
+    """--qdrant-url / --qdrant-path; otherwise resolve_target's default, the same one the API uses."""
+    return {"url": args.qdrant_url, "path": args.qdrant_path}
+
+
+async def refresh(args, sources=None) -> tuple:
+    """Run one refresh over `sources` (default: args.sources); returns (pipeline, Refresh)."""
+    if sources is None:
+        sources = load_sources(args.sources, args.limit)
+    cache = get_default_cache()
+    embedder = Embedder(HashingBackend() if args.hashing else None, EmbeddingCache(),
+                        max_concurrency=args.embed_workers)
+    qdrant = QdrantStore(client=get_client(**qdrant_target(args)))
+
+    instrument = get_instrument()
+    fetcher = AsyncFetcher(concurrency=args.concurrency, timeout=15, cache=cache, instrument=instrument)
+    # browsers only start when some source is (or may turn out to be) js_rendered;
+    # they share the fetcher's per-host rate limits
+    render = args.render_browsers > 0 and any(s.get("type") in (None, "js_rendered") for s in sources)
+    pool = RenderPool(browsers=args.render_browsers, contexts=args.render_contexts,
+                      timeout=args.render_timeout, limiter=fetcher) if render else contextlib.nullcontext()
+
+    async with fetcher, pool as renderer:
+        with index_lock(), RawStore(writer=True) as store, InvertedIndex() as keywords:
+            job = Refresh(fetcher, HashIndex(), store, embedder, qdrant, MetadataStore(), cache=cache,
+                          reclassify=args.reclassify, force=args.force, keywords=keywords,
+                          renderer=renderer, instrument=instrument, drop_irrelevant=args.drop_irrelevant)
+            pipe = Pipeline(job.stages(extract_workers=args.extract_workers,
+                                       chunk_workers=args.chunk_workers,
+                                       embed_workers=args.embed_workers,
+                                       embed_batch=args.embed_batch),
+                            queue_size=args.queue_size, log_every=args.log_every)
+            await pipe.run(sources)
+            job.save()
+
+    cache.evict()
+    instrument.write_textfile()
+    statuses = Counter(r["status"] for r in job.records.values())
+    print(f"\n{len(sources)} sources  |  " + "  |  ".join(f"{k}: {v}" for k, v in sorted(statuses.items())))
+    print(f"{len(job.indexed)} documents indexed\n")
+    dropped = [r for r in job.records.values() if r["status"] == "irrelevant"]
+    if dropped:
+        print("Dropped as irrelevant (--drop-irrelevant):")
+        for r in dropped:
+            print(f"  [{r['state']:20}] {r['url']}")
+        print()
+    return pipe, job
+
+
+async def index_documents(args, docs: list) -> tuple:
+    """Chunk, embed and index documents a crawler already fetched; returns (pipeline, Refresh).
+
+    Each doc needs url, source and doc_type, and its text as "text" or
+    "raw_text". They go through the same normalize -> dedupe -> chunk ->
+    embed -> index stages as portal pages, so a document whose text hashes
+    the same as last time stops at dedupe.
+    """
+    embedder = Embedder(HashingBackend() if args.hashing else None, EmbeddingCache(),
+                        max_concurrency=args.embed_workers)
+    qdrant = QdrantStore(client=get_client(**qdrant_target(args)))
+    with index_lock(), RawStore(writer=True) as store, InvertedIndex() as keywords:
+        job = Refresh(None, HashIndex(), store, embedder, qdrant, MetadataStore(),
+                      force=args.force, keywords=keywords)
+        pipe = Pipeline(job.document_stages(chunk_workers=args.chunk_workers,
+                                            embed_workers=args.embed_workers,
+                                            embed_batch=args.embed_batch),
+                        queue_size=args.queue_size, log_every=args.log_every)
+        await pipe.run(docs)
+        job.save()
+
+    statuses = Counter(f"{r['source']} {r['status']}" for r in job.records.values())
+    print(f"\n{len(docs)} documents  |  " + "  |  ".join(f"{k}: {v}" for k, v in sorted(statuses.items())))
+    print(f"{len(job.indexed)} documents indexed\n")
+    return pipe, job
+
+
+async def index_chunks(args, chunks: list) -> tuple:
+    """Embed and index chunks made elsewhere; returns (pipeline, Refresh).
+
+    `chunks` must hold every chunk of each document it touches, with
+    doc_chunks set to that count: a document's old chunks are dropped before
+    its first new batch lands, and it counts as indexed (documents.indexed_hash
+    = its chunks' doc_hash) once all of them are in.
+    """
+    embedder = Embedder(HashingBackend() if args.hashing else None, EmbeddingCache(),
+                        max_concurrency=args.embed_workers)
+    qdrant = QdrantStore(client=get_client(**qdrant_target(args)))
+    with index_lock(), InvertedIndex() as keywords:
+        job = Refresh(None, HashIndex(), None, embedder, qdrant, MetadataStore(), keywords=keywords)
+        pipe = Pipeline(job.chunk_stages(embed_workers=args.embed_workers, embed_batch=args.embed_batch),
+                        queue_size=args.queue_size, log_every=args.log_every)
+        await pipe.run(chunks)
+        job.save()
+    return pipe, job
+
+
+def settle_item(queue: WorkQueue, item: dict, source: dict, job, worker: str) -> str:
+    """Complete or fail one web queue item from what refresh() made of it; returns its outcome."""
+    kind, record = source.get("type"), job.records.get(item["url"])
+    if kind == "pdf":
+        # an initiative link that turned out to be a PDF goes to the PDF queue
+        WorkQueue("pdf", queue.path).enqueue([{**item["payload"], "type": "pdf", "status": "pending", "processed_pages": 0}])
+        queue.complete(item["id"], worker)
+        return "pdf"
+    if record is None:
+        queue.fail(item["id"], kind if kind.startswith("error") else f"{kind}: no browsers to render it", worker)
+        return "failed"
+    if record["status"] == "failed":
+        queue.fail(item["id"], record["error"] or "failed", worker)
+        return "failed"
+    queue.complete(item["id"], worker)
+    return record["status"]
+
+
+async def refresh_queue(args, queue: WorkQueue = None) -> Counter:
+    """Drain the web work queue (scaper/pdf-files/build_web_queue.py) through refresh().
+
+    Items are claimed --queue-batch at a time and leased for --queue-lease
+    seconds, which must cover one refresh of the batch. A failed page goes
+    back with backoff; one that classifies as a PDF moves to the PDF queue.
+    """
+    queue = queue or WorkQueue("web")
+    worker = worker_id()
+    outcomes = Counter()
+    while True:
+        items = []
+        while len(items) < args.queue_batch:
+            item = queue.claim(worker, lease_seconds=args.queue_lease)
+            if item is None:
+                break
+            items.append(item)
+        if not items:
+            break
+        sources = [{"url": item["url"], "state": item["payload"].get("state")} for item in items]
+        _, job = await refresh(args, sources)
+        outcomes.update(settle_item(queue, item, source, job, worker) for item, source in zip(items, sources))
+    print(f"web queue: {dict(outcomes)}  |  status {queue.stats()}")
+    return outcomes
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="End-to-end refresh: classify -> fetch -> extract -> "
+                                                 "normalize -> dedupe -> chunk -> embed -> index")
+    parser.add_argument("--sources", default="sources.json",
+                        help="sources with url/state (and type, if already classified)")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--web-queue", action="store_true",
+                        help="take pages from the web work queue (build_web_queue.py) instead of --sources")
+    parser.add_argument("--queue-batch", type=int, default=50, help="web queue items per refresh")
+    parser.add_argument("--queue-lease", type=int, default=1800, help="seconds a claimed batch stays leased")
+    parser.add_argument("--reclassify", action="store_true", help="probe sources that already have a type")
+    parser.add_argument("--force", action="store_true", help="re-chunk and re-embed unchanged pages")
+    parser.add_argument("--drop-irrelevant", action="store_true",
+                        help="skip portal pages without AI keywords (default: keep them, scored)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent HTTP requests")
+    parser.add_argument("--extract-workers", type=int, default=None)
+    parser.add_argument("--chunk-workers", type=int, default=None)
+    parser.add_argument("--embed-workers", type=int, default=2)
+    parser.add_argument("--embed-batch", type=int, default=256)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--render-browsers", type=int, default=2,
+                        help="headless browsers for js_rendered sources (0 skips them)")
+    parser.add_argument("--render-contexts", type=int, default=4, help="pages rendered at once per browser")
+    parser.add_argument("--render-timeout", type=float, default=30.0, help="seconds per rendered page")
+    parser.add_argument("--hashing", action="store_true", help="offline HashingBackend embeddings")
+    parser.add_argument("--qdrant-url", default=None)
+    parser.add_argument("--qdrant-path", default=None,
+                        help=f"on-disk Qdrant (default without QDRANT_URL/QDRANT_PATH: {QDRANT_DIR}; "
+                             "set QDRANT_URL instead while the API is running)")
+    parser.add_argument("--log-every", type=float, default=5.0)
+    parser.add_argument("--metrics", default=METRICS_FILE)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if args.web_queue:
+        asyncio.run(refresh_queue(args))
+        get_client(**qdrant_target(args)).close()
+        print(get_instrument().report())
+        return
+
+    pipe, job = asyncio.run(refresh(args))
+    # local-mode Qdrant flushes on close; left to interpreter shutdown it can fail
+    job.qdrant.client.close()
+    print(pipe.report())
+    print(get_instrument().report())
+
+    os.makedirs(os.path.dirname(args.metrics), exist_ok=True)
+    with open(args.metrics, "w") as f:
+        json.dump({"run_at": datetime.utcnow().isoformat(), **pipe.metrics(),
+                   "scrape": get_instrument().to_dict()}, f, indent=2)
+    print(f"metrics → {args.metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
-import requests
+import os
+import sys
+import json
 from bs4 import BeautifulSoup
 from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.fetch_pipeline import FetchPipeline
 from utils import clean_text
 
 BASE_URL = "https://justai.in"
@@ -10,6 +18,9 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
 
+# only what wp_post_to_doc reads; drops yoast/embedded blobs from each page
+POST_FIELDS = "id,link,title,content,excerpt,date,modified,author,tags"
+
 def html_to_text(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
     return clean_text(soup.get_text(" "))
@@ -39,6 +50,8 @@ def wp_post_to_doc(post: dict) -> dict:
         "raw_text": raw_text,
         "summary": summary,
         "published_date": post.get("date"),
+        "modified": post.get("modified"),
+        "post_id": post.get("id"),
         "author": post.get("author"),
         "scraped_at": datetime.utcnow().isoformat(),
         "tags": post.get("tags", []),
@@ -51,24 +64,68 @@ def wp_post_to_doc(post: dict) -> dict:
     }
     return doc
 
-def fetch_justai_docs(per_page=100, max_pages=10):
-    docs = []
-    page = 1
+def parse_posts_page(body: str) -> list:
+    """One /wp/v2/posts response -> docs. Runs in a parse worker."""
+    return [wp_post_to_doc(post) for post in json.loads(body)]
+
+def _header(headers: dict, name: str, default=None):
+    name = name.lower()
+    return next((v for k, v in headers.items() if k.lower() == name), default)
+
+async def iter_justai_docs(state: dict, per_page=100, max_pages=None, workers=None, rate=4.0):
+    """Stream docs for posts modified since state["modified_after"].
 
-    while page <= max_pages:
-        params = {"per_page": per_page, "page": page}
-        r = requests.get(POSTS_API, headers=HEADERS, params=params)
+    Page 1 is read first for X-WP-TotalPages; the remaining pages are fetched
+    concurrently and parsed in a process pool, one page in memory at a time.
+    Posts are deduped by ID within the run, and `state` (the high-water
+    mark) is advanced only after every page came back, so a failed run is
+    simply retried from the old mark.
+    """
+    mark = state.get("modified_after")
+    at_mark = set(state.get("ids_at_mark", []))
+    newest, newest_ids = mark, set(at_mark)
+    seen = set()
+    complete = True
 
-        if r.status_code != 200:
-            break
+    # ordering by ID keeps pages stable while posts are edited mid-run
+    query = f"{POSTS_API}?per_page={per_page}&orderby=id&order=asc&_fields={POST_FIELDS}"
+    if mark:
+        query += f"&modified_after={mark}"
 
-        posts = r.json()
-        if not posts:
-            break
+    async with FetchPipeline(workers=workers, headers=HEADERS, per_host_rate=rate,
+                             per_host_burst=int(rate) or 1, per_host_concurrency=4) as pipe:
+        first = await pipe.fetcher.fetch(f"{query}&page=1")
+        if not first.ok:
+            raise RuntimeError(f"JustAI posts API: {first.error}")
+        total = int(_header(first.headers, "X-WP-TotalPages", 1))
+        if max_pages:
+            total = min(total, max_pages)
+        print(f"JustAI: {_header(first.headers, 'X-WP-Total', '?')} posts "
+              f"{'since ' + mark if mark else 'in total'}, {total} pages")
 
-        for post in posts:
-            docs.append(wp_post_to_doc(post))
+        async def pages():
+            nonlocal complete
+            yield parse_posts_page(first.text)
+            async for parsed in pipe.run((f"{query}&page={p}" for p in range(2, total + 1)),
+                                         parse_posts_page):
+                if parsed.ok:
+                    yield parsed.result
+                else:
+                    complete = False
+                    print(f"  page failed: {parsed.url[-20:]} — {parsed.error}")
 
-        page += 1
+        async for docs in pages():
+            for doc in docs:
+                pid, modified = doc["post_id"], doc["modified"]
+                if pid in seen or (modified == mark and pid in at_mark):
+                    continue
+                seen.add(pid)
+                if newest is None or modified > newest:
+                    newest, newest_ids = modified, {pid}
+                elif modified == newest:
+                    newest_ids.add(pid)
+                yield doc
 
-    return docs
+    if complete and newest:
+        state["modified_after"] = newest
+        state["ids_at_mark"] = sorted(newest_ids)
@@ -1,13 +1,52 @@
-from ingest import fetch_justai_docs
-from storage import save_raw
+import asyncio
+
+from ingest import iter_justai_docs
+from storage import JsonlWriter, OUTPUT_FILE, load_state, save_state
+from db.sqlite_client import MetadataStore
+from processor.relevance import get_scorer
+
+BATCH = 500
+
+async def ingest(sink=None):
+    """Append relevant posts modified since the last run; `await sink(docs)`
+    gets them too, before the high-water mark moves past them."""
+    state = load_state()
+    store = MetadataStore()
+    scorer = get_scorer()
+    rows = []
+    delta = []
+    skipped = 0
+
+    with JsonlWriter() as out:
+        async for doc in iter_justai_docs(state):
+            # off-topic posts never reach chunking/embedding
+            relevance = scorer.score(f"{doc['title']}\n{doc['raw_text']}")
+            if not relevance.relevant:
+                skipped += 1
+                continue
+            doc["relevance"] = relevance.score
+            doc["matched_terms"] = relevance.terms
+            out.write(doc)
+            if sink:
+                delta.append(doc)
+            rows.append({"url": doc["url"], "source": doc["source"], "doc_type": "wp_post",
+                         "title": doc["title"], "status": "success", "fetched_at": doc["scraped_at"],
+                         "changed_at": doc["scraped_at"]})
+            if len(rows) >= BATCH:
+                store.upsert_documents(rows)
+                rows = []
+
+    store.upsert_documents(rows)
+    if sink and delta:
+        await sink(delta)
+    # written last: if anything above failed, the next run starts from the old mark
+    save_state(state)
+    return out.count, skipped
 
 def main():
     print("Fetching JustAI data...")
-    docs = fetch_justai_docs()
-    print(f"Found {len(docs)} docs")
-
-    for doc in docs:
-        save_raw(doc)
+    count, skipped = asyncio.run(ingest())
+    print(f"{count} new or updated docs → {OUTPUT_FILE} ({skipped} without AI keywords skipped)")
 
 if __name__ == "__main__":
     main()
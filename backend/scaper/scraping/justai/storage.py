@@ -6,9 +6,77 @@ OUTPUT_DIR = os.path.join(BASE_DIR, "data", "raw")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "justai_raw.jsonl")
+STATE_FILE = os.path.join(OUTPUT_DIR, "justai_state.json")
 
-def save_raw(record):
-    with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
-    print("SAVED:", record["title"])
+class JsonlWriter:
+    """One append handle with a large write buffer for a whole ingest run.
+
+    An edited post is appended again, so on a clean exit the file is
+    compacted back to one line per post (see compact()).
+    """
+
+    def __init__(self, path=OUTPUT_FILE, buffering=1 << 20):
+        self.path = path
+        self.buffering = buffering
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.path, "a", encoding="utf-8", buffering=self.buffering)
+        return self
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, *exc):
+        self._f.close()
+        self._f = None
+        if exc_type is None and self.count:
+            compact(self.path)
+
+
+def compact(path=OUTPUT_FILE) -> int:
+    """Keep one line per post_id, the one with the latest `modified` (the
+    later line on a tie), and return how many lines were dropped. Only ids
+    and line numbers are held in memory; lines without a post_id (or not
+    valid JSON) are kept as they are."""
+    latest, stale = {}, set()
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            try:
+                doc = json.loads(line)
+            except ValueError:
+                continue
+            pid, modified = doc.get("post_id"), doc.get("modified") or ""
+            if pid is None:
+                continue
+            if pid in latest and modified < latest[pid][0]:
+                stale.add(n)
+                continue
+            if pid in latest:
+                stale.add(latest[pid][1])
+            latest[pid] = (modified, n)
+
+    if stale:
+        tmp = path + ".tmp"
+        with open(path, encoding="utf-8") as src, open(tmp, "w", encoding="utf-8") as out:
+            out.writelines(line for n, line in enumerate(src) if n not in stale)
+        os.replace(tmp, path)
+    return len(stale)
+
+
+# --- High-water mark for incremental runs ---
+
+def load_state(path=STATE_FILE) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state: dict, path=STATE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
@@ -1,5 +1,11 @@
-import re 
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.normalizer import normalize_text
 
 def clean_text(text: str) -> str:
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
\ No newline at end of file
+    return normalize_text(text, keep_lines=False)
\ No newline at end of file
@@ -1,116 +1,213 @@
+import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 import json
+import hashlib
+import argparse
 import pandas as pd
-import time
-import random
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.http_cache import cached_get, get_default_cache
+from scraper.fetch_pipeline import extract_all
+from processor.relevance import get_scorer
+from scaper.normalizer import normalize_text
 
 # --- Base URLs ---
 BASE_URL = "https://prsindia.org"
 BILLTRACK_URL = f"{BASE_URL}/billtrack"
 
-# --- Keywords for AI relevance ---
-AI_KEYWORDS = [
-    'artificial intelligence', 'machine learning', 'deep learning',
-    'ai', 'neural network', 'robotics', 'autonomous system',
-    'computer vision', 'natural language processing', 'chatbot'
-]
-
 # --- Headers ---
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
 }
 
-# --- Check if text is AI-relevant ---
+# --- Check if text is AI-relevant (whole-word English + Hindi keywords) ---
 def is_ai_relevant(text):
-    if not text:
-        return False
-    text = text.lower()
-    return any(keyword in text for keyword in AI_KEYWORDS)
+    return get_scorer().is_relevant(text)
 
 # --- Extract details from each bill page ---
+NO_DETAILS = {"summary": "N/A", "status": "N/A", "ministry": "N/A", "pdf_link": "N/A"}
+
+def parse_bill_details(html):
+    soup = BeautifulSoup(html, 'lxml')
+
+    def extract(selector):
+        tag = soup.select_one(selector)
+        return normalize_text(tag.text) if tag else "N/A"
+
+    summary = extract('.field-type-text-with-summary')
+    status = extract('.field-name-field-bill-status .field-item')
+    ministry = extract('.field-name-field-ministry .field-item')
+
+    pdf_tag = soup.find('a', href=True, text=lambda t: t and 'Download' in t)
+    pdf_link = BASE_URL + pdf_tag['href'] if pdf_tag else "N/A"
+
+    return {
+        "summary": summary,
+        "status": status,
+        "ministry": ministry,
+        "pdf_link": pdf_link
+    }
+
 def get_bill_details(url):
     try:
-        res = requests.get(url, headers=HEADERS)
-        soup = BeautifulSoup(res.text, 'lxml')
-
-        def extract(selector):
-            tag = soup.select_one(selector)
-            return tag.text.strip() if tag else "N/A"
-
-        summary = extract('.field-type-text-with-summary')
-        status = extract('.field-name-field-bill-status .field-item')
-        ministry = extract('.field-name-field-ministry .field-item')
-
-        pdf_tag = soup.find('a', href=True, text=lambda t: t and 'Download' in t)
-        pdf_link = BASE_URL + pdf_tag['href'] if pdf_tag else "N/A"
-
-        return {
-            "summary": summary,
-            "status": status,
-            "ministry": ministry,
-            "pdf_link": pdf_link
-        }
+        res = cached_get(url, headers=HEADERS)
+        return parse_bill_details(res.text)
     except Exception as e:
         print(f"Error getting bill details from {url}: {e}")
-        return {"summary":"N/A","status":"N/A","ministry":"N/A","pdf_link":"N/A"}
+        return dict(NO_DETAILS)
+
+# --- Incremental state: bills already seen, keyed by URL ---
+# next to this script, so the scheduler finds the same files whatever its working directory
+PRS_DIR = os.path.dirname(os.path.abspath(__file__))
+SEEN_FILE = os.path.join(PRS_DIR, "prs_seen.jsonl")
+# every AI-related bill as of the last run: a JSON list, one entry per URL
+BILLS_JSON = os.path.join(PRS_DIR, "prs_ai_bills.json")
+BILLS_CSV = os.path.join(PRS_DIR, "prs_ai_bills.csv")
+
+def row_fingerprint(row):
+    # the listing row carries the title, date and current stage of the bill
+    return hashlib.md5(" ".join(row.get_text(" ").split()).encode()).hexdigest()
+
+def load_seen(path=SEEN_FILE):
+    seen = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    seen[entry["url"]] = entry    # later lines win
+    return seen
+
+def load_bills(path=BILLS_JSON):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {bill["url"]: bill for bill in json.load(f)}
+
+def save_bills(updated, dropped, path=BILLS_JSON, csv_path=BILLS_CSV):
+    """Merge this run's new/updated bills into the saved list and drop bills no longer AI-related."""
+    bills = load_bills(path)
+    for url in dropped:
+        bills.pop(url, None)
+    bills.update((bill["url"], bill) for bill in updated)
+    bills = list(bills.values())
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(bills, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+    pd.DataFrame(bills).to_csv(csv_path, index=False)
+    return len(bills)
+
+def append_jsonl(path, rows):
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def parse_listing(html):
+    soup = BeautifulSoup(html, 'lxml')
+    bills = []
+    for row in soup.select(".views-row"):
+        title_tag = row.find("a")
+        if not title_tag:
+            continue
+
+        href = title_tag.get("href")
+        date_tag = row.select_one('.date-display-single')
+        status_tag = row.select_one('[class*="status"]')
+        bills.append({
+            "title": normalize_text(title_tag.text, keep_lines=False),
+            "url": BASE_URL + href if href else "N/A",
+            "published_on": date_tag.text.strip() if date_tag else "N/A",
+            "listing_status": status_tag.text.strip() if status_tag else None,
+            "fingerprint": row_fingerprint(row),
+        })
+    return bills
 
 # --- Main scraper ---
-def scrape_ai_bills():
+def scrape_ai_bills(rate=1.0, full=False, sink=None):
+    """Fetch details only for bills that are new or whose listing entry (status) changed.
+
+    Detail pages download concurrently at `rate` requests/sec to prsindia.org,
+    revalidated with the server even inside the HTTP cache TTL since their
+    listing entry says they changed. prs_ai_bills.json/.csv keep one entry per
+    relevant bill: new and updated bills are merged in, bills that stopped
+    being AI-related are dropped.
+    `sink(bills)` gets the same new or updated bills before they are marked
+    seen, so if it raises the next run checks them again.
+    Returns the number of new or changed bills, or None if the listing failed.
+    """
     print("Scraping PRS for AI-related bills...")
     try:
-        response = requests.get(BILLTRACK_URL, headers=HEADERS)
+        # always asked (conditionally): a listing served from the cache hides changed bills
+        response = cached_get(BILLTRACK_URL, headers=HEADERS, revalidate=True)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         print(f"Error accessing PRSIndia: {e}")
-        return
-
-    soup = BeautifulSoup(response.text, 'lxml')
-    rows = soup.select(".views-row")
-    print(f"Found {len(rows)} bills total")
-
-    ai_bills = []
-
-    for i, row in enumerate(rows, start=1):
-        title_tag = row.find("a")
-        if not title_tag:
+        return None
+
+    bills = parse_listing(response.text)
+    seen = {} if full else load_seen(SEEN_FILE)
+    todo = {b["url"]: b for b in bills
+            if b["url"] != "N/A" and seen.get(b["url"], {}).get("fingerprint") != b["fingerprint"]}
+    print(f"Found {len(bills)} bills total, {len(todo)} new or changed")
+
+    seen_rows, ai_bills, dropped = [], [], []
+    jobs = extract_all(todo, parse_bill_details, revalidate=True, headers=HEADERS,
+                       cache=get_default_cache(), per_host_rate=rate, per_host_concurrency=2)
+    for i, parsed in enumerate(jobs, start=1):
+        bill = todo[parsed.url]
+        print(f"\n[{i}/{len(todo)}] Checking: {bill['title']}")
+        if not parsed.ok:
+            # not recorded as seen, so the next run tries it again
+            print(f"Error getting bill details from {parsed.url}: {parsed.error}")
             continue
 
-        title = title_tag.text.strip()
-        href = title_tag.get("href")
-        url = BASE_URL + href if href else "N/A"
-
-        date_tag = row.select_one('.date-display-single')
-        published_on = date_tag.text.strip() if date_tag else "N/A"
-
-        print(f"\n[{i}] Checking: {title}")
-
-        # Get details from bill page
-        details = get_bill_details(url)
-
-        # Filter only AI-related
-        if is_ai_relevant(title) or is_ai_relevant(details["summary"]):
-            print(f"Relevant AI bill found: {title}")
-            ai_bills.append({
-                "title": title,
-                "url": url,
-                "published_on": published_on,
-                **details
-            })
+        details = parsed.result
+        previous = seen.get(parsed.url)
+        relevance = get_scorer().score(f"{bill['title']}\n{details['summary']}")
+        relevant = relevance.relevant
+        seen_rows.append({"url": parsed.url, "status": details["status"],
+                          "listing_status": bill["listing_status"], "fingerprint": bill["fingerprint"],
+                          "relevant": relevant, "seen_at": datetime.utcnow().isoformat()})
+
+        # a changed listing with the same bill status needs no new output line
+        if previous and previous.get("status") == details["status"] \
+                and previous.get("relevant") == relevant:
+            print("No status change.")
+            continue
+        if relevant:
+            print(f"Relevant AI bill found: {bill['title']}")
+            ai_bills.append({"title": bill["title"], "url": bill["url"],
+                             "published_on": bill["published_on"], **details,
+                             "relevance": relevance.score, "matched_terms": relevance.terms})
         else:
             print("Not AI-related.")
-
-        time.sleep(random.uniform(0.5, 1.5))
-
-    # Save to JSON & CSV
-    with open("prs_ai_bills.json", "w", encoding="utf-8") as f:
-        json.dump(ai_bills, f, indent=2, ensure_ascii=False)
-
-    pd.DataFrame(ai_bills).to_csv("prs_ai_bills.csv", index=False)
-
-    print(f"\nDone! {len(ai_bills)} AI-related bills saved as:")
-    print(" - prs_ai_bills.json")
-    print(" - prs_ai_bills.csv")
+            if full or (previous and previous.get("relevant")):
+                dropped.append(parsed.url)
+
+    if sink and ai_bills:
+        sink(ai_bills)
+    if ai_bills or dropped or not os.path.exists(BILLS_JSON):
+        total = save_bills(ai_bills, dropped, BILLS_JSON, BILLS_CSV)
+    else:
+        total = len(load_bills(BILLS_JSON))
+    append_jsonl(SEEN_FILE, seen_rows)
+
+    print(f"\nDone! {len(ai_bills)} new or updated, {len(dropped)} dropped; {total} AI-related bills in:")
+    print(f" - {BILLS_JSON}")
+    print(f" - {BILLS_CSV}")
+    return len(todo)
 
 if __name__ == "__main__":
-    scrape_ai_bills()
+    parser = argparse.ArgumentParser(description="Incrementally scrape AI-related bills from PRS")
+    parser.add_argument("--rate", type=float, default=1.0, help="requests/sec to prsindia.org")
+    parser.add_argument("--full", action="store_true", help="ignore prs_seen.jsonl and recheck every bill")
+    args = parser.parse_args()
+    scrape_ai_bills(rate=args.rate, full=args.full)
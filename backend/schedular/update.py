@@ -0,0 +1,395 @@
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import asyncio
+import argparse
+import threading
+import importlib.util
+from datetime import datetime, timedelta
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.triggers.interval import IntervalTrigger
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.hasher import HashIndex
+from scaper import pipeline
+from scraper.instrument import get_instrument
+from db.sqlite_client import MetadataStore
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+SCHEDULE_FILE = os.path.join(DATA_DIR, "schedule.db")
+LOG_FILE = os.path.join(DATA_DIR, "logs", "scheduler.jsonl")
+
+PRS_SCRIPT = os.path.join(BACKEND_DIR, "scaper", "scraping", "prs", "prs.py")
+JUSTAI_RUN = os.path.join(BACKEND_DIR, "scaper", "scraping", "justai", "run.py")
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# base cadence per kind of source; each source then drifts within [base/4, base*4]
+CADENCE = {"justai": HOUR, "prs": DAY, "portal": WEEK}
+MIN_FACTOR, MAX_FACTOR = 0.25, 4.0
+TIGHTEN = 0.5    # interval multiplier after a check that found a change
+BACKOFF = 1.5    # ... and after one that found nothing new
+JITTER = 0.1     # +/- fraction of the interval
+
+# how often the portal job wakes up to look for portals that are due
+PORTAL_TICK = 6 * HOUR
+
+
+def bounds(kind: str) -> tuple:
+    base = CADENCE[kind]
+    return base * MIN_FACTOR, base * MAX_FACTOR
+
+
+def clamp(interval: float, kind: str) -> float:
+    lo, hi = bounds(kind)
+    return min(max(interval, lo), hi)
+
+
+def next_interval(interval: float, changed: bool, kind: str) -> float:
+    """Halve the interval when a check finds a change, grow it by half when it doesn't."""
+    return clamp(interval * (TIGHTEN if changed else BACKOFF), kind)
+
+
+def seed_interval(kind: str, first_seen=None, last_seen=None, change_count=0) -> float:
+    """Starting interval from the hash index history: the mean time between
+    observed changes, or the base cadence for a page we know nothing about."""
+    if not first_seen or not last_seen or last_seen - first_seen < CADENCE[kind]:
+        return CADENCE[kind]
+    return clamp((last_seen - first_seen) / (change_count + 1), kind)
+
+
+def jittered(interval: float, jitter=JITTER) -> float:
+    return interval * (1 + random.uniform(-jitter, jitter))
+
+
+class Schedule:
+    """Per-source cadence and change history (data/schedule.db).
+
+    A source is a URL for state portals, or "prs"/"justai" for the two
+    crawlers that track their own deltas. `record()` stores the outcome of a
+    check and moves the source's next due time by its adapted interval.
+    """
+
+    def __init__(self, path=SCHEDULE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS schedule (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                interval REAL NOT NULL,
+                next_due REAL NOT NULL,
+                last_checked REAL,
+                last_changed REAL,
+                checks INTEGER DEFAULT 0,
+                changes INTEGER DEFAULT 0,
+                failures INTEGER DEFAULT 0
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_schedule_due ON schedule(kind, next_due)")
+        self._db.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT key, kind, interval, next_due, last_checked, last_changed, "
+                                   "checks, changes, failures FROM schedule WHERE key = ?", (key,)).fetchone()
+        return dict(zip(("key", "kind", "interval", "next_due", "last_checked", "last_changed",
+                         "checks", "changes", "failures"), row)) if row else None
+
+    def ensure(self, items, kind: str):
+        """Add (key, interval) pairs not tracked yet; they are due immediately."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO schedule (key, kind, interval, next_due) VALUES (?, ?, ?, ?)",
+                [(key, kind, interval, now) for key, interval in items])
+            self._db.commit()
+
+    def due(self, kind: str, now=None) -> list:
+        with self._lock:
+            return [key for (key,) in self._db.execute(
+                "SELECT key FROM schedule WHERE kind = ? AND next_due <= ? ORDER BY next_due",
+                (kind, now or time.time()))]
+
+    def record(self, key: str, changed, now=None) -> float:
+        """Store a check's outcome (changed=None for a failure) and return the new interval."""
+        now = now or time.time()
+        row = self.get(key)
+        if changed is None:
+            # retry at the shortest interval without touching the learned cadence
+            interval = row["interval"]
+            retry = bounds(row["kind"])[0]
+            with self._lock:
+                self._db.execute("UPDATE schedule SET next_due = ?, last_checked = ?, "
+                                 "failures = failures + 1 WHERE key = ?",
+                                 (now + jittered(min(interval, retry)), now, key))
+                self._db.commit()
+            return interval
+
+        interval = next_interval(row["interval"], changed, row["kind"])
+        with self._lock:
+            self._db.execute(
+                "UPDATE schedule SET interval = ?, next_due = ?, last_checked = ?, "
+                "last_changed = CASE WHEN ? THEN ? ELSE last_changed END, "
+                "checks = checks + 1, changes = changes + ?, failures = 0 WHERE key = ?",
+                (interval, now + jittered(interval), now, changed, now, int(changed), key))
+            self._db.commit()
+        return interval
+
+    def retain(self, kind: str, keys) -> int:
+        """Stop tracking sources of `kind` that are not in `keys`; returns how many went."""
+        keys = set(keys)
+        with self._lock:
+            stale = [(key,) for (key,) in self._db.execute("SELECT key FROM schedule WHERE kind = ?", (kind,))
+                     if key not in keys]
+            self._db.executemany("DELETE FROM schedule WHERE key = ?", stale)
+            self._db.commit()
+        return len(stale)
+
+    def summary(self) -> list:
+        with self._lock:
+            return self._db.execute(
+                "SELECT kind, COUNT(*), MIN(interval), AVG(interval), MAX(interval), SUM(checks), "
+                "SUM(changes), SUM(next_due <= ?) FROM schedule GROUP BY kind", (time.time(),)
+            ).fetchall()
+
+    def close(self):
+        self._db.close()
+
+
+def load_script(name: str, path: str):
+    """Import a crawler script by path; its directory goes on sys.path for sibling imports."""
+    folder = os.path.dirname(path)
+    if folder not in sys.path:
+        sys.path.append(folder)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # registered under `name` so its functions pickle by reference into process pools
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def log_run(entry: dict, path=LOG_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"run_at": datetime.utcnow().isoformat(), **entry}) + "\n")
+
+
+def prs_document(bill: dict) -> dict:
+    fields = [bill["title"]] + [f"{label}: {bill[key]}" for label, key in (("Status", "status"),
+                                                                           ("Ministry", "ministry"))
+                                if bill.get(key) not in (None, "N/A")]
+    if bill.get("summary") not in (None, "N/A"):
+        fields.append(bill["summary"])
+    doc = {"url": bill["url"], "source": "PRS", "doc_type": "bill", "title": bill["title"],
+           "text": "\n".join(fields)}
+    # PRS shows "Dec 05, 2023"; the published_date payload index wants ISO dates
+    try:
+        doc["published_date"] = datetime.strptime(bill.get("published_on", ""), "%b %d, %Y").date().isoformat()
+    except (TypeError, ValueError):
+        pass
+    return doc
+
+
+def justai_document(post: dict) -> dict:
+    return {**post, "doc_type": "wp_post", "text": f"{post['title']}\n{post['raw_text']}"}
+
+
+class Updater:
+    """The jobs the scheduler runs. Each checks only what is due and pushes
+    only new or changed documents downstream: portal pages through the whole
+    refresh pipeline, PRS bills and JustAI posts from chunking onwards."""
+
+    def __init__(self, schedule: Schedule, pipeline_args, scheduler=None, batch=None):
+        self.schedule = schedule
+        self.pipeline_args = pipeline_args
+        self.scheduler = scheduler
+        self.batch = batch
+        # the raw store and an on-disk Qdrant take one writer at a time
+        self._pipeline_lock = threading.Lock()
+        for key in ("prs", "justai"):
+            self.schedule.ensure([(key, CADENCE[key])], key)
+
+    def _reschedule(self, key: str, interval: float):
+        # the job's trigger follows the adapted interval; its next run is the (jittered) due time
+        if self.scheduler is not None and self.scheduler.get_job(key):
+            self.scheduler.reschedule_job(key, trigger=IntervalTrigger(seconds=interval,
+                                                                      jitter=int(interval * JITTER)))
+            next_due = datetime.fromtimestamp(self.schedule.get(key)["next_due"]).astimezone()
+            self.scheduler.modify_job(key, next_run_time=next_due)
+
+    def _crawler(self, key: str, run):
+        start = time.monotonic()
+        try:
+            changes = run()
+        except Exception as e:
+            print(f"[{key}] failed: {type(e).__name__}: {str(e)[:100]}")
+            changes = None
+        interval = self.schedule.record(key, None if changes is None else changes > 0)
+        self._reschedule(key, interval)
+        log_run({"job": key, "changes": changes, "seconds": round(time.monotonic() - start, 2),
+                 "next_interval_h": round(interval / HOUR, 2)})
+        wait = self.schedule.get(key)["next_due"] - time.time()
+        print(f"[{key}] {'failed' if changes is None else f'{changes} changes'}; next check in {wait / HOUR:.1f}h")
+
+    def index_documents(self, docs: list):
+        with self._pipeline_lock:
+            _, job = asyncio.run(pipeline.index_documents(self.pipeline_args, docs))
+        return job
+
+    def run_prs(self):
+        prs = load_script("prs", PRS_SCRIPT)
+
+        def sink(bills):
+            self.index_documents([prs_document(b) for b in bills])
+
+        self._crawler("prs", lambda: prs.scrape_ai_bills(sink=sink))
+
+    def run_justai(self):
+        justai = load_script("justai_run", JUSTAI_RUN)
+
+        async def sink(posts):
+            # its own thread and event loop, like the other jobs' pipeline runs
+            await asyncio.to_thread(self.index_documents, [justai_document(p) for p in posts])
+
+        def run():
+            count, skipped = asyncio.run(justai.ingest(sink=sink))
+            return count + skipped   # posts modified since the last mark, relevant or not
+
+        self._crawler("justai", run)
+
+    def portal_types(self):
+        # js_rendered portals need the pipeline's browser pool
+        return ("static_html", "js_rendered") if self.pipeline_args.render_browsers else "static_html"
+
+    def sync_portals(self) -> int:
+        """Track every portal classified so far, seeded from its hash history;
+        portals no longer classified as fetchable are dropped."""
+        known = MetadataStore().find_sources(source_type=self.portal_types())
+        index = HashIndex()
+        history = index.history([s["url"] for s in known])
+        index.close()
+        self.schedule.ensure([(s["url"], seed_interval("portal", *history.get(s["url"], ())))
+                              for s in known], "portal")
+        dropped = self.schedule.retain("portal", [s["url"] for s in known])
+        if dropped:
+            print(f"[portals] {dropped} portals no longer classified; stopped tracking them")
+        return len(known)
+
+    def run_portals(self):
+        start = time.monotonic()
+        total = self.sync_portals()
+        due = self.schedule.due("portal")
+        if self.batch:
+            due = due[:self.batch]
+        if not due:
+            print(f"[portals] nothing due ({total} tracked)")
+            return
+
+        by_url = {s["url"]: s for s in MetadataStore().find_sources(source_type=self.portal_types())}
+        # a portal reclassified since sync_portals is dropped at the next sync, not counted as a failure
+        due = [url for url in due if url in by_url]
+        sources = [by_url[url] for url in due]
+        print(f"[portals] {len(sources)} of {total} portals due")
+        with self._pipeline_lock:
+            _, job = asyncio.run(pipeline.refresh(self.pipeline_args, sources))
+
+        changed = 0
+        for url in due:
+            record = job.records.get(url)
+            if record is None or record["status"] == "failed":
+                self.schedule.record(url, None)
+            else:
+                is_change = record["status"] in ("success", "updated")
+                changed += is_change
+                self.schedule.record(url, is_change)
+        log_run({"job": "portals", "tracked": total, "checked": len(sources), "changed": changed,
+                 "indexed": len(job.indexed), "seconds": round(time.monotonic() - start, 2)})
+
+
+def build_scheduler(updater: Updater, max_jobs=2, misfire_grace=HOUR) -> BlockingScheduler:
+    """One job per crawler. Missed runs are coalesced into one, each job has at most
+    one instance running, and at most `max_jobs` jobs run at once."""
+    scheduler = BlockingScheduler(
+        executors={"default": ThreadPoolExecutor(max_jobs)},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": misfire_grace},
+    )
+    updater.scheduler = scheduler
+    now = datetime.now()
+    for key, fn in (("justai", updater.run_justai), ("prs", updater.run_prs)):
+        state = updater.schedule.get(key)
+        interval = state["interval"]
+        first = max(now, datetime.fromtimestamp(state["next_due"]))
+        scheduler.add_job(fn, IntervalTrigger(seconds=interval, jitter=int(interval * JITTER)),
+                          id=key, name=key, next_run_time=first, replace_existing=True)
+    scheduler.add_job(updater.run_portals, IntervalTrigger(seconds=PORTAL_TICK, jitter=int(PORTAL_TICK * JITTER)),
+                      id="portals", name="portals", next_run_time=now + timedelta(seconds=5),
+                      replace_existing=True)
+    return scheduler
+
+
+def print_status(schedule: Schedule):
+    print(f"{'kind':8} {'sources':>8} {'min h':>8} {'avg h':>8} {'max h':>8} {'checks':>7} "
+          f"{'changes':>8} {'due':>5}")
+    for kind, n, lo, avg, hi, checks, changes, due in schedule.summary():
+        print(f"{kind:8} {n:8} {lo / HOUR:8.1f} {avg / HOUR:8.1f} {hi / HOUR:8.1f} {checks or 0:7} "
+              f"{changes or 0:8} {due or 0:5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental refresh service: PRS daily, JustAI hourly, "
+                                                 "state portals weekly, each adapting to how often it changes")
+    parser.add_argument("--once", action="store_true", help="run every job once (only due portals) and exit")
+    parser.add_argument("--status", action="store_true", help="print the schedule and exit")
+    parser.add_argument("--max-jobs", type=int, default=2, help="jobs allowed to run at the same time")
+    parser.add_argument("--portal-batch", type=int, default=None, help="cap on portals checked per run")
+    parser.add_argument("--hashing", action="store_true", help="offline HashingBackend embeddings")
+    parser.add_argument("--qdrant-url", default=None)
+    parser.add_argument("--qdrant-path", default=None)
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve scrape timings at :PORT/metrics (Prometheus) and /metrics.json")
+    args = parser.parse_args()
+
+    schedule = Schedule()
+    if args.status:
+        print_status(schedule)
+        return
+
+    pipeline_args = pipeline.build_parser().parse_args(["--log-every", "0"])
+    pipeline_args.hashing, pipeline_args.qdrant_url, pipeline_args.qdrant_path = \
+        args.hashing, args.qdrant_url, args.qdrant_path
+    updater = Updater(schedule, pipeline_args, batch=args.portal_batch)
+
+    if args.once:
+        updater.run_justai()
+        updater.run_prs()
+        updater.run_portals()
+        print_status(schedule)
+        return
+
+    if args.metrics_port:
+        get_instrument().serve(args.metrics_port)
+        print(f"metrics on :{args.metrics_port}/metrics")
+    scheduler = build_scheduler(updater, max_jobs=args.max_jobs)
+    print(f"Scheduler started ({args.max_jobs} concurrent jobs); Ctrl+C to stop")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+if __name__ == "__main__":
+    main()
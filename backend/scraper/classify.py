@@ -1,13 +1,31 @@
-import requests
+import os
+import re
+import sys
+import time
+import codecs
+import asyncio
+from html.parser import HTMLParser
+
+import aiohttp
 from bs4 import BeautifulSoup
 
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.http_cache import cached_get
+
+MIN_TEXT_CHARS = 500
+PROBE_BYTES = 512 * 1024
+
+
 def classify_url(url: str) -> str:
 
     if url.lower().endswith(".pdf"):
         return "pdf"
 
     try:
-        r = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+        r = cached_get(url, timeout=10)
 
         if r.status_code >= 400:
             return f"error: HTTP {r.status_code}"
@@ -22,10 +40,135 @@ def classify_url(url: str) -> str:
 
         text = soup.get_text(strip=True)
 
-        if len(text) < 500:
+        if len(text) < MIN_TEXT_CHARS:
             return "js_rendered"
 
         return "static_html"
 
     except Exception as e:
-        return f"error: {str(e)[:50]}"
\ No newline at end of file
+        return f"error: {str(e)[:50]}"
+
+
+class TextLengthParser(HTMLParser):
+    """Counts visible text (outside script/style) as HTML is fed in, and stops
+    caring once MIN_TEXT_CHARS is reached. Mirrors get_text(strip=True)."""
+
+    def __init__(self, limit=MIN_TEXT_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.chars = 0
+        self.skip = 0
+
+    @property
+    def done(self) -> bool:
+        return self.chars >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self.skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.chars += len(data.strip())
+
+
+def classify_body(body: bytes, encoding="utf-8") -> str:
+    parser = TextLengthParser()
+    parser.feed(body.decode(encoding, errors="replace"))
+    return "static_html" if parser.done else "js_rendered"
+
+
+def _is_pdf(headers) -> bool:
+    return "application/pdf" in headers.get("Content-Type", "").lower()
+
+
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+
+
+def declared_charset(headers, default="utf-8") -> str:
+    """The Content-Type charset when it names a known codec, else `default`."""
+    match = _CHARSET.search(headers.get("Content-Type", ""))
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return default
+
+
+def _classify_cached(entry) -> str:
+    return "pdf" if _is_pdf(entry.headers) else classify_body(entry.read(), declared_charset(entry.headers))
+
+
+def _whole_body(status: int, headers) -> bool:
+    # a 200, or a 206 whose range happens to cover the whole entity (bytes 0-N/N+1)
+    if status == 200:
+        return True
+    match = re.fullmatch(r"bytes 0-(\d+)/(\d+)", headers.get("Content-Range", "").strip())
+    return status == 206 and match is not None and int(match.group(1)) + 1 == int(match.group(2))
+
+
+async def probe_url(fetcher, url: str, cache=None) -> str:
+    """classify_url() in one request, which also feeds the HttpCache.
+
+    A single GET (conditional when the cache holds a stale copy, ranged to
+    PROBE_BYTES) settles PDFs and HTTP errors from its headers; HTML goes
+    through TextLengthParser. When the response is the whole page it is
+    read to the end and cached, so the scrape that follows is a fresh cache
+    hit rather than a second download. Only pages bigger than the range are
+    fetched again.
+    """
+    if url.lower().endswith(".pdf"):
+        return "pdf"
+
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        return _classify_cached(entry)
+
+    headers = {"Range": f"bytes=0-{PROBE_BYTES - 1}", **(cache.conditional_headers(entry) if entry else {})}
+    try:
+        async with fetcher.slot(url) as session:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 304 and entry:
+                    cache.revalidated(entry, resp.headers)
+                    return _classify_cached(entry)
+                if resp.status >= 400:
+                    return f"error: HTTP {resp.status}"
+                if _is_pdf(resp.headers):
+                    return "pdf"
+
+                whole = cache is not None and _whole_body(resp.status, resp.headers)
+                parser = TextLengthParser()
+                decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+                blocks, read = [], 0
+                async for block in resp.content.iter_chunked(16 * 1024):
+                    read += len(block)
+                    if whole:
+                        blocks.append(block)
+                    if not parser.done:
+                        parser.feed(decoder.decode(block))
+                    if not whole and (parser.done or read >= PROBE_BYTES):
+                        break
+                if whole:
+                    cache.put(url, 200, {k: v for k, v in resp.headers.items() if k.lower() != "content-range"},
+                              b"".join(blocks))
+
+        return "static_html" if parser.done else "js_rendered"
+
+    except (asyncio.TimeoutError, aiohttp.ClientError, LookupError) as e:
+        return f"error: {(str(e) or type(e).__name__)[:50]}"
+
+
+async def classify_many(sources, fetcher, cache=None):
+    """Yield (source, type, seconds) as probes finish, in completion order."""
+    async def one(source):
+        start = time.monotonic()
+        kind = await probe_url(fetcher, source["url"], cache)
+        return source, kind, time.monotonic() - start
+
+    for task in asyncio.as_completed([one(s) for s in sources]):
+        yield await task
@@ -0,0 +1,169 @@
+import re
+
+from bs4 import BeautifulSoup, Tag
+from lxml import etree, html as lxml_html
+
+# --- Boilerplate vocabularies (compiled once) ---
+
+DROP_TAGS = frozenset(['nav', 'footer', 'script', 'style',
+                       'header', 'aside', 'iframe', 'noscript'])
+
+JUNK_WORDS = ['related', 'sidebar', 'ads', 'social', 'share',
+              'comment', 'newsletter', 'recommended', 'trending',
+              'taboola', 'sponsored', 'tags', 'author']
+
+HARD_STOP = [
+    'murder case', 'iran war', 'israel war', 'viral video',
+    'taboola', 'sponsored links', 'download app',
+    '(this story has not been edited',
+    'auto-generated from pti',
+    'पत्रकारिता में', 'फ्रीलांसिंग', 'डिजिटल मीडिया में कार्यरत',
+    'वायरल खबरें', 'विज्ञापन'
+]
+
+SOFT_JUNK = [
+    'read more', 'tags:', 'author:', 'share this',
+    'जरूर पढ़ें', 'यह भी पढ़ें', 'ये भी पढ़ें'
+]
+
+MIN_LINE_CHARS = 40
+
+
+def _alternation(words) -> re.Pattern:
+    # longest first so the regex engine never stops at a shorter prefix
+    return re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)))
+
+
+JUNK_RE = _alternation(JUNK_WORDS)
+HARD_STOP_RE = _alternation(HARD_STOP)
+SOFT_JUNK_RE = _alternation(SOFT_JUNK)
+
+# bs4 leaves strings inside these out of get_text()
+_NO_TEXT_TAGS = frozenset(['rt', 'rp', 'template'])
+
+
+def is_junk(classes, element_id) -> bool:
+    """True if a class or id mentions a boilerplate word (related, share, ads, ...)."""
+    if classes:
+        if not isinstance(classes, str):
+            classes = ' '.join(classes)
+        if JUNK_RE.search(classes.lower()):
+            return True
+    return bool(element_id) and JUNK_RE.search(str(element_id).lower()) is not None
+
+
+def filter_lines(text: str) -> str:
+    """Keep lines of at least MIN_LINE_CHARS chars, drop SOFT_JUNK lines, stop at a HARD_STOP line."""
+    clean_lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) < MIN_LINE_CHARS:
+            continue
+        line_lower = line.lower()
+        if HARD_STOP_RE.search(line_lower):
+            break
+        if SOFT_JUNK_RE.search(line_lower):
+            continue
+        clean_lines.append(line)
+    return '\n'.join(clean_lines)
+
+
+# --- BeautifulSoup path ---
+
+def prune_soup(soup):
+    """Single walk that detaches boilerplate subtrees without visiting their insides."""
+    stack = list(reversed(soup.contents))
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, Tag):
+            continue
+        if node.name in DROP_TAGS or is_junk(node.attrs.get('class'), node.attrs.get('id')):
+            node.extract()
+            continue
+        stack.extend(reversed(node.contents))
+
+
+def _extract_bs4(soup) -> str:
+    prune_soup(soup)
+    # scrape_static also tried div[class*=article] here, but bs4 passes that
+    # lambda one class string at a time, so it never matched; dropped.
+    main = soup.find('article') or soup.find('main') or soup
+    return main.get_text(separator='\n', strip=True)
+
+
+# --- lxml-only path ---
+
+_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+
+def _prune_lxml(root) -> bool:
+    """Drop boilerplate subtrees in place; False if the root itself is boilerplate."""
+    if root.tag in DROP_TAGS or is_junk(root.get('class'), root.get('id')):
+        return False
+    stack = list(root)
+    while stack:
+        el = stack.pop()
+        if not isinstance(el.tag, str):     # comments, processing instructions
+            continue
+        if el.tag in DROP_TAGS or is_junk(el.get('class'), el.get('id')):
+            el.drop_tree()                   # keeps el.tail, like bs4's decompose
+            continue
+        stack.extend(el)
+    return True
+
+
+def _lxml_strings(main):
+    # document-order text and tails, skipping elements bs4 would not read text from
+    stack = [(main, False)]
+    while stack:
+        el, closing = stack.pop()
+        if closing:
+            if el.tail and el is not main:
+                yield el.tail
+            continue
+        stack.append((el, True))
+        if not isinstance(el.tag, str) or el.tag in _NO_TEXT_TAGS:
+            continue
+        if el.text:
+            yield el.text
+        stack.extend((child, False) for child in reversed(el))
+
+
+def _parse_lxml(html):
+    data = html.encode('utf-8') if isinstance(html, str) else html
+    if not data.strip():
+        return None
+    return etree.fromstring(data, _HTML_PARSER)
+
+
+def _extract_lxml(root) -> str:
+    if root is None or not _prune_lxml(root):
+        return ''
+    main = next(root.iter('article'), None)
+    if main is None:
+        main = next(root.iter('main'), None)
+    if main is None:
+        main = root
+    return '\n'.join(s for s in (t.strip() for t in _lxml_strings(main)) if s)
+
+
+def parse_html(html: str, parser: str = 'bs4'):
+    """The document tree extract_tree() works on (None for an empty lxml document)."""
+    return _parse_lxml(html) if parser == 'lxml' else BeautifulSoup(html, 'lxml')
+
+
+def extract_tree(tree, parser: str = 'bs4') -> str:
+    """Prune boilerplate from a parse_html() tree (in place) and filter its text lines."""
+    raw = _extract_lxml(tree) if parser == 'lxml' else _extract_bs4(tree)
+    return filter_lines(raw)
+
+
+def extract_main_text(html: str, parser: str = 'bs4') -> str:
+    """Main article text with navigation, ads and related-story boilerplate removed.
+
+    parser='bs4' walks a BeautifulSoup tree (the historical behaviour);
+    parser='lxml' works on the lxml tree directly and is several times faster.
+    Parsing and extraction are separate steps (parse_html, extract_tree) so
+    the scrapers can time them apart.
+    """
+    return extract_tree(parse_html(html, parser), parser)
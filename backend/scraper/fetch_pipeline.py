@@ -0,0 +1,144 @@
+import os
+import asyncio
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+
+from scraper.fetcher import AsyncFetcher, FetchResult
+
+
+@dataclass
+class Parsed:
+    url: str
+    meta: dict = field(default_factory=dict)
+    result: object = None
+    fetched: FetchResult = None
+    error: str = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_extract(extract, content: bytes, encoding: str):
+    # runs in a worker process; decoding happens here too so the loop only moves bytes
+    return extract(content.decode(encoding or "utf-8", errors="replace"))
+
+
+class FetchPipeline:
+    """Two-stage scrape: aiohttp downloads feed a process pool that parses.
+
+    I/O workers put raw responses on a bounded queue; the parse stage hands
+    them to `extract(text)` in a ProcessPoolExecutor, keeping at most
+    `inflight` parses outstanding. When parsing falls behind the queue fills
+    and downloads pause, and when the consumer falls behind parses pause, so
+    memory stays bounded while both the network and every core stay busy.
+
+    `extract` must be a module-level function (or a functools.partial of
+    one) so it can be pickled into the workers. Scrapers plug in by passing
+    jobs as URLs or (url, meta) pairs; meta is handed back untouched.
+
+        async with FetchPipeline(workers=4, cache=get_default_cache()) as pipe:
+            async for parsed in pipe.run(urls, extract_main_text):
+                ...
+    """
+
+    def __init__(self, fetcher: AsyncFetcher = None, workers=None, queue_size=64,
+                 inflight=None, executor=None, **fetcher_kwargs):
+        self.fetcher = fetcher
+        self.fetcher_kwargs = fetcher_kwargs
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.inflight = inflight or 2 * self.workers
+        self.executor = executor
+        self._own_fetcher = fetcher is None
+        self._own_executor = executor is None
+
+    async def __aenter__(self):
+        if self._own_fetcher:
+            self.fetcher = await AsyncFetcher(**self.fetcher_kwargs).__aenter__()
+        if self._own_executor:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._own_executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        if self._own_fetcher:
+            await self.fetcher.__aexit__(*exc)
+            self.fetcher = None
+
+    async def run(self, jobs, extract, should_extract=None, revalidate=False):
+        """Yield a Parsed per job, in completion order.
+
+        `should_extract(fetched)` runs on the event loop before a response is
+        queued for parsing; returning False yields it with skipped=True (e.g.
+        a 304 whose text is already known). With `revalidate`, cached copies
+        are checked with the server even within the cache TTL.
+        """
+        loop = asyncio.get_running_loop()
+        source = iter(jobs)
+        raw = asyncio.Queue(self.queue_size)
+        done = asyncio.Queue(self.queue_size)
+        slots = asyncio.Semaphore(self.inflight)
+
+        async def fetch_worker():
+            # workers share one iterator, so jobs can be a lazy generator
+            for job in source:
+                url, meta = job if isinstance(job, tuple) else (job, {})
+                try:
+                    fetched = await self.fetcher.fetch(url, revalidate=revalidate)
+                except Exception as e:        # e.g. a malformed URL; don't stall the stage
+                    fetched = FetchResult(url=url, error=f"{type(e).__name__}: {str(e)[:100]}")
+                await raw.put(Parsed(url, meta, fetched=fetched))
+
+        async def parse(item: Parsed):
+            try:
+                item.result = await loop.run_in_executor(
+                    self.executor, _run_extract, extract, item.fetched.content, item.fetched.encoding)
+            except Exception as e:
+                item.error = f"{type(e).__name__}: {str(e)[:100]}"
+            # the slot is held until the consumer has room, which throttles the pool
+            await done.put(item)
+            slots.release()
+
+        async def parse_stage():
+            tasks = set()
+            while (item := await raw.get()) is not None:
+                if not item.fetched.ok:
+                    item.error = item.fetched.error or f"HTTP {item.fetched.status}"
+                    await done.put(item)
+                elif should_extract and not should_extract(item.fetched):
+                    item.skipped = True
+                    await done.put(item)
+                else:
+                    await slots.acquire()
+                    task = asyncio.create_task(parse(item))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            await done.put(None)
+
+        async def fetch_stage():
+            await asyncio.gather(*(fetch_worker() for _ in range(self.fetcher.concurrency)))
+            await raw.put(None)
+
+        stages = [asyncio.create_task(fetch_stage()), asyncio.create_task(parse_stage())]
+        try:
+            while (item := await done.get()) is not None:
+                yield item
+            await asyncio.gather(*stages)
+        finally:
+            for task in stages:
+                task.cancel()
+
+
+def extract_all(jobs, extract, revalidate=False, **kwargs) -> list:
+    """Blocking helper: run the pipeline to completion and return every Parsed."""
+    async def _run():
+        async with FetchPipeline(**kwargs) as pipe:
+            return [p async for p in pipe.run(jobs, extract, revalidate=revalidate)]
+
+    return asyncio.run(_run())
@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+
+import requests
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+CACHE_DIR = os.path.join(DATA_DIR, "cache", "http")
+
+DEFAULT_TTL = 6 * 3600              # serve without touching the network
+DEFAULT_MAX_AGE = 30 * 24 * 3600    # drop entries not revalidated for this long
+DEFAULT_MAX_BYTES = 1024 ** 3       # LRU-evict bodies beyond 1 GB
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    status: int
+    etag: str
+    last_modified: str
+    headers: dict
+    size: int
+    stored_at: float
+    path: str
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class HttpCache:
+    """On-disk response cache shared by all scrapers.
+
+    Bodies live in one file per URL; validators, sizes and access times are
+    kept in a small SQLite index so lookups and LRU eviction never scan the
+    cache directory.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=DEFAULT_TTL, max_age=DEFAULT_MAX_AGE,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.db"),
+                                   timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".body")
+
+    def get(self, url: str):
+        key = self.key_for(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status, etag, last_modified, headers, size, stored_at "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        url, status, etag, last_modified, headers, size, stored_at = row
+        return CacheEntry(key, url, status, etag, last_modified, json.loads(headers or "{}"),
+                          size, stored_at, path)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> dict:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, url: str, status: int, headers: dict, body: bytes):
+        if status != 200:
+            return
+        key = self.key_for(url)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+        keep = {k: v for k, v in headers.items()
+                if k.lower() in ("content-type", "etag", "last-modified", "x-wp-total", "x-wp-totalpages")}
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, _header(headers, "ETag"), _header(headers, "Last-Modified"),
+                 json.dumps(keep), len(body), now, now)
+            )
+            self._db.commit()
+
+    def put_file(self, url: str, status: int, headers: dict, path: str):
+        """put() for a body already streamed to `path` (a downloaded PDF). The
+        cache keeps a hard link to it rather than a second copy, so the file
+        can be replaced or the entry evicted without touching the other."""
+        if status != 200:
+            return
+        key = self.key_for(url)
+        body = self._path(key)
+        os.makedirs(os.path.dirname(body), exist_ok=True)
+        tmp = f"{body}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)      # another filesystem, or no hard links
+        os.replace(tmp, body)
+
+        keep = {k: v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, _header(headers, "ETag"), _header(headers, "Last-Modified"),
+                 json.dumps(keep), os.path.getsize(body), now, now)
+            )
+            self._db.commit()
+
+    def revalidated(self, entry: CacheEntry, headers: dict):
+        """Record a 304: the stored body is current again as of now."""
+        etag = _header(headers, "ETag") or entry.etag
+        last_modified = _header(headers, "Last-Modified") or entry.last_modified
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, etag = ?, last_modified = ? WHERE key = ?",
+                (time.time(), etag, last_modified, entry.key)
+            )
+            self._db.commit()
+
+    def evict(self):
+        """Drop entries older than max_age, then least recently used ones over max_bytes."""
+        with self._lock:
+            stale = self._db.execute(
+                "SELECT key FROM entries WHERE stored_at < ?", (time.time() - self.max_age,)
+            ).fetchall()
+            doomed = [k for (k,) in stale]
+
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in self._db.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed_at"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    if key not in doomed:
+                        doomed.append(key)
+                        total -= size
+
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in doomed])
+            self._db.commit()
+
+        for key in doomed:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        return len(doomed)
+
+    def close(self):
+        self._db.close()
+
+
+def _header(headers: dict, name: str):
+    for k, v in headers.items():
+        if k.lower() == name.lower():
+            return v
+    return None
+
+
+_default_cache = None
+
+
+def get_default_cache() -> HttpCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache()
+    return _default_cache
+
+
+class CachedResponse:
+    """The subset of requests.Response the scrapers use, backed by the cache."""
+
+    def __init__(self, url, status_code, headers, content, from_cache=False, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+        self.encoding = requests.utils.get_encoding_from_headers(self.headers) or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def cached_get(url, params=None, headers=None, timeout=15, cache=None, session=None,
+               revalidate=False) -> CachedResponse:
+    """requests.get() that revalidates against the on-disk cache; within the
+    TTL only if `revalidate` is set."""
+    cache = cache or get_default_cache()
+    if params:
+        url = requests.Request("GET", url, params=params).prepare().url
+
+    entry = cache.get(url)
+    if entry and not revalidate and cache.is_fresh(entry):
+        return CachedResponse(url, entry.status, entry.headers, entry.read(), from_cache=True)
+
+    send = {**HEADERS, **(headers or {})}
+    if entry:
+        send.update(cache.conditional_headers(entry))
+
+    r = (session or requests).get(url, headers=send, timeout=timeout)
+
+    if r.status_code == 304 and entry:
+        cache.revalidated(entry, r.headers)
+        return CachedResponse(url, entry.status, entry.headers, entry.read(),
+                              from_cache=True, not_modified=True)
+
+    cache.put(url, r.status_code, r.headers, r.content)
+    return CachedResponse(url, r.status_code, r.headers, r.content)
@@ -0,0 +1,320 @@
+import os
+import json
+import time
+import bisect
+import argparse
+import functools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+TIMINGS_LOG = os.path.join(DATA_DIR, "logs", "scrape_timings.jsonl")
+METRICS_TEXTFILE = os.path.join(DATA_DIR, "logs", "scrape_metrics.prom")
+
+# seconds; the same bounds a Prometheus histogram would use
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# where a URL's time goes, in order; "throttle" is the wait for a host token and a global
+# slot, "render" replaces the network stages for pages loaded in a headless browser
+NETWORK_STAGES = ("throttle", "dns", "connect", "wait", "download")
+STAGES = NETWORK_STAGES + ("render", "parse", "extract", "write")
+
+PREFIX = "legalbot_scrape"
+
+
+# --- Histogram ---
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.n:
+            return 0.0
+        rank, seen = q * self.n, 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {"count": self.n, "sum": round(self.total, 4), "buckets": dict(zip(bounds, self.counts))}
+
+
+# --- Timings ---
+
+def add_time(timings: dict, stage: str, seconds: float):
+    # retries and redirects add up rather than overwrite
+    timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(timings: dict, stage: str):
+    """Add the time spent in the block to timings[stage]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(timings, stage, time.perf_counter() - start)
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """aiohttp hooks that split each request into dns / connect / wait seconds.
+
+    Pass the URL's timings dict as `trace_request_ctx`. "wait" is request
+    start to response headers minus DNS and connect: the connector queue
+    plus the server's time to first byte. Reading the body ("download") is
+    timed by the caller around resp.read().
+    """
+    async def on_request_start(session, ctx, params):
+        ctx.start = time.perf_counter()
+        ctx.spent = 0.0
+
+    async def on_dns_start(session, ctx, params):
+        ctx.dns = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        seconds = time.perf_counter() - ctx.dns
+        ctx.dns_spent = getattr(ctx, "dns_spent", 0.0) + seconds
+        _record(ctx, "dns", seconds)
+
+    async def on_connect_start(session, ctx, params):
+        ctx.connect = time.perf_counter()
+        ctx.dns_spent = 0.0
+
+    async def on_connect_end(session, ctx, params):
+        # the resolve happens inside connection setup; count it once, under dns
+        _record(ctx, "connect", time.perf_counter() - ctx.connect - ctx.dns_spent)
+
+    async def on_request_end(session, ctx, params):
+        _record(ctx, "wait", time.perf_counter() - ctx.start - ctx.spent)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_dns_resolvehost_start.append(on_dns_start)
+    trace.on_dns_resolvehost_end.append(on_dns_end)
+    trace.on_connection_create_start.append(on_connect_start)
+    trace.on_connection_create_end.append(on_connect_end)
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+def _record(ctx, stage: str, seconds: float):
+    if stage != "wait":
+        ctx.spent = getattr(ctx, "spent", 0.0) + seconds
+    if isinstance(ctx.trace_request_ctx, dict):
+        add_time(ctx.trace_request_ctx, stage, seconds)
+
+
+# --- Registry ---
+
+class Instrument:
+    """Per-URL scrape timings, aggregated into per-stage histograms.
+
+    The fetcher reports each response (network stages and bytes) through
+    fetched(); whoever parses and stores the page calls record() once per
+    URL with its full timings, which observes the render/parse/extract/write
+    stages and appends one JSON line to `log_path`. Everything is
+    thread-safe, so worker threads and a /metrics server can share one
+    instance.
+
+        instrument = get_instrument()
+        async with AsyncFetcher(instrument=instrument) as fetcher:
+            result = await fetcher.fetch(url)
+        timings = dict(result.timings)
+        with timed(timings, "parse"):
+            ...
+        instrument.record(url, timings, status="success", bytes=len(result.content))
+    """
+
+    def __init__(self, log_path=TIMINGS_LOG, buckets=LATENCY_BUCKETS):
+        self.log_path = log_path
+        self.buckets = buckets
+        self.started = time.time()
+        self.histograms = {stage: Histogram(buckets) for stage in STAGES + ("total",)}
+        self.bytes = 0
+        self.responses = Counter()      # by status class: 2xx / 3xx / 4xx / 5xx / error / cache
+        self.pages = Counter()          # by record status: success / unchanged / failed / ...
+        self._lock = threading.Lock()
+        self._log = None
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self.histograms[stage].observe(seconds)
+
+    def fetched(self, result):
+        """Count one FetchResult: its network stages, body size and status class."""
+        with self._lock:
+            if result.from_cache and not result.not_modified:
+                self.responses["cache"] += 1
+                return
+            for stage in NETWORK_STAGES:
+                if stage in result.timings:
+                    self.histograms[stage].observe(result.timings[stage])
+            if result.error and not result.status:
+                self.responses["error"] += 1
+            else:
+                self.responses[f"{result.status // 100}xx"] += 1
+            if not result.not_modified:
+                self.bytes += len(result.content)
+
+    def record(self, url: str, timings: dict, status: str = None, **fields):
+        """Observe a URL's processing stages and write its JSON log line."""
+        total = sum(timings.get(stage, 0.0) for stage in STAGES)
+        line = {"url": url, "status": status, **fields,
+                **{stage: round(timings[stage], 6) for stage in STAGES if stage in timings},
+                "total": round(total, 6), "at": datetime.utcnow().isoformat()}
+        with self._lock:
+            for stage in STAGES[len(NETWORK_STAGES):]:
+                if stage in timings:
+                    self.histograms[stage].observe(timings[stage])
+            self.histograms["total"].observe(total)
+            self.pages[status] += 1
+            if self.log_path:
+                if self._log is None:
+                    os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                    self._log = open(self.log_path, "a", encoding="utf-8", buffering=1)
+                self._log.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # --- export ---
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "uptime_sec": round(time.time() - self.started, 1),
+                "bytes": self.bytes,
+                "responses": dict(self.responses),
+                "pages": {str(k): v for k, v in self.pages.items()},
+                "stages": {stage: {"p50": h.quantile(0.5), "p95": h.quantile(0.95), **h.to_dict()}
+                           for stage, h in self.histograms.items() if h.n},
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (format 0.0.4)."""
+        lines = [f"# HELP {PREFIX}_stage_seconds Time per URL spent in each scrape stage.",
+                 f"# TYPE {PREFIX}_stage_seconds histogram"]
+        with self._lock:
+            for stage, h in self.histograms.items():
+                seen = 0
+                for bound, count in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                    seen += count
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {seen}')
+                lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+                lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {h.n}')
+            lines += [f"# HELP {PREFIX}_bytes_total Response body bytes downloaded.",
+                      f"# TYPE {PREFIX}_bytes_total counter",
+                      f"{PREFIX}_bytes_total {self.bytes}",
+                      f"# HELP {PREFIX}_responses_total Fetches by status class (cache = served fresh).",
+                      f"# TYPE {PREFIX}_responses_total counter"]
+            lines += [f'{PREFIX}_responses_total{{code="{k}"}} {v}' for k, v in sorted(self.responses.items())]
+            lines += [f"# HELP {PREFIX}_pages_total Scraped URLs by outcome.",
+                      f"# TYPE {PREFIX}_pages_total counter"]
+            lines += [f'{PREFIX}_pages_total{{status="{k}"}} {v}' for k, v in sorted(
+                self.pages.items(), key=lambda kv: str(kv[0]))]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=METRICS_TEXTFILE):
+        """Atomically write prometheus() for node_exporter's textfile collector."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+        return path
+
+    def serve(self, port: int, host="0.0.0.0") -> ThreadingHTTPServer:
+        """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+        instrument = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = instrument.prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, kind = json.dumps(instrument.to_dict()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def report(self) -> str:
+        d = self.to_dict()
+        lines = [f"{'stage':9} {'count':>6} {'sum s':>9} {'p50':>7} {'p95':>7}"]
+        for stage, s in d["stages"].items():
+            lines.append(f"{stage:9} {s['count']:6} {s['sum']:9.3f} {s['p50']:7g} {s['p95']:7g}")
+        lines.append(f"{d['bytes'] / 1024 ** 2:.2f} MB downloaded  |  responses {d['responses']}")
+        return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def get_instrument() -> Instrument:
+    """Process-wide instrument shared by the scrapers, the refresh pipeline and /metrics."""
+    return Instrument()
+
+
+def summarize(path=TIMINGS_LOG, last=None) -> Instrument:
+    """Rebuild the stage histograms from a timings log (optionally its last N lines)."""
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    instrument = Instrument(log_path=None)
+    for line in lines[-last:] if last else lines:
+        for stage in NETWORK_STAGES:
+            if stage in line:
+                instrument.observe(stage, line[stage])
+        instrument.bytes += line.get("bytes") or 0
+        instrument.record(line["url"], line, status=line.get("status"))
+    return instrument
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage scrape timings from the JSON log")
+    parser.add_argument("command", choices=["report", "prometheus"])
+    parser.add_argument("--log", default=TIMINGS_LOG)
+    parser.add_argument("--last", type=int, default=None, help="only the last N URLs")
+    args = parser.parse_args()
+
+    instrument = summarize(args.log, args.last)
+    if args.command == "report":
+        print(instrument.report())
+    else:
+        print(instrument.prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import time
+import asyncio
+from urllib.parse import urlsplit
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+from scraper.fetcher import DEFAULT_HEADERS, FetchResult, TokenBucket
+
+DEFAULT_BROWSERS = 2
+DEFAULT_CONTEXTS = 4            # pages rendered at once per browser
+DEFAULT_TIMEOUT = 30.0          # seconds per page, navigation and waiting included
+DEFAULT_RECYCLE_AFTER = 200     # pages per context before it is replaced
+
+# nothing here changes the DOM text we extract
+BLOCKED_RESOURCES = frozenset({"image", "font", "media"})
+
+LAUNCH_ARGS = ["--disable-dev-shm-usage", "--disable-gpu", "--no-first-run", "--mute-audio"]
+
+
+class Slot:
+    """One browser context; pages opened in it share its cache and cookies."""
+
+    def __init__(self, browser, index: int):
+        self.browser = browser
+        self.index = index          # which browser of the pool
+        self.context = None
+        self.pages = 0
+
+    async def open(self, pool: "RenderPool"):
+        self.context = await self.browser.new_context(
+            user_agent=pool.user_agent, java_script_enabled=True,
+            viewport={"width": 1280, "height": 2000},
+        )
+        self.context.set_default_timeout(pool.timeout * 1000)
+        if pool.block:
+            await self.context.route("**/*", pool._route)
+        self.pages = 0
+
+    async def recycle(self, pool: "RenderPool"):
+        # a long-lived context slowly collects JS heap and cached responses
+        await self.context.close()
+        await self.open(pool)
+        pool.stats["recycled"] += 1
+
+
+class RenderPool:
+    """A few long-lived headless Chromium instances for js_rendered sources.
+
+    Each browser holds `contexts` reusable contexts, and a page borrows one
+    from a shared queue, so at most browsers * contexts pages render at once
+    and no page pays for launching a browser. Images, fonts and media are
+    aborted at the network layer. A page is ready once `selector` appears or,
+    without one, at network idle; pages that never go idle (polling, analytics
+    beacons) are taken as they are when the wait runs out. `timeout` bounds
+    the whole page. render() returns a FetchResult holding the rendered HTML,
+    so callers extract it exactly like a fetched page.
+
+    Every navigation first takes a token from its host's TokenBucket: the
+    `limiter` AsyncFetcher's buckets when given, so rendered and plain
+    fetches to one host share a single rate limit, otherwise the pool's own
+    at `per_host_rate`. Only the navigation is counted, not the requests the
+    page makes while it loads.
+
+        async with RenderPool(browsers=2) as pool:
+            result = await pool.render(url)
+            text = parse_static(result.text)
+    """
+
+    def __init__(self, browsers=DEFAULT_BROWSERS, contexts=DEFAULT_CONTEXTS, timeout=DEFAULT_TIMEOUT,
+                 selector=None, idle_timeout=None, block=BLOCKED_RESOURCES,
+                 recycle_after=DEFAULT_RECYCLE_AFTER, user_agent=DEFAULT_HEADERS["User-Agent"],
+                 headless=True, limiter=None, per_host_rate=1.0, per_host_burst=1):
+        self.browsers = browsers
+        self.contexts = contexts
+        self.timeout = timeout
+        self.selector = selector
+        # how much of the page budget the network-idle wait may use
+        self.idle_timeout = idle_timeout or timeout / 3
+        self.block = frozenset(block or ())
+        self.recycle_after = recycle_after
+        self.user_agent = user_agent
+        self.headless = headless
+        self.concurrency = browsers * contexts
+        self.limiter = limiter
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+
+        self._buckets = {}
+        self._playwright = None
+        self._browsers = []
+        self._slots = None
+        self._lock = None
+        self.stats = {"rendered": 0, "failed": 0, "timeouts": 0, "not_idle": 0,
+                      "blocked": 0, "recycled": 0, "relaunched": 0}
+
+    async def _launch(self):
+        return await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        self._browsers = list(await asyncio.gather(*(self._launch() for _ in range(self.browsers))))
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Queue()
+        # interleaved, so light load is spread over every browser
+        slots = [Slot(browser, i) for _ in range(self.contexts) for i, browser in enumerate(self._browsers)]
+        await asyncio.gather(*(slot.open(self) for slot in slots))
+        for slot in slots:
+            self._slots.put_nowait(slot)
+        return self
+
+    async def __aexit__(self, *exc):
+        for browser in self._browsers:
+            await browser.close()
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def bucket(self, url: str) -> TokenBucket:
+        if self.limiter is not None:
+            return self.limiter.bucket(url)
+        host = urlsplit(url).hostname or ""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.per_host_rate, self.per_host_burst)
+        return self._buckets[host]
+
+    async def _ensure(self, slot: Slot):
+        # a crashed browser is relaunched once; each of its slots reopens on first use
+        async with self._lock:
+            if not self._browsers[slot.index].is_connected():
+                self._browsers[slot.index] = await self._launch()
+                self.stats["relaunched"] += 1
+        if slot.browser is not self._browsers[slot.index]:
+            slot.browser = self._browsers[slot.index]
+            await slot.open(self)
+
+    async def _route(self, route):
+        if route.request.resource_type in self.block:
+            self.stats["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _load(self, slot: Slot, url: str, selector) -> FetchResult:
+        start = time.perf_counter()
+        page = await slot.context.new_page()
+        try:
+            resp = await page.goto(url, wait_until="domcontentloaded")
+            if selector:
+                await page.wait_for_selector(selector, state="attached")
+            else:
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=self.idle_timeout * 1000)
+                except PlaywrightTimeout:
+                    self.stats["not_idle"] += 1
+            html = await page.content()
+            elapsed = time.perf_counter() - start
+            status = resp.status if resp is not None else 200
+            return FetchResult(url=url, status=status, content=html.encode("utf-8"),
+                               headers=await resp.all_headers() if resp is not None else {},
+                               final_url=page.url, attempts=1, elapsed=elapsed,
+                               timings={"render": elapsed})
+        finally:
+            await page.close()
+
+    async def render(self, url: str, selector=None) -> FetchResult:
+        """Rendered HTML of `url`; failures come back as FetchResult.error, never raised."""
+        # the host token comes first, so a throttled host doesn't hold a context while it waits
+        queued = time.perf_counter()
+        await self.bucket(url).acquire()
+        slot = await self._slots.get()
+        start = time.perf_counter()
+        try:
+            await self._ensure(slot)
+            result = await asyncio.wait_for(self._load(slot, url, selector or self.selector), self.timeout)
+            result.timings["throttle"] = start - queued
+            self.stats["rendered" if result.ok else "failed"] += 1
+            return result
+        except (asyncio.TimeoutError, PlaywrightTimeout):
+            self.stats["timeouts"] += 1
+            return FetchResult(url=url, attempts=1, elapsed=time.perf_counter() - start,
+                               error=f"render timeout after {self.timeout:.0f}s")
+        except Exception as e:
+            self.stats["failed"] += 1
+            return FetchResult(url=url, attempts=1, elapsed=time.perf_counter() - start,
+                               error=f"{type(e).__name__}: {str(e)[:200]}")
+        finally:
+            slot.pages += 1
+            if slot.pages >= self.recycle_after:
+                try:
+                    await slot.recycle(self)
+                except Exception:
+                    slot.browser = None   # _ensure() reopens it on next use
+            self._slots.put_nowait(slot)
+
+    async def render_many(self, urls):
+        """Yield a FetchResult per URL in completion order, `concurrency` at a time."""
+        urls = iter(urls)
+        pending = set()
+        while True:
+            for url in urls:
+                pending.add(asyncio.ensure_future(self.render(url)))
+                if len(pending) >= self.concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
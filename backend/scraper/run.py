@@ -1,144 +1,289 @@
-import requests, os, json, hashlib, time, traceback
-from bs4 import BeautifulSoup
+import os, sys, json, asyncio
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
-with open("sources_classified.json", "r", encoding="utf-8") as f:
-    sources_classified = json.load(f)
-    SOURCES = [s for s in sources_classified if s["type"] == "static_html"]
-
-def scrape_static(url: str) -> str:
-    r = requests.get(url, timeout=15, headers={
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    })
-    r.encoding = 'utf-8'
-    soup = BeautifulSoup(r.text, 'lxml')
-
-    for tag in soup(['nav', 'footer', 'script', 'style',
-                     'header', 'aside', 'iframe', 'noscript']):
-        tag.decompose()
-
-    JUNK_WORDS = ['related', 'sidebar', 'ads', 'social', 'share',
-                  'comment', 'newsletter', 'recommended', 'trending',
-                  'taboola', 'sponsored', 'tags', 'author']
-
-    for tag in soup.find_all(True):
-        if not hasattr(tag, 'attrs') or tag.attrs is None:
-            continue
-        label = ' '.join(tag.attrs.get('class', [])) + ' ' + str(tag.attrs.get('id', ''))
-        if any(j in label.lower() for j in JUNK_WORDS):
-            tag.decompose()
-
-    main = (soup.find('article') or soup.find('main') or
-            soup.find('div', {'class': lambda c: c and 'article' in ' '.join(c).lower()}) or
-            soup)
-   
-    raw_lines = main.get_text(separator='\n', strip=True).split('\n')
-    clean_lines = []
-
-    for line in raw_lines:
-        line = line.strip()
-        if len(line) < 40:
-            continue
-
-        line_lower = line.lower()
-
-        HARD_STOP = [
-            'murder case', 'iran war', 'israel war', 'viral video',
-            'taboola', 'sponsored links', 'download app',
-            '(this story has not been edited',
-            'auto-generated from pti',
-            'पत्रकारिता में', 'फ्रीलांसिंग', 'डिजिटल मीडिया में कार्यरत',
-            'वायरल खबरें', 'विज्ञापन'
-        ]
-        if any(signal in line_lower for signal in HARD_STOP):
-            break
-
-        SOFT_JUNK = [
-            'read more', 'tags:', 'author:', 'share this',
-            'जरूर पढ़ें', 'यह भी पढ़ें', 'ये भी पढ़ें'
-        ]
-        if any(signal in line_lower for signal in SOFT_JUNK):
-            continue
-
-        clean_lines.append(line)
-
-    return '\n'.join(clean_lines)
-
-results = []
-
-for i, source in enumerate(SOURCES):
-    url   = source["url"]
-    state = source["state"]
-    print(f"[{i+1:3}/{len(SOURCES)}] {state:25} | {url[:50]}")
-
-    record = {
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.fetcher import AsyncFetcher, fetch_url
+from scraper.http_cache import get_default_cache
+from scraper.extract import extract_main_text, parse_html, extract_tree
+from scraper.instrument import Instrument, get_instrument, timed
+from scaper.normalizer import normalize_text
+from scraper.fetch_pipeline import FetchPipeline
+from scraper.render import RenderPool
+from scraper.store import RawStore, url_key
+from processor.relevance import get_scorer
+from scaper.hasher import HashIndex
+from db.sqlite_client import MetadataStore
+
+# crawler sources whose documents skip the length and relevance checks
+CURATED_SOURCES = ("PRS", "JustAI")
+
+
+def parse_static(html: str, parser: str = 'bs4') -> str:
+    return normalize_text(extract_main_text(html, parser=parser))
+
+
+def parse_static_timed(html: str, parser: str = 'bs4') -> tuple:
+    """parse_static plus its {"parse": s, "extract": s} seconds, for the scrape timings."""
+    timings = {}
+    with timed(timings, "parse"):
+        tree = parse_html(html, parser)
+    with timed(timings, "extract"):
+        text = normalize_text(extract_tree(tree, parser))
+    return text, timings
+
+
+def scrape_static(url: str, cache=None, instrument: Instrument = None) -> str:
+    result = fetch_url(url, timeout=15, cache=cache or get_default_cache(), instrument=instrument)
+    if not result.ok:
+        raise RuntimeError(result.error)
+    if instrument is None:
+        return parse_static(result.text)
+    text, timings = parse_static_timed(result.text)
+    instrument.record(url, {**result.timings, **timings}, "ok", http=result.status,
+                      bytes=len(result.content), cached=result.from_cache)
+    return text
+
+
+def save_page(url: str, state: str, text: str, record: dict, index: HashIndex, store: RawStore,
+              log=print, timings=None, source=None, drop_irrelevant=False):
+    # PRS bills and JustAI posts are curated AI-policy sources: short bill
+    # entries and posts without the portal keywords are still kept.
+    # Portal pages are scored; a page without AI keywords is only dropped
+    # with drop_irrelevant, otherwise it is kept with its score.
+    curated = source in CURATED_SOURCES
+    if len(text) < (1 if curated else 100):
+        record["status"] = "empty"
+        record["chars"]  = len(text)
+        log(f"  SKIP — only {len(text)} chars")
+        return
+
+    relevance = None if curated else get_scorer().score(text)
+    if drop_irrelevant and relevance is not None and not relevance.relevant:
+        record["status"] = "irrelevant"
+        record["chars"]  = len(text)
+        log(f"  SKIP — no AI keywords (score {relevance.score})")
+        return
+
+    fpath = f"raw_store:{url_key(url)}"
+    record["chars"] = len(text)
+    record["file"]  = fpath
+
+    # Skip unless the normalized text actually differs from the last scrape
+    change = index.check(url, text)
+    record["hash"] = change.content_hash
+    if change.status == "unchanged":
+        index.record(change)
+        log(f"  SKIP — unchanged")
+        record["status"] = "unchanged"
+        return
+    if change.duplicate_of:
+        index.record(change)
+        log(f"  SKIP — duplicate of {change.duplicate_of[:50]}")
+        record["status"] = "duplicate"
+        record["file"]   = None
+        return
+
+    with timed(timings if timings is not None else {}, "write"):
+        store.put({
+            "url": url, "state": state,
+            "text": text,
+            "scraped_at": datetime.utcnow().isoformat(),
+            "hash": change.content_hash,
+            "source": source or "state_portal",
+            "relevance": relevance.score if relevance else None,
+            "matched_terms": relevance.terms if relevance else None
+        })
+        index.record(change)
+
+    record["status"] = "success" if change.status == "new" else "updated"
+    log(f"  {'OK' if change.status == 'new' else 'UPDATED'} — {len(text)} chars → {fpath}"
+        + (f" ({source}, unfiltered)" if curated else ""))
+
+
+def new_record(url: str, state: str) -> dict:
+    return {
         "url": url, "state": state,
         "status": None, "chars": 0,
         "file": None, "error": None,
         "scraped_at": datetime.utcnow().isoformat()
     }
 
-    try:
-        text = scrape_static(url)
-
-        if len(text) < 100:
-            record["status"] = "empty"
-            record["chars"]  = len(text)
-            print(f"  SKIP — only {len(text)} chars")
-
-        else:
-            folder = f"../../data/raw/{state.lower().replace(' ','_').replace('&','and')}"
-            os.makedirs(folder, exist_ok=True)
-            fname = hashlib.md5(url.encode()).hexdigest()[:12] + ".json"
-            fpath = f"{folder}/{fname}"
-
-            # Skip if already scraped
-            if os.path.exists(fpath):
-                print(f"  SKIP — already exists")
-                record["status"] = "exists"
-                record["file"]   = fpath
-            else:
-                with open(fpath, "w", encoding="utf-8") as f:
-                    json.dump({
-                        "url": url, "state": state,
-                        "text": text,
-                        "scraped_at": datetime.utcnow().isoformat(),
-                        "hash": hashlib.md5(text.encode()).hexdigest()
-                    }, f, ensure_ascii=False, indent=2)
-
-                record["status"] = "success"
-                record["chars"]  = len(text)
-                record["file"]   = fpath
-                print(f"  OK — {len(text)} chars → {fpath}")
-
-    except Exception as e:
-        record["status"] = "failed"
-        record["error"]  = str(e)[:120]
-        print(f"  FAIL — {str(e)[:70]}")
-
-    results.append(record)
-    time.sleep(0.5)
-
-os.makedirs("../../data/logs", exist_ok=True)
-log = {
-    "run_at":  datetime.utcnow().isoformat(),
-    "total":   len(results),
-    "success": len([r for r in results if r["status"] == "success"]),
-    "exists":  len([r for r in results if r["status"] == "exists"]),
-    "empty":   len([r for r in results if r["status"] == "empty"]),
-    "failed":  len([r for r in results if r["status"] == "failed"]),
-    "results": results
-}
-with open("../../data/logs/scrape_summary.json", "w") as f:
-    json.dump(log, f, indent=2)
-
-
-print(f"\n{'='*55}")
-print(f"  success: {log['success']}  |  exists: {log['exists']}  |  empty: {log['empty']}  |  failed: {log['failed']}")
-print(f"  log → data/logs/scrape_summary.json")
-
-if log["failed"] > 0:
-    print(f"\n  Failed URLs:")
-    for r in [r for r in results if r["status"] == "failed"]:
-        print(f"    [{r['state']:20}] {r['url'][:55]}")
-        print(f"      {r['error']}")
\ No newline at end of file
+
+def url_states(sources) -> dict:
+    # first state listed for a URL wins; the same page is only fetched once
+    states = {}
+    for source in sources:
+        states.setdefault(source["url"], source["state"])
+    return states
+
+
+async def scrape_all(sources, fetcher: AsyncFetcher, index: HashIndex, store: RawStore,
+                     workers=None, drop_irrelevant=False) -> list:
+    states = url_states(sources)
+
+    # a 304 means the body is byte-identical to the one we already hashed
+    def should_extract(fetched):
+        return not (fetched.not_modified and fetched.url in index)
+
+    results = []
+    async with FetchPipeline(fetcher, workers=workers) as pipe:
+        async for parsed in pipe.run(states, parse_static_timed, should_extract):
+            url   = parsed.url
+            state = states[url]
+            print(f"[{len(results)+1:3}/{len(states)}] {state:25} | {url[:50]}")
+            record = new_record(url, state)
+            timings = dict(parsed.fetched.timings)
+
+            try:
+                if not parsed.ok:
+                    raise RuntimeError(parsed.error)
+
+                if parsed.skipped:
+                    index.touch(url)
+                    record["status"] = "unchanged"
+                    print(f"  SKIP — not modified")
+                else:
+                    text, parse_timings = parsed.result
+                    timings.update(parse_timings)
+                    save_page(url, state, text, record, index, store, timings=timings,
+                              drop_irrelevant=drop_irrelevant)
+
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"]  = str(e)[:120]
+                print(f"  FAIL — {str(e)[:70]}")
+
+            if fetcher.instrument:
+                log_timings(fetcher.instrument, record, parsed.fetched, timings)
+            results.append(record)
+
+    return results
+
+
+async def render_all(sources, pool: RenderPool, index: HashIndex, store: RawStore,
+                     workers=None, instrument: Instrument = None, drop_irrelevant=False) -> list:
+    """js_rendered sources: the browser pool renders, then the same extraction as scrape_all."""
+    states = url_states(sources)
+    loop = asyncio.get_running_loop()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        async for rendered in pool.render_many(states):
+            url   = rendered.url
+            state = states[url]
+            print(f"[{len(results)+1:3}/{len(states)}] {state:25} | {url[:50]}  (rendered)")
+            record = new_record(url, state)
+            timings = dict(rendered.timings)
+
+            try:
+                if not rendered.ok:
+                    raise RuntimeError(rendered.error or f"HTTP {rendered.status}")
+                text, parse_timings = await loop.run_in_executor(executor, parse_static_timed, rendered.text)
+                timings.update(parse_timings)
+                save_page(url, state, text, record, index, store, timings=timings,
+                          drop_irrelevant=drop_irrelevant)
+
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"]  = str(e)[:120]
+                print(f"  FAIL — {str(e)[:70]}")
+
+            if instrument:
+                log_timings(instrument, record, rendered, timings)
+            results.append(record)
+
+    return results
+
+
+def log_timings(instrument: Instrument, record: dict, fetched, timings: dict):
+    instrument.record(record["url"], timings, record["status"], state=record["state"],
+                      http=fetched.status, bytes=len(fetched.content), cached=fetched.from_cache)
+
+
+def save_documents(results: list):
+    rows = []
+    for r in results:
+        row = {
+            "url": r["url"], "state": r["state"],
+            "source": r.get("source", "state_portal"), "doc_type": r.get("doc_type", "html"),
+            "status": r["status"], "file": r["file"], "error": r["error"],
+            "content_hash": r.get("hash"), "fetched_at": r["scraped_at"],
+        }
+        if r["status"] in ("success", "updated"):
+            row["changed_at"] = r["scraped_at"]
+        rows.append({k: v for k, v in row.items() if v is not None or k == "error"})
+    MetadataStore().upsert_documents(rows)
+
+
+def main():
+    # --drop-irrelevant: skip portal pages without AI keywords (default: keep them, scored)
+    drop_irrelevant = "--drop-irrelevant" in sys.argv[1:]
+
+    with open("sources_classified.json", "r", encoding="utf-8") as f:
+        sources_classified = json.load(f)
+        sources = [s for s in sources_classified if s["type"] == "static_html"]
+        rendered = [s for s in sources_classified if s["type"] == "js_rendered"]
+
+    index = HashIndex()
+    instrument = get_instrument()
+
+    async def _run():
+        async with AsyncFetcher(timeout=15, cache=get_default_cache(), instrument=instrument) as fetcher:
+            with RawStore(writer=True) as store:
+                results = await scrape_all(sources, fetcher, index, store, drop_irrelevant=drop_irrelevant)
+                if rendered:
+                    async with RenderPool(limiter=fetcher) as pool:
+                        results += await render_all(rendered, pool, index, store, instrument=instrument,
+                                                   drop_irrelevant=drop_irrelevant)
+                    print(f"  render pool: {pool.stats}")
+                return results
+
+    results = asyncio.run(_run())
+    get_default_cache().evict()
+    save_documents(results)
+    instrument.close()
+
+    os.makedirs("../../data/logs", exist_ok=True)
+    log = {
+        "run_at":  datetime.utcnow().isoformat(),
+        "total":   len(results),
+        "success": len([r for r in results if r["status"] == "success"]),
+        "updated": len([r for r in results if r["status"] == "updated"]),
+        "unchanged": len([r for r in results if r["status"] == "unchanged"]),
+        "duplicate": len([r for r in results if r["status"] == "duplicate"]),
+        "empty":   len([r for r in results if r["status"] == "empty"]),
+        "irrelevant": len([r for r in results if r["status"] == "irrelevant"]),
+        "failed":  len([r for r in results if r["status"] == "failed"]),
+        "timings": instrument.to_dict(),
+        "results": results
+    }
+    with open("../../data/logs/scrape_summary.json", "w") as f:
+        json.dump(log, f, indent=2)
+
+
+    print(f"\n{'='*55}")
+    print(f"  success: {log['success']}  |  updated: {log['updated']}  |  unchanged: {log['unchanged']}  |  "
+          f"duplicate: {log['duplicate']}  |  empty: {log['empty']}  |  "
+          f"irrelevant: {log['irrelevant']}  |  failed: {log['failed']}")
+    print(f"  log → data/logs/scrape_summary.json")
+    print(f"\n{instrument.report()}")
+    print(f"  timings → data/logs/scrape_timings.jsonl  |  metrics → {instrument.write_textfile()}")
+
+    if log["failed"] > 0:
+        print(f"\n  Failed URLs:")
+        for r in [r for r in results if r["status"] == "failed"]:
+            print(f"    [{r['state']:20}] {r['url'][:55]}")
+            print(f"      {r['error']}")
+
+    if log["irrelevant"] > 0:
+        print(f"\n  Dropped as irrelevant (--drop-irrelevant):")
+        for r in [r for r in results if r["status"] == "irrelevant"]:
+            print(f"    [{r['state']:20}] {r['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import os
+import sys
+import json
+import mmap
+import time
+import zlib
+import fcntl
+import struct
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+STORE_DIR = os.path.join(DATA_DIR, "raw_store")
+INDEX_NAME = "index.db"
+LOCK_NAME = "writer.lock"
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 ** 2
+DEFAULT_GARBAGE_RATIO = 0.3
+# level 1 is ~2x faster than the default 6 and within a few % on scraped text
+COMPRESS_LEVEL = 1
+
+# frame = 4-byte big-endian length + zlib(JSON document)
+_FRAME = struct.Struct(">I")
+
+
+def url_key(url: str) -> str:
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def encode(doc: dict) -> bytes:
+    return zlib.compress(json.dumps(doc, ensure_ascii=False).encode("utf-8"), COMPRESS_LEVEL)
+
+
+def decode(payload) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+
+class RawStore:
+    """Append-only segments of compressed JSON documents with an offset index.
+
+    Every put() appends a frame to the active segment and points the URL's
+    row in index.db at it, so an older version of a page simply becomes
+    garbage in its segment until compact() rewrites segments that are
+    mostly superseded. Random access by URL is one index lookup plus a
+    read from a memory-mapped segment; scan() reads segments front to back.
+
+    One writer process at a time; any number of readers. Open with
+    writer=True to write: that takes an exclusive lock on writer.lock and
+    cuts off frames a crashed writer left past its last index commit.
+    Readers never touch the segments; they only follow committed offsets,
+    so a frame the writer has flushed but not yet indexed is invisible.
+    """
+
+    def __init__(self, directory=STORE_DIR, segment_bytes=DEFAULT_SEGMENT_BYTES, writer=False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.writer = writer
+        os.makedirs(directory, exist_ok=True)
+
+        self._lockfile = None
+        if writer:
+            self._lockfile = open(os.path.join(directory, LOCK_NAME), "a")
+            try:
+                fcntl.flock(self._lockfile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lockfile.close()
+                raise RuntimeError(f"{directory} is already open for writing by another process")
+
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._db = sqlite3.connect(os.path.join(directory, INDEX_NAME),
+                                   timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS docs (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                state TEXT,
+                hash TEXT,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                updated_at REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_docs_segment ON docs(segment, offset)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_docs_state ON docs(state)")
+        self._db.commit()
+
+        segments = self.segments()
+        self._active = segments[-1] if segments else 1
+        self._out = None
+        if writer:
+            self._recover()
+
+    # --- segments ---
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"seg-{segment:06d}.bin")
+
+    def segments(self) -> list:
+        return sorted(int(name[4:10]) for name in os.listdir(self.directory)
+                      if name.startswith("seg-") and name.endswith(".bin"))
+
+    def _recover(self):
+        # frames written after the last index commit (a crash mid-put) are cut off;
+        # only safe under the writer lock, since a live writer may be between flush and commit
+        path = self.segment_path(self._active)
+        if not os.path.exists(path):
+            return
+        end = self._db.execute("SELECT MAX(offset + length) FROM docs WHERE segment = ?",
+                               (self._active,)).fetchone()[0] or 0
+        if os.path.getsize(path) > end:
+            with open(path, "r+b") as f:
+                f.truncate(end)
+
+    def _writer(self, size: int):
+        if not self.writer:
+            raise RuntimeError("RawStore opened read-only; pass writer=True to write")
+        if self._out is None:
+            self._out = open(self.segment_path(self._active), "ab")
+        if self._out.tell() and self._out.tell() + size > self.segment_bytes:
+            self._out.close()
+            self._active += 1
+            self._out = open(self.segment_path(self._active), "ab")
+        return self._out
+
+    def _view(self, segment: int, end: int):
+        # re-map when the active segment has grown past the current mapping
+        view = self._maps.get(segment)
+        if view is None or len(view) < end:
+            if view is not None:
+                view.close()
+            with open(self.segment_path(segment), "rb") as f:
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = view
+        return view
+
+    def _close_maps(self, segment=None):
+        for seg in [segment] if segment is not None else list(self._maps):
+            view = self._maps.pop(seg, None)
+            if view is not None:
+                view.close()
+
+    # --- writes ---
+
+    def _append(self, doc: dict) -> tuple:
+        payload = encode(doc)
+        out = self._writer(_FRAME.size + len(payload))
+        offset = out.tell()
+        out.write(_FRAME.pack(len(payload)))
+        out.write(payload)
+        return (url_key(doc["url"]), doc["url"], doc.get("state"), doc.get("hash"),
+                self._active, offset, _FRAME.size + len(payload), time.time())
+
+    def put_many(self, docs) -> int:
+        """Append documents (each needs a "url"); the newest version of a URL wins."""
+        with self._lock:
+            rows = [self._append(doc) for doc in docs]
+            if not rows:
+                return 0
+            self._out.flush()
+            self._commit(rows)
+        return len(rows)
+
+    def _commit(self, rows):
+        # the frames are flushed; pointing the index at them makes them visible to readers
+        self._db.executemany("""
+            INSERT INTO docs (key, url, state, hash, segment, offset, length, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                url = excluded.url, state = excluded.state, hash = excluded.hash,
+                segment = excluded.segment, offset = excluded.offset,
+                length = excluded.length, updated_at = excluded.updated_at
+        """, rows)
+        self._db.commit()
+
+    def put(self, doc: dict) -> str:
+        self.put_many([doc])
+        return url_key(doc["url"])
+
+    def delete(self, url: str) -> bool:
+        if not self.writer:
+            raise RuntimeError("RawStore opened read-only; pass writer=True to write")
+        with self._lock:
+            cur = self._db.execute("DELETE FROM docs WHERE key = ?", (url_key(url),))
+            self._db.commit()
+        return cur.rowcount == 1
+
+    # --- reads ---
+
+    def _read(self, segment: int, offset: int, length: int) -> dict:
+        view = self._view(segment, offset + length)
+        return decode(view[offset + _FRAME.size: offset + length])
+
+    def get(self, url: str):
+        # under the lock so compact() cannot remove the segment between lookup and read
+        with self._lock:
+            row = self._db.execute("SELECT segment, offset, length FROM docs WHERE key = ?",
+                                   (url_key(url),)).fetchone()
+            return self._read(*row) if row else None
+
+    def __contains__(self, url: str) -> bool:
+        return self._db.execute("SELECT 1 FROM docs WHERE key = ?", (url_key(url),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def urls(self, state=None) -> list:
+        if state is None:
+            return [r[0] for r in self._db.execute("SELECT url FROM docs")]
+        return [r[0] for r in self._db.execute("SELECT url FROM docs WHERE state = ?", (state,))]
+
+    def scan(self, state=None):
+        """Yield every live document, reading segments sequentially."""
+        where, args = ("WHERE state = ?", (state,)) if state is not None else ("", ())
+        for segment in self.segments():
+            live = self._db.execute(f"SELECT offset, length FROM docs {where}"
+                                    f"{' AND' if where else ' WHERE'} segment = ? ORDER BY offset",
+                                    (*args, segment)).fetchall()
+            if not live:
+                continue
+            with open(self.segment_path(segment), "rb") as f:
+                # one sequential pass; superseded frames in between are skipped by offset
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    view.madvise(mmap.MADV_SEQUENTIAL)
+                except (AttributeError, OSError):
+                    pass
+                try:
+                    for offset, length in live:
+                        yield decode(view[offset + _FRAME.size: offset + length])
+                finally:
+                    view.close()
+
+    # --- maintenance ---
+
+    def stats(self) -> dict:
+        live = dict(self._db.execute("SELECT segment, SUM(length) FROM docs GROUP BY segment"))
+        segments = {}
+        for segment in self.segments():
+            size = os.path.getsize(self.segment_path(segment))
+            segments[segment] = {"bytes": size, "live": live.get(segment, 0),
+                                 "garbage": 1 - live.get(segment, 0) / size if size else 0.0}
+        return {"documents": len(self), "active": self._active, "segments": segments}
+
+    def compact(self, garbage_ratio=DEFAULT_GARBAGE_RATIO) -> dict:
+        """Copy live frames out of sealed segments that are at least `garbage_ratio`
+        superseded, then delete those segments."""
+        freed = moved = 0
+        for segment, info in self.stats()["segments"].items():
+            if segment == self._active or info["garbage"] < garbage_ratio:
+                continue
+            with self._lock:
+                rows = self._db.execute("SELECT key, offset, length FROM docs WHERE segment = ? "
+                                        "ORDER BY offset", (segment,)).fetchall()
+                with open(self.segment_path(segment), "rb") as f:
+                    updates = []
+                    for key, offset, length in rows:
+                        f.seek(offset)
+                        frame = f.read(length)
+                        out = self._writer(length)
+                        updates.append((self._active, out.tell(), key, segment))
+                        out.write(frame)
+                if self._out is not None:
+                    self._out.flush()
+                    os.fsync(self._out.fileno())
+                # only repoint rows still in this segment; a concurrent put has moved the others
+                self._db.executemany("UPDATE docs SET segment = ?, offset = ? WHERE key = ? AND segment = ?",
+                                     updates)
+                self._db.commit()
+                self._close_maps(segment)
+                os.remove(self.segment_path(segment))
+            freed += info["bytes"] - info["live"]
+            moved += len(rows)
+        return {"moved": moved, "freed_bytes": freed}
+
+    def import_dir(self, raw_dir: str, batch=1000) -> int:
+        """Load the legacy one-JSON-file-per-URL tree (data/raw/<state>/<md5>.json)."""
+        count, docs = 0, []
+        for root, dirs, files in os.walk(raw_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    with open(os.path.join(root, name), encoding="utf-8") as f:
+                        docs.append(json.load(f))
+                if len(docs) >= batch:
+                    count += self.put_many(docs)
+                    docs = []
+        return count + self.put_many(docs)
+
+    def close(self):
+        with self._lock:
+            if self._out is not None:
+                self._out.close()
+                self._out = None
+            self._close_maps()
+            self._db.close()
+            if self._lockfile is not None:
+                self._lockfile.close()      # releases the flock
+                self._lockfile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_store(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, INDEX_NAME))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw document segment store")
+    parser.add_argument("command", choices=["stats", "compact", "import"])
+    parser.add_argument("--dir", default=STORE_DIR)
+    parser.add_argument("--raw-dir", default=os.path.join(DATA_DIR, "raw"),
+                        help="legacy per-URL JSON tree for 'import'")
+    parser.add_argument("--garbage", type=float, default=DEFAULT_GARBAGE_RATIO)
+    args = parser.parse_args()
+
+    with RawStore(args.dir, writer=args.command != "stats") as store:
+        if args.command == "import":
+            print(f"imported {store.import_dir(args.raw_dir)} documents from {args.raw_dir}")
+        elif args.command == "compact":
+            print(store.compact(args.garbage))
+        json.dump(store.stats(), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
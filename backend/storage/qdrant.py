@@ -0,0 +1,2 @@
+# Kept for older imports; the Qdrant client lives in db/qdrant_client.py.
+from db.qdrant_client import COLLECTION, QdrantStore, get_client, point_id
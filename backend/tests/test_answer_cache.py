@@ -0,0 +1,82 @@
+import os
+import sys
+import asyncio
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from api.answer_cache import AnswerCache, query_guard
+from db.sqlite_client import MetadataStore, now
+
+URL = "https://kerala.gov.in/ai-policy"
+SOURCES = [{"url": URL, "doc_hash": "v1"}]
+
+
+def unit(*values) -> np.ndarray:
+    v = np.asarray(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+@pytest.fixture
+def metadata(tmp_path):
+    store = MetadataStore(str(tmp_path / "legalbot.db"))
+    store.upsert_documents([{"url": URL, "content_hash": "v1"}])
+    return store
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_exact_tier_ignores_case_spacing_and_punctuation(metadata):
+    cache = AnswerCache(metadata)
+    cache.put("What is the Kerala AI policy?", None, "answer", SOURCES, 900.0, state="Kerala", top_k=6)
+
+    assert run(cache.get_exact("  what is the kerala AI policy?? ", "kerala", 6)).answer == "answer"
+    assert run(cache.get_exact("What is the Kerala AI policy?", None, 6)) is None      # other scope
+    assert cache.tiers["exact"].hits == 1
+
+
+def test_semantic_tier_serves_close_paraphrases_only(metadata):
+    cache = AnswerCache(metadata, threshold=0.9)
+    cache.put("kerala ai policy", unit(1, 0, 0), "answer", SOURCES, 900.0)
+
+    assert run(cache.get_similar("ai policy of kerala", unit(1, 0.2, 0))).answer == "answer"
+    assert run(cache.get_similar("kerala data rules", unit(1, 1, 0))) is None          # cosine 0.71
+    assert cache.tiers["semantic"].hits == 1
+
+
+def test_semantic_hit_must_name_the_same_states_and_numbers(metadata):
+    cache = AnswerCache(metadata, threshold=0.9)
+    cache.put("kerala ai policy 2023", unit(1, 0, 0), "answer", SOURCES, 900.0)
+
+    assert run(cache.get_similar("karnataka ai policy 2023", unit(1, 0, 0))) is None
+    assert run(cache.get_similar("kerala ai policy 2019", unit(1, 0, 0))) is None
+    assert run(cache.get_similar("the 2023 kerala ai policy", unit(1, 0, 0))) is not None
+
+
+def test_answer_citing_a_changed_document_is_dropped(metadata):
+    cache = AnswerCache(metadata)
+    cache.put("kerala ai policy", unit(1, 0, 0), "answer", SOURCES, 900.0)
+    metadata.upsert_documents([{"url": URL, "content_hash": "v2"}])
+
+    assert run(cache.get_exact("kerala ai policy")) is None
+    assert cache.tiers["exact"].stale == 1 and not cache.entries
+
+
+def test_sync_invalidates_answers_a_refresh_changed(metadata):
+    cache = AnswerCache(metadata, sync_interval=3600)
+    cache.put("kerala ai policy", unit(1, 0, 0), "answer", [{"url": URL}], 900.0)   # no hash to check
+    other = "https://tn.gov.in/ai"
+    cache.put("tamil nadu ai policy", unit(0, 1, 0), "other", [{"url": other}], 900.0)
+
+    metadata.upsert_documents([{"url": URL, "changed_at": now()}])
+    assert run(cache.sync()) == 0            # not due yet
+    assert run(cache.sync(force=True)) == 1
+    assert list(cache.entries) == ["||tamil nadu ai policy"]
+    assert cache.by_url == {other: {"||tamil nadu ai policy"}}
+    assert run(cache.sync(force=True)) == 0
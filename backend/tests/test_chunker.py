@@ -0,0 +1,44 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.chunker import chunk_document, count_tokens
+
+POLICY = "\n".join([
+    "Chapter 1 Preliminary",
+    " ".join(f"The department shall publish clause {i} of the policy." for i in range(30)),
+    "Chapter 2 Governance",
+    "An ethics committee reviews every artificial intelligence system before it is deployed.",
+])
+
+
+def chunks(text, **kwargs) -> list:
+    return list(chunk_document({"url": "https://kerala.gov.in/ai", "text": text}, **kwargs))
+
+
+def test_chunks_stay_within_budget_and_start_at_headings():
+    result = chunks(POLICY, max_tokens=40, overlap=8)
+    assert all(c["token_count"] == count_tokens(c["text"]) <= 40 for c in result)
+    assert [c["ordinal"] for c in result] == list(range(len(result)))
+    assert any(c["text"].startswith("Chapter 2") for c in result)
+    assert chunks(POLICY, max_tokens=40, overlap=8) == result        # stable IDs
+
+
+def test_oversized_sentence_is_split_with_the_custom_counter():
+    # a counter that sees many more tokens than the regex one (like a subword tokenizer)
+    def chars(text):
+        return len(text)
+
+    sentence = " ".join(["artificial intelligence"] * 40)        # one sentence, no sentence ends
+    result = chunks(sentence, max_tokens=50, overlap=0, count=chars)
+    assert len(result) > 1
+    assert all(len(c["text"]) <= 50 for c in result)
+    assert " ".join(c["text"] for c in result) == sentence
+
+
+def test_word_longer_than_the_budget_is_cut_inside():
+    result = chunks("x" * 120, max_tokens=50, overlap=0, count=len)
+    assert [len(c["text"]) for c in result] == [50, 50, 20]
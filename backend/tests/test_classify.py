@@ -0,0 +1,94 @@
+import os
+import sys
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.classify import probe_url, declared_charset, _whole_body
+from scraper.fetcher import AsyncFetcher
+from scraper.http_cache import HttpCache
+
+TEXT = "Kerala notified its artificial intelligence policy for public services. " * 20
+PAGES = {
+    "/static": ("text/html; charset=utf-8", f"<html><body><p>{TEXT}</p></body></html>".encode()),
+    "/shell": ("text/html", b"<html><body><div id=app></div><script>load()</script></body></html>"),
+    "/latin": ("text/html; charset=iso-8859-1", f"<p>Política {TEXT}</p>".encode("latin-1")),
+    "/report": ("application/pdf", b"%PDF-1.4 " + b"0" * 4096),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Handler.requests.append((self.command, self.path))
+        if self.path not in PAGES:
+            self.send_error(404)
+            return
+        content_type, body = PAGES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def probe_then_fetch(url: str, cache: HttpCache):
+    async def run():
+        async with AsyncFetcher(per_host_rate=100.0, per_host_burst=100, cache=cache) as fetcher:
+            kind = await probe_url(fetcher, url, cache)
+            fetched = await fetcher.fetch(url) if kind == "static_html" else None
+            return kind, fetched
+    return asyncio.run(run())
+
+
+def test_classify_then_scrape_is_one_request(base_url, tmp_path):
+    Handler.requests.clear()
+    kind, fetched = probe_then_fetch(base_url + "/static", HttpCache(str(tmp_path)))
+
+    assert kind == "static_html"
+    assert fetched.from_cache and fetched.content == PAGES["/static"][1]
+    assert Handler.requests == [("GET", "/static")]
+
+
+@pytest.mark.parametrize("path, expected", [("/shell", "js_rendered"), ("/report", "pdf"),
+                                            ("/missing", "error: HTTP 404")])
+def test_probe_types(base_url, tmp_path, path, expected):
+    kind, _ = probe_then_fetch(base_url + path, HttpCache(str(tmp_path)))
+    assert kind == expected
+
+
+def test_cached_body_is_decoded_with_its_charset(base_url, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    probe_then_fetch(base_url + "/latin", cache)
+    entry = cache.get(base_url + "/latin")
+
+    assert declared_charset(entry.headers) == "iso8859-1"
+    assert entry.read().decode(declared_charset(entry.headers)).startswith("<p>Política")
+    assert declared_charset({"Content-Type": "text/html; charset=bogus"}) == "utf-8"
+
+
+def test_only_a_complete_range_counts_as_the_whole_body():
+    assert _whole_body(200, {})
+    assert _whole_body(206, {"Content-Range": "bytes 0-99/100"})
+    assert not _whole_body(206, {"Content-Range": "bytes 0-99/5000"})
@@ -0,0 +1,42 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.hasher import HashIndex
+from scraper.run import save_page, new_record
+from scraper.store import RawStore
+from schedular.update import prs_document
+
+BILL = {"url": "https://prsindia.org/billtrack/the-digital-india-bill-2023", "title": "The Digital India Bill, 2023",
+        "status": "Pending", "ministry": "N/A", "summary": "N/A", "published_on": "Dec 05, 2023"}
+
+
+def test_prs_dates_are_iso_or_left_out():
+    assert prs_document(BILL)["published_date"] == "2023-12-05"
+    assert "published_date" not in prs_document({**BILL, "published_on": "N/A"})
+    assert "published_date" not in prs_document({**BILL, "published_on": "05/12/2023"})
+
+
+def save(tmp_path, text, source=None, drop_irrelevant=False) -> dict:
+    record = new_record(BILL["url"], None)
+    with RawStore(str(tmp_path / "raw"), writer=True) as store:
+        index = HashIndex(str(tmp_path / "hash.db"))
+        save_page(BILL["url"], None, text, record, index, store, log=lambda *a: None, source=source,
+                  drop_irrelevant=drop_irrelevant)
+        index.close()
+    return record
+
+
+def test_curated_documents_skip_the_portal_filters(tmp_path):
+    text = prs_document(BILL)["text"]       # short, and no AI keywords
+    assert save(tmp_path / "portal", text)["status"] == "empty"
+    assert save(tmp_path / "prs", text, source="PRS")["status"] == "success"
+
+    long_text = "The committee met to discuss the annual budget for roads and bridges. " * 5
+    assert save(tmp_path / "portal2", long_text)["status"] == "success"        # kept unless asked
+    assert save(tmp_path / "portal3", long_text, drop_irrelevant=True)["status"] == "irrelevant"
+    assert save(tmp_path / "justai", long_text, source="JustAI")["status"] == "success"
+    assert save(tmp_path / "justai2", "", source="JustAI")["status"] == "empty"
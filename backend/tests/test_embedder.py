@@ -0,0 +1,48 @@
+import os
+import sys
+import asyncio
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.embedder import Embedder, EmbeddingCache, HashingBackend
+
+
+class LoopRecorder(HashingBackend):
+    """Remembers the loop of every request, like an async HTTP client bound to its first loop."""
+
+    def __init__(self):
+        super().__init__(dim=64)
+        self.loops = set()
+
+    async def embed(self, texts):
+        self.loops.add(asyncio.get_running_loop())
+        return await super().embed(texts)
+
+
+def test_sync_calls_share_one_loop():
+    backend = LoopRecorder()
+    embedder = Embedder(backend)
+    chunks = [{"text": f"AI policy clause {i}"} for i in range(10)]
+
+    windows = list(embedder.embed_chunks(chunks, window=3))
+    embedder.embed_texts(["one more call"])
+    embedder.close()
+
+    assert [len(batch) for batch, _ in windows] == [3, 3, 3, 1]
+    assert len(backend.loops) == 1
+
+
+def test_fresh_vectors_match_cache_hits(tmp_path):
+    texts = ["Kerala AI mission", "Telangana data policy"]
+    cache = EmbeddingCache(str(tmp_path / "emb.db"))
+    fresh = Embedder(HashingBackend(), cache).embed_texts(texts)
+    cached = Embedder(HashingBackend(), cache).embed_texts(texts)
+    cache.close()
+
+    assert cache.hits == 2
+    assert fresh.dtype == cached.dtype == np.float32
+    assert np.array_equal(fresh, cached)
@@ -0,0 +1,43 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.hasher import HashIndex
+
+POLICY = " ".join(f"Clause {i}: the state shall publish every artificial intelligence system it deploys."
+                  for i in range(40))
+BUDGET = " ".join(f"Item {i}: road repairs in ward {i} are funded from the municipal budget this year."
+                  for i in range(40))
+
+
+def test_new_unchanged_changed(tmp_path):
+    index = HashIndex(str(tmp_path / "hash.db"))
+    assert index.update("a", POLICY).status == "new"
+    assert index.update("a", POLICY).status == "unchanged"
+    # whitespace and case differences are normalized away
+    assert index.update("a", "  " + POLICY.upper()).status == "unchanged"
+    change = index.update("a", BUDGET)
+    assert change.status == "changed" and change.distance > 0
+    assert index.pending() == [("a", change.content_hash)]
+    index.close()
+
+
+def test_duplicate_is_released_when_its_original_changes(tmp_path):
+    index = HashIndex(str(tmp_path / "hash.db"))
+    index.update("a", POLICY)
+    assert index.update("b", POLICY).duplicate_of == "a"
+    assert [url for url, _ in index.pending()] == ["a"]
+
+    # b is rescraped with the same text while it still duplicates a
+    assert index.update("b", POLICY).status == "unchanged"
+
+    index.update("a", BUDGET)
+    change = index.update("b", POLICY)
+    assert change.status == "changed" and change.duplicate_of is None
+    assert sorted(url for url, _ in index.pending()) == ["a", "b"]
+    assert index.history(["b"])["b"][2] == 0      # its own text never changed
+    assert index.update("b", POLICY).status == "unchanged"
+    index.close()
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.http_cache import HttpCache, cached_get
+
+
+class Handler(BaseHTTPRequestHandler):
+    body = etag = None
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Handler.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == Handler.etag:
+            self.send_response(304)
+            self.send_header("ETag", Handler.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", Handler.etag)
+        self.send_header("Content-Length", str(len(Handler.body)))
+        self.end_headers()
+        self.wfile.write(Handler.body)
+
+
+@pytest.fixture
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Handler.body, Handler.etag = b"<p>Kerala AI policy</p>", '"v1"'
+    Handler.requests.clear()
+    yield f"http://127.0.0.1:{server.server_address[1]}/policy"
+    server.shutdown()
+
+
+def test_fresh_entries_skip_the_network_and_stale_ones_revalidate(tmp_path, url):
+    cache = HttpCache(str(tmp_path))
+    first = cached_get(url, cache=cache)
+    assert first.status_code == 200 and not first.from_cache and first.text == Handler.body.decode()
+
+    assert cached_get(url, cache=cache).from_cache            # within the TTL
+    assert Handler.requests == [None]
+
+    # revalidate=True asks the server even within the TTL; a 304 serves the stored body
+    again = cached_get(url, cache=cache, revalidate=True)
+    assert again.not_modified and again.content == Handler.body
+    assert Handler.requests == [None, '"v1"']
+
+    cache.ttl = 0
+    Handler.etag, Handler.body = '"v2"', b"<p>Kerala AI policy, amended</p>"
+    changed = cached_get(url, cache=cache)
+    assert not changed.from_cache and changed.content == Handler.body
+    assert cache.get(url).etag == '"v2"'
+    cache.close()
+
+
+def test_only_200s_are_stored(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.put("http://example.gov.in/missing", 404, {}, b"not found")
+    assert cache.get("http://example.gov.in/missing") is None
+    cache.close()
+
+
+def test_evict_drops_old_then_least_recently_used(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=25)
+    for name in "abc":
+        cache.put(f"http://example.gov.in/{name}", 200, {}, b"x" * 10)
+        time.sleep(0.01)
+    cache.get("http://example.gov.in/a")                     # a is now the most recently used
+    assert cache.evict() == 1
+    assert cache.get("http://example.gov.in/b") is None
+    assert cache.get("http://example.gov.in/a") and cache.get("http://example.gov.in/c")
+
+    cache.max_age = 0
+    assert cache.evict() == 2
+    assert not any(name.endswith(".body") for _, _, files in os.walk(tmp_path) for name in files)
+    cache.close()
+
+
+def test_put_file_keeps_its_own_link(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"))
+    pdf = tmp_path / "policy.pdf"
+    pdf.write_bytes(b"%PDF-1.4 policy")
+    cache.put_file("http://example.gov.in/policy.pdf", 200, {"Content-Type": "application/pdf"}, str(pdf))
+
+    pdf.unlink()
+    entry = cache.get("http://example.gov.in/policy.pdf")
+    assert entry.read() == b"%PDF-1.4 policy" and entry.size == 15
+    assert entry.headers == {"Content-Type": "application/pdf"}
+    cache.close()
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import shutil
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, "scaper", "pdf-files")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import ingestion
+from scraper.http_cache import HttpCache
+
+FIXTURE_PDF = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "pdf", "ai_policy.pdf")
+
+
+class Killed(Exception):
+    pass
+
+
+class FakeQueue:
+    """Checkpoints in memory; with kill_at=n the n-th checkpoint dies like a killed worker."""
+
+    def __init__(self, kill_at=None):
+        self.kill_at = kill_at
+        self.checkpoints = []
+
+    def checkpoint(self, item_id, processed_pages, worker=None):
+        if self.kill_at is not None and len(self.checkpoints) + 1 == self.kill_at:
+            raise Killed()
+        self.checkpoints.append(processed_pages)
+        return True
+
+
+class NoDocuments:
+    def get_documents(self, urls):
+        return {}
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "PDF_DIR", str(tmp_path / "pdf"))
+    monkeypatch.setattr(ingestion, "STAGING_DIR", str(tmp_path / "staging"))
+    cache = HttpCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(ingestion, "get_default_cache", lambda: cache)
+    yield tmp_path
+    cache.close()
+
+
+def item(processed_pages=0, attempts=1):
+    return {"id": 1, "url": "http://example.gov.in/policy.pdf", "payload": {"state": "Kerala"},
+            "processed_pages": processed_pages, "attempts": attempts}
+
+
+def test_load_staged_cuts_a_torn_last_line(tmp_path):
+    path = tmp_path / "staged.jsonl"
+    path.write_text(json.dumps({"chunk_id": "a"}) + "\n" + '{"chunk_id": "b", "te')
+
+    assert list(ingestion.load_staged(str(path))) == ["a"]
+    assert path.read_text().endswith("\n")
+
+
+def test_resume_after_kill_writes_no_chunk_twice(dirs, monkeypatch):
+    monkeypatch.setattr(ingestion, "download_pdf", lambda url: FIXTURE_PDF)
+    monkeypatch.setattr(ingestion, "PAGES_PER_TASK", 4)
+
+    with ThreadPoolExecutor(1) as pool:
+        # first batch staged, killed before its checkpoint
+        with pytest.raises(Killed):
+            ingestion.ingest_item(item(), FakeQueue(kill_at=1), pool, 1, "w", NoDocuments())
+        chunks, pages, digest = ingestion.ingest_item(item(attempts=2), FakeQueue(), pool, 1, "w",
+                                                      NoDocuments())
+
+    with open(ingestion.staging_path(item()["url"], digest), encoding="utf-8") as f:
+        staged = [json.loads(line)["chunk_id"] for line in f]
+    assert len(staged) == len(set(staged)) == len(chunks)
+    assert {c["doc_hash"] for c in chunks} == {digest}
+    assert {c["doc_chunks"] for c in chunks} == {len(chunks)}
+
+
+def test_checkpoint_of_a_changed_file_is_not_resumed(dirs, monkeypatch):
+    monkeypatch.setattr(ingestion, "download_pdf", lambda url: FIXTURE_PDF)
+    os.makedirs(ingestion.STAGING_DIR)
+    stale = ingestion.staging_path(item()["url"], "0" * 32)
+    open(stale, "w").close()
+
+    queue = FakeQueue()
+    with ThreadPoolExecutor(1) as pool:
+        chunks, pages, _ = ingestion.ingest_item(item(processed_pages=8), queue, pool, 1, "w",
+                                                 NoDocuments())
+
+    assert not os.path.exists(stale)
+    assert queue.checkpoints[-1] == pages
+    assert chunks
+
+
+def test_download_revalidates_and_picks_up_a_changed_pdf(dirs):
+    site = dirs / "site"
+    site.mkdir()
+    shutil.copy(FIXTURE_PDF, site / "a.pdf")
+    requests_seen = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            requests_seen.append(args[1])       # status code
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(site)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/a.pdf"
+    try:
+        path = ingestion.download_pdf(url)
+        assert ingestion.download_pdf(url) == path
+        assert requests_seen == ["200", "304"]
+
+        with open(site / "a.pdf", "ab") as f:
+            f.write(b"\n% revised\n")
+        later = time.time() + 5
+        os.utime(site / "a.pdf", (later, later))
+        ingestion.download_pdf(url)
+        assert requests_seen[-1] == "200"
+        assert ingestion.file_digest(path) == ingestion.file_digest(str(site / "a.pdf"))
+        assert not [n for n in os.listdir(ingestion.PDF_DIR) if n.endswith(".part")]
+    finally:
+        server.shutdown()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scaper.normalizer import canonical_state, infer_state_name, normalize_docs, normalize_text
+
+
+def test_whitespace_and_repeated_lines_fold():
+    text = "  Kerala   AI\tpolicy \n\n Share \n Share \nClause 1 "
+    assert normalize_text(text) == "Kerala AI policy\nShare\nClause 1"
+    assert normalize_text(text, keep_lines=False, lowercase=True) == "kerala ai policy share share clause 1"
+    assert normalize_text("") == "" and normalize_text(None) == ""
+
+
+def test_unicode_text_is_nfkc_folded_without_invisible_characters():
+    assert normalize_text("\ufb01nal\u200b draft\u00ad") == "final draft"
+    # a precomposed nukta letter and its decomposed form hash the same
+    assert normalize_text("\u0929") == normalize_text("\u0928\u093c")
+
+
+def test_devanagari_dandas_and_digits():
+    assert normalize_text("नीति लागू है |") == "नीति लागू है।"
+    assert normalize_text("धारा ४३ ।") == "धारा ४३।"
+    assert normalize_text("धारा ४३", fold_digits=True) == "धारा 43"
+    assert normalize_text("a | b") == "a | b"                  # not after Devanagari: left alone
+
+
+def test_docs_get_text_fields_and_state_normalized():
+    doc = {"text": "AI  policy\n\nfor Orissa", "title": " The\nAI  Mission ", "state": "orissa"}
+    assert next(normalize_docs([doc])) == {"text": "AI policy\nfor Orissa", "title": "The AI Mission",
+                                           "state": "Odisha"}
+
+
+def test_state_names():
+    assert canonical_state("J&K") == "Jammu And Kashmir"
+    assert canonical_state("tamil_nadu") == "Tamil Nadu"
+    assert canonical_state("Atlantis") is None
+    assert infer_state_name("AI initiatives in Tamil_Nadu.docx") == "Tamil Nadu"
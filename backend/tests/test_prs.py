@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper import http_cache
+from scraper.http_cache import HttpCache
+from schedular.update import load_script
+
+prs = load_script("prs", os.path.join(BACKEND_DIR, "scaper", "scraping", "prs", "prs.py"))
+
+AI_SUMMARY = "The Bill regulates artificial intelligence systems used by government departments."
+ROADS_SUMMARY = "The Bill sets out the funding of national highways and the tolls charged on them."
+
+
+def listing(stage: str) -> str:
+    return ("<div class='views-row'><a href='/billtrack/the-ai-bill'>The Digital Governance Bill</a>"
+            f"<span class='date-display-single'>Dec 05, 2023</span><span class='bill-status'>{stage}</span></div>")
+
+
+def detail(summary: str, stage: str) -> str:
+    return (f"<div class='field-type-text-with-summary'>{summary}</div>"
+            f"<div class='field-name-field-bill-status'><div class='field-item'>{stage}</div></div>")
+
+
+class Handler(BaseHTTPRequestHandler):
+    pages = {}
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Handler.requests.append(self.path)
+        body = Handler.pages[self.path].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(prs, "BASE_URL", base)
+    monkeypatch.setattr(prs, "BILLTRACK_URL", base + "/billtrack")
+    monkeypatch.setattr(prs, "SEEN_FILE", str(tmp_path / "seen.jsonl"))
+    monkeypatch.setattr(prs, "BILLS_JSON", str(tmp_path / "bills.json"))
+    monkeypatch.setattr(prs, "BILLS_CSV", str(tmp_path / "bills.csv"))
+    cache = HttpCache(str(tmp_path / "cache"))      # default 6h TTL
+    monkeypatch.setattr(http_cache, "_default_cache", cache)
+    Handler.requests.clear()
+    yield tmp_path
+    server.shutdown()
+    cache.close()
+
+
+def publish(stage: str, summary: str):
+    Handler.pages = {"/billtrack": listing(stage), "/billtrack/the-ai-bill": detail(summary, stage)}
+
+
+def saved(tmp_path) -> list:
+    with open(tmp_path / "bills.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_bills_json_keeps_one_entry_per_bill(site):
+    publish("Introduced", AI_SUMMARY)
+    assert prs.scrape_ai_bills(rate=100) == 1
+    assert [b["status"] for b in saved(site)] == ["Introduced"]
+
+    # unchanged listing: the detail page is not fetched again
+    Handler.requests.clear()
+    assert prs.scrape_ai_bills(rate=100) == 0
+    assert "/billtrack/the-ai-bill" not in Handler.requests
+
+
+def test_changed_listing_revalidates_the_detail_page_within_the_ttl(site):
+    publish("Introduced", AI_SUMMARY)
+    prs.scrape_ai_bills(rate=100)
+
+    publish("Passed", AI_SUMMARY)
+    Handler.requests.clear()
+    prs.scrape_ai_bills(rate=100, sink=lambda bills: None)
+    assert "/billtrack/the-ai-bill" in Handler.requests
+    assert [b["status"] for b in saved(site)] == ["Passed"]
+
+    publish("Amended", ROADS_SUMMARY)
+    prs.scrape_ai_bills(rate=100)
+    assert saved(site) == []
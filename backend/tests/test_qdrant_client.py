@@ -0,0 +1,36 @@
+import os
+import sys
+import argparse
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from qdrant_client import QdrantClient
+
+from db.qdrant_client import QDRANT_DIR, QdrantStore, resolve_target
+from scaper.pipeline import qdrant_target
+
+
+def test_pipeline_and_api_share_the_default_target(monkeypatch):
+    for name in ("QDRANT_URL", "QDRANT_PATH", "QDRANT_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    args = argparse.Namespace(qdrant_url=None, qdrant_path=None)
+
+    assert resolve_target()["path"] == QDRANT_DIR
+    assert resolve_target(**qdrant_target(args)) == resolve_target()
+
+    monkeypatch.setenv("QDRANT_URL", "http://qdrant:6333")
+    assert resolve_target(**qdrant_target(args)) == resolve_target()
+    assert resolve_target() == {"location": None, "url": "http://qdrant:6333", "path": None, "api_key": None}
+
+
+def test_store_detects_the_client_mode(tmp_path):
+    memory = QdrantStore(client=QdrantClient(location=":memory:"))
+    disk = QdrantStore(client=QdrantClient(path=str(tmp_path)))
+    server = QdrantStore(client=QdrantClient(url="http://127.0.0.1:1", check_compatibility=False))
+
+    assert (memory.local, memory.in_memory) == (True, True)
+    assert (disk.local, disk.in_memory) == (True, False)
+    assert (server.local, server.in_memory) == (False, False)
+    disk.client.close()
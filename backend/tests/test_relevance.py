@@ -0,0 +1,30 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from processor.relevance import RelevanceScorer
+
+
+def test_keywords_match_whole_words_only():
+    scorer = RelevanceScorer()
+    assert not scorer.is_relevant("The minister said the maintenance contract was signed.")
+    assert scorer.score("The minister said the maintenance contract was signed.").score == 0
+    assert scorer.is_relevant("The state will regulate artificial intelligence in hospitals.")
+    assert scorer.is_relevant("कृत्रिम बुद्धिमत्ता नीति")
+
+
+def test_longest_overlapping_keyword_wins():
+    scorer = RelevanceScorer({"generative ai": 3, "ai": 1}, threshold=3)
+    result = scorer.score("Guidelines on Generative\nAI and AIs in schools")
+    assert result.matches == {"generative ai": 1, "ai": 1}
+    assert result.score == 4 and result.relevant
+
+
+def test_light_keywords_add_up_to_the_threshold():
+    scorer = RelevanceScorer({"artificial intelligence": 3, "algorithm": 1}, threshold=3)
+    assert not scorer.is_relevant("One algorithm.", "Two algorithms.")
+    assert scorer.is_relevant("An algorithm, another algorithm and a third algorithm.")
+    assert scorer.is_relevant("", None, "Artificial Intelligence")
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from db.inverted_index import InvertedIndex, query_terms
+from processor.retriever import HybridRetriever, rrf
+
+
+def chunk(n, url, text, state="Kerala"):
+    return {"chunk_id": f"c{n}", "url": url, "doc_hash": "h", "state": state, "source": "state_portal",
+            "text": text}
+
+
+CHUNKS = [
+    chunk(1, "https://kerala.gov.in/ai", "The Kerala artificial intelligence policy sets up an ethics board."),
+    chunk(2, "https://kerala.gov.in/ai", "Data centres in Kerala get land at concessional rates."),
+    chunk(3, "https://tn.gov.in/ai", "Tamil Nadu publishes its artificial intelligence policy, policy and rules.",
+          state="Tamil Nadu"),
+    chunk(4, "https://tn.gov.in/roads", "Road repairs are funded from the state budget.", state="Tamil Nadu"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    with InvertedIndex(str(tmp_path / "kw")) as index:
+        index.add(CHUNKS)
+        index.flush()
+        yield index
+
+
+def test_query_terms_drop_stopwords_and_repeats():
+    assert query_terms("What is the  AI policy of the AI Mission?") == ["ai", "policy", "mission"]
+
+
+def test_bm25_ranks_by_term_weight_and_filters_before_scoring(index):
+    hits = index.search("artificial intelligence policy")
+    assert [h["chunk_id"] for h in hits] == ["c3", "c1"]       # "policy" twice in c3
+    assert [h["chunk_id"] for h in index.search("artificial intelligence policy", state="Kerala")] == ["c1"]
+    assert index.search("ethics", state=["Kerala", "Goa"])[0]["chunk_id"] == "c1"
+    assert index.search("the of and") == []
+
+
+def test_deleted_pages_stop_matching_and_merge_drops_them(index):
+    assert index.delete_doc("https://tn.gov.in/ai") == 1
+    assert [h["chunk_id"] for h in index.search("artificial intelligence policy")] == ["c1"]
+    index.add([chunk(5, "https://goa.gov.in/ai", "Goa drafts an artificial intelligence policy.", state="Goa")])
+    index.flush()
+    assert index.merge()["dropped"] == 1
+    assert {h["chunk_id"] for h in index.search("artificial intelligence policy")} == {"c1", "c5"}
+
+
+def test_read_only_index_sees_published_segments(tmp_path, index):
+    reader = InvertedIndex(index.directory, read_only=True)
+    assert reader.stats()["chunks"] == 4
+    assert [h["chunk_id"] for h in reader.search("budget")] == ["c4"]
+
+
+def test_rrf_rewards_agreement_and_applies_weights():
+    dense = [{"chunk_id": "a", "text": "A"}, {"chunk_id": "b", "text": "B"}, {"chunk_id": "c", "text": "C"}]
+    sparse = [{"chunk_id": "b"}, {"chunk_id": "d"}, {"chunk_id": "c"}]
+    fused = rrf(dense, sparse, k=60)
+    assert [h["chunk_id"] for h in fused] == ["b", "c", "a", "d"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61) and fused[0]["ranks"] == [2, 1]
+    assert fused[-1]["ranks"] == [None, 2] and "text" not in fused[-1]
+
+    assert [h["chunk_id"] for h in rrf(dense, sparse, k=60, weights=[1.0, 0.0])][:3] == ["a", "b", "c"]
+
+
+class FakeVector:
+    def __init__(self, hits):
+        self.hits = hits
+
+    def search(self, vector, limit=5, **filters):
+        return self.hits[:limit]
+
+    def get_chunks(self, ids):
+        return {c["chunk_id"]: c for c in CHUNKS if c["chunk_id"] in ids}
+
+
+def test_hybrid_fills_keyword_only_hits_from_the_vector_store(index):
+    retriever = HybridRetriever(FakeVector([CHUNKS[1]]), index)
+    hits = retriever.search(None, limit=3, query="artificial intelligence policy", state="Kerala")
+    assert [h["chunk_id"] for h in hits] == ["c2", "c1"]
+    assert hits[1]["text"] == CHUNKS[0]["text"]
+
+    # the keyword index has no date ranges: vector search alone
+    assert [h["chunk_id"] for h in retriever.search(None, query="policy", published_after="2024-01-01")] == ["c2"]
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scraper.store import RawStore
+
+
+def doc(url: str, text: str) -> dict:
+    return {"url": url, "state": "Kerala", "text": text * 50}
+
+
+def test_reader_open_during_write_keeps_writer_frames(tmp_path):
+    with RawStore(str(tmp_path), writer=True) as writer:
+        writer.put(doc("u1", "one "))
+
+        # the writer is between flush and index commit for u2
+        rows = [writer._append(doc("u2", "two "))]
+        writer._out.flush()
+
+        with RawStore(str(tmp_path)) as reader:
+            assert reader.get("u1")["text"].startswith("one ")
+            assert reader.get("u2") is None
+
+        writer._commit(rows)
+        writer.put(doc("u3", "three "))
+
+        with RawStore(str(tmp_path)) as reader:
+            assert reader.get("u2")["text"].startswith("two ")
+            assert reader.get("u3")["text"].startswith("three ")
+            assert [d["url"] for d in reader.scan()] == ["u1", "u2", "u3"]
+
+
+def test_reader_cannot_write(tmp_path):
+    with RawStore(str(tmp_path)) as reader:
+        with pytest.raises(RuntimeError):
+            reader.put(doc("u1", "one "))
+
+
+def test_second_writer_is_refused(tmp_path):
+    with RawStore(str(tmp_path), writer=True):
+        with pytest.raises(RuntimeError):
+            RawStore(str(tmp_path), writer=True)
+    RawStore(str(tmp_path), writer=True).close()
+
+
+def test_writer_cuts_off_uncommitted_frames(tmp_path):
+    writer = RawStore(str(tmp_path), writer=True)
+    writer.put(doc("u1", "one "))
+    writer._append(doc("u2", "two "))
+    writer._out.flush()
+    committed = writer._db.execute("SELECT offset + length FROM docs").fetchone()[0]
+    writer.close()      # a crash before the index commit
+
+    with RawStore(str(tmp_path), writer=True) as writer:
+        assert os.path.getsize(writer.segment_path(writer._active)) == committed
+        writer.put(doc("u2", "two "))
+        assert writer.get("u2")["text"].startswith("two ")
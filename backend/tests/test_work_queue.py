@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from db.work_queue import WorkQueue
+from scaper import pipeline
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def pages(n):
+    return [{"url": f"http://example.gov.in/{i}", "state": "Kerala"} for i in range(n)]
+
+
+def test_concurrent_workers_never_claim_the_same_item(db):
+    queue = WorkQueue("web", db)
+    queue.enqueue(pages(40))
+    claimed = []
+
+    def work(worker):
+        while (item := WorkQueue("web", db).claim(worker)) is not None:
+            claimed.append(item["url"])
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(claimed) == len(set(claimed)) == 40
+    assert queue.stats() == {"leased": 40}
+
+
+def test_expired_lease_is_handed_out_again(db):
+    queue = WorkQueue("web", db, lease_seconds=0.1)
+    queue.enqueue(pages(1))
+    first = queue.claim("a")
+    assert queue.checkpoint(first["id"], 3, worker="a")
+    assert queue.claim("b") is None          # still leased to a
+
+    time.sleep(0.3)                            # a died; its lease lapses
+    second = queue.claim("b", lease_seconds=300)
+    assert second["id"] == first["id"] and second["attempts"] == 2
+    assert second["processed_pages"] == 3
+    # a's late writes are refused now that b holds the lease
+    assert not queue.complete(first["id"], worker="a")
+    assert queue.complete(second["id"], worker="b")
+    assert queue.stats() == {"done": 1}
+
+
+def test_lease_lapsing_on_the_last_attempt_fails_the_item(db):
+    queue = WorkQueue("web", db, max_attempts=1)
+    queue.enqueue(pages(1))
+    queue.claim("a", lease_seconds=0.01)
+    time.sleep(0.05)
+    assert queue.claim("b") is None
+    assert queue.stats() == {"failed": 1}
+
+
+def test_failures_back_off_then_park(db):
+    queue = WorkQueue("web", db, max_attempts=2, retry_backoff=0.05)
+    queue.enqueue(pages(1))
+    item = queue.claim("a")
+    assert queue.fail(item["id"], "HTTP 503", worker="a")
+    assert queue.claim("a") is None           # backing off
+    time.sleep(0.1)
+    item = queue.claim("a")
+    queue.fail(item["id"], "HTTP 503", worker="a")
+    assert queue.stats() == {"failed": 1}
+
+
+def test_refresh_queue_settles_every_item(db, monkeypatch):
+    queue = WorkQueue("web", db)
+    queue.enqueue(pages(4))
+    outcomes = {"0": ("static_html", "success"), "1": ("static_html", "failed"), "2": ("pdf", None),
+                "3": ("error: HTTP 404", None)}
+
+    async def fake_refresh(args, sources):
+        records = {}
+        for source in sources:
+            source["type"], status = outcomes[source["url"][-1]]
+            if status:
+                records[source["url"]] = {"status": status, "error": "HTTP 500" if status == "failed" else None}
+        return None, SimpleNamespace(records=records)
+
+    monkeypatch.setattr(pipeline, "refresh", fake_refresh)
+    args = argparse.Namespace(queue_batch=3, queue_lease=60)
+    result = pipeline.asyncio.run(pipeline.refresh_queue(args, queue))
+
+    assert result == Counter({"success": 1, "failed": 2, "pdf": 1})
+    assert queue.stats() == {"done": 2, "pending": 2}
+    assert WorkQueue("pdf", db).claim("w")["url"].endswith("/2")